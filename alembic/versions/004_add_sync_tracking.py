@@ -0,0 +1,49 @@
+"""Add change tracking for admin delta sync
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # Attendees had no updated_at; backfill from created_at so existing rows sync
+    op.add_column('attendees', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE attendees SET updated_at = created_at WHERE updated_at IS NULL")
+    for table in ('events', 'ticket_batches', 'orders'):
+        op.execute(f"UPDATE {table} SET updated_at = created_at WHERE updated_at IS NULL")
+
+    # Keyset indexes for "changed since" queries
+    op.create_index('ix_events_updated_at_id', 'events', ['updated_at', 'id'], unique=False)
+    op.create_index('ix_ticket_batches_updated_at_id', 'ticket_batches', ['updated_at', 'id'], unique=False)
+    op.create_index('ix_orders_updated_at_id', 'orders', ['updated_at', 'id'], unique=False)
+    op.create_index('ix_attendees_updated_at_id', 'attendees', ['updated_at', 'id'], unique=False)
+
+    # Tombstones for deleted rows
+    op.create_table('sync_tombstones',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('entity', sa.String(length=50), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_sync_tombstones_id'), 'sync_tombstones', ['id'], unique=False)
+    op.create_index('ix_sync_tombstones_deleted_at_id', 'sync_tombstones', ['deleted_at', 'id'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index('ix_sync_tombstones_deleted_at_id', table_name='sync_tombstones')
+    op.drop_index(op.f('ix_sync_tombstones_id'), table_name='sync_tombstones')
+    op.drop_table('sync_tombstones')
+    op.drop_index('ix_attendees_updated_at_id', table_name='attendees')
+    op.drop_index('ix_orders_updated_at_id', table_name='orders')
+    op.drop_index('ix_ticket_batches_updated_at_id', table_name='ticket_batches')
+    op.drop_index('ix_events_updated_at_id', table_name='events')
+    op.drop_column('attendees', 'updated_at')
@@ -0,0 +1,35 @@
+"""Add secondary indexes for hot query paths
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_orders_email', 'orders', ['email']),
+    ('ix_orders_event_id_status', 'orders', ['event_id', 'status']),
+    ('ix_attendees_email', 'attendees', ['email']),
+    ('ix_attendees_order_id', 'attendees', ['order_id']),
+    ('ix_ticket_batches_event_id_is_active', 'ticket_batches', ['event_id', 'is_active']),
+    ('ix_order_items_order_id', 'order_items', ['order_id']),
+]
+
+def upgrade() -> None:
+    # CONCURRENTLY (PostgreSQL) avoids blocking writes on live tables; it
+    # can't run inside a transaction, hence the autocommit block
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,21 @@
+"""Record which gate/device checked an attendee in
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column('attendees', sa.Column('checked_in_by', sa.String(length=100), nullable=True))
+
+def downgrade() -> None:
+    op.drop_column('attendees', 'checked_in_by')
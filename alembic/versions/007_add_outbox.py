@@ -0,0 +1,40 @@
+"""Add transactional outbox for queue messages
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table('outbox_messages',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('message_type', sa.String(length=50), nullable=False),
+        sa.Column('payload', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+        sa.Column('claimed_at', sa.DateTime(), nullable=True),
+        sa.Column('processed_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_outbox_messages_id'), 'outbox_messages', ['id'], unique=False)
+    op.create_index(
+        'ix_outbox_messages_pending', 'outbox_messages', ['id'], unique=False,
+        postgresql_where=sa.text('sent_at IS NULL'),
+        sqlite_where=sa.text('sent_at IS NULL')
+    )
+    op.create_index('ix_outbox_messages_processed_at', 'outbox_messages', ['processed_at'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index('ix_outbox_messages_processed_at', table_name='outbox_messages')
+    op.drop_index('ix_outbox_messages_pending', table_name='outbox_messages')
+    op.drop_index(op.f('ix_outbox_messages_id'), table_name='outbox_messages')
+    op.drop_table('outbox_messages')
@@ -0,0 +1,29 @@
+"""Add partial index on pending orders for payment reconciliation
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # CONCURRENTLY: orders is the busiest table; see 005
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_orders_pending_created_at_id', 'orders', ['created_at', 'id'], unique=False,
+            postgresql_where=sa.text("status = 'pending'"),
+            sqlite_where=sa.text("status = 'pending'"),
+            postgresql_concurrently=True
+        )
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_orders_pending_created_at_id', table_name='orders', postgresql_concurrently=True)
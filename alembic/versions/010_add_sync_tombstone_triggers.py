@@ -0,0 +1,50 @@
+"""Write sync tombstones from a trigger on PostgreSQL
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+# The ORM listener only sees session.delete(); bulk deletes, FK cascades
+# and raw SQL left deleted rows on the admin dashboard
+TRIGGERS = [
+    ('events', 'events'),
+    ('ticket_batches', 'batches'),
+    ('orders', 'orders'),
+    ('attendees', 'attendees'),
+]
+
+FUNCTION = """
+CREATE OR REPLACE FUNCTION sync_tombstone() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO sync_tombstones (entity, entity_id, deleted_at)
+    VALUES (TG_ARGV[0], OLD.id, clock_timestamp() AT TIME ZONE 'utc');
+    RETURN OLD;
+END
+$$ LANGUAGE plpgsql
+"""
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute(FUNCTION)
+    for table, entity in TRIGGERS:
+        op.execute(
+            f"CREATE TRIGGER {table}_sync_tombstone AFTER DELETE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION sync_tombstone('{entity}')"
+        )
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for table, _ in reversed(TRIGGERS):
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_sync_tombstone ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS sync_tombstone()")
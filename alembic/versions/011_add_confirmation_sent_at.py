@@ -0,0 +1,21 @@
+"""Record when each attendee's confirmation email was sent
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column('attendees', sa.Column('confirmation_sent_at', sa.DateTime(), nullable=True))
+
+def downgrade() -> None:
+    op.drop_column('attendees', 'confirmation_sent_at')
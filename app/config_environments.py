@@ -34,6 +34,9 @@ class BaseConfig(BaseSettings):
     rate_limit_calls: int = 100
     rate_limit_period: int = 60
     
+    # Query instrumentation: warn when a request issues more statements
+    db_query_budget: int = 20
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
@@ -15,6 +15,7 @@ from .database import engine, Base, get_db
 from .routes import admin_router, checkout_router, webhook_router, tickets_router, health_router, user_router
 from .routes.auth import router as auth_router
 from .security_enhanced import SecurityMiddleware, RateLimitMiddleware
+from .query_stats import track_queries
 # from .rate_limit import limiter
 from .models import Event, TicketBatch
 from sqlalchemy.orm import Session
@@ -84,7 +85,7 @@ async def log_requests(request: Request, call_next):
     request_id = str(uuid.uuid4())
     
     # Add request ID to context
-    with structlog.contextvars.bound_contextvars(request_id=request_id):
+    with structlog.contextvars.bound_contextvars(request_id=request_id), track_queries() as db_stats:
         logger.info(
             "Request started",
             method=request.method,
@@ -98,9 +99,26 @@ async def log_requests(request: Request, call_next):
             "Request completed",
             status_code=response.status_code,
             method=request.method,
-            url=str(request.url)
+            url=str(request.url),
+            db_queries=db_stats.count,
+            db_time_ms=db_stats.total_time_ms
         )
         
+        if db_stats.count > settings.db_query_budget:
+            route = request.scope.get("route")
+            logger.warning(
+                "Query budget exceeded",
+                route=route.path if route else request.url.path,
+                db_queries=db_stats.count,
+                db_query_budget=settings.db_query_budget,
+                repeated_statements=db_stats.repeated()
+            )
+        
+        if settings.debug:
+            response.headers["X-DB-Query-Count"] = str(db_stats.count)
+            response.headers["X-DB-Time-Ms"] = str(db_stats.total_time_ms)
+            response.headers["X-DB-Repeated-Statements"] = str(len(db_stats.repeated()))
+        
         response.headers["X-Request-ID"] = request_id
         return response
 
@@ -5,5 +5,8 @@ from .attendee import Attendee
 from .payment import Payment
 from .user import User
 from .coupon import Coupon
+from .tombstone import Tombstone
+from .outbox import OutboxMessage
+from .webhook_event import WebhookEvent
 
-__all__ = ["Event", "TicketBatch", "Order", "OrderItem", "Attendee", "Payment", "User", "Coupon"]
\ No newline at end of file
+__all__ = ["Event", "TicketBatch", "Order", "OrderItem", "Attendee", "Payment", "User", "Coupon", "Tombstone", "OutboxMessage", "WebhookEvent"]
\ No newline at end of file
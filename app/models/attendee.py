@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from ..database import Base
@@ -15,8 +15,17 @@ class Attendee(Base):
     qr_code = Column(String(500), unique=True, index=True)
     is_checked_in = Column(Boolean, default=False)
     checked_in_at = Column(DateTime)
+    checked_in_by = Column(String(100))  # gate/device that performed the check-in
+    confirmation_sent_at = Column(DateTime)  # when the ticket email was accepted for delivery
     custom_fields = Column(Text)  # JSON string for custom fields
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("ix_attendees_updated_at_id", "updated_at", "id"),
+        Index("ix_attendees_email", "email"),
+        Index("ix_attendees_order_id", "order_id"),
+    )
     
     # Relationships
     order = relationship("Order", back_populates="attendees")
\ No newline at end of file
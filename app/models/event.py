@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, DECIMAL
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, DECIMAL, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from ..database import Base
@@ -18,6 +18,10 @@ class Event(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        Index("ix_events_updated_at_id", "updated_at", "id"),
+    )
+    
     # Relationships
     ticket_batches = relationship("TicketBatch", back_populates="event")
     orders = relationship("Order", back_populates="event")
\ No newline at end of file
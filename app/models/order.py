@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, DECIMAL, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, DECIMAL, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from enum import Enum
@@ -25,6 +25,18 @@ class Order(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        Index("ix_orders_updated_at_id", "updated_at", "id"),
+        Index("ix_orders_email", "email"),
+        Index("ix_orders_event_id_status", "event_id", "status"),
+        # Payment reconciliation pages through pending orders by age
+        Index(
+            "ix_orders_pending_created_at_id", "created_at", "id",
+            postgresql_where=status == OrderStatus.PENDING.value,
+            sqlite_where=status == OrderStatus.PENDING.value
+        ),
+    )
+    
     # Relationships
     event = relationship("Event", back_populates="orders")
     order_items = relationship("OrderItem", back_populates="order")
@@ -41,6 +53,10 @@ class OrderItem(Base):
     unit_price = Column(DECIMAL(10, 2), nullable=False)
     total_price = Column(DECIMAL(10, 2), nullable=False)
     
+    __table_args__ = (
+        Index("ix_order_items_order_id", "order_id"),
+    )
+    
     # Relationships
     order = relationship("Order", back_populates="order_items")
     ticket_batch = relationship("TicketBatch", back_populates="order_items")
\ No newline at end of file
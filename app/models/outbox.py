@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index
+from datetime import datetime
+from ..database import Base
+
+class OutboxMessage(Base):
+    """Queue message written in the same transaction as the change it announces.
+
+    The outbox relay sends pending rows to the queue and sets sent_at;
+    consumers claim a row before handling its message and set processed_at
+    afterwards, so redelivered duplicates are skipped.
+    """
+    __tablename__ = "outbox_messages"
+
+    id = Column(Integer, primary_key=True, index=True)
+    message_type = Column(String(50), nullable=False)
+    payload = Column(Text, nullable=False)  # JSON object
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    sent_at = Column(DateTime)
+    claimed_at = Column(DateTime)
+    processed_at = Column(DateTime)
+
+    __table_args__ = (
+        # Relay scans only unsent rows
+        Index(
+            "ix_outbox_messages_pending", "id",
+            postgresql_where=sent_at.is_(None),
+            sqlite_where=sent_at.is_(None)
+        ),
+        Index("ix_outbox_messages_processed_at", "processed_at"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, DECIMAL, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, DECIMAL, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from ..database import Base
@@ -20,6 +20,11 @@ class TicketBatch(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        Index("ix_ticket_batches_updated_at_id", "updated_at", "id"),
+        Index("ix_ticket_batches_event_id_is_active", "event_id", "is_active"),
+    )
+    
     # Relationships
     event = relationship("Event", back_populates="ticket_batches")
     order_items = relationship("OrderItem", back_populates="ticket_batch")
@@ -0,0 +1,95 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index, DDL, event, select
+from sqlalchemy.orm import Session
+from datetime import datetime
+from ..database import Base
+from .event import Event
+from .ticket_batch import TicketBatch
+from .order import Order
+from .attendee import Attendee
+
+class Tombstone(Base):
+    """Record of a deleted row, consumed by the admin delta sync"""
+    __tablename__ = "sync_tombstones"
+
+    id = Column(Integer, primary_key=True, index=True)
+    entity = Column(String(50), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("ix_sync_tombstones_deleted_at_id", "deleted_at", "id"),
+    )
+
+# Entities tracked by the admin sync, keyed by the name used in sync payloads
+SYNCED_MODELS = {
+    "events": Event,
+    "batches": TicketBatch,
+    "orders": Order,
+    "attendees": Attendee,
+}
+
+# On PostgreSQL a trigger writes the tombstones, so bulk deletes, FK
+# cascades and raw SQL are covered too. It is installed with each synced
+# table (create_all) and by migration 010 for existing databases.
+TOMBSTONE_FUNCTION = """
+CREATE OR REPLACE FUNCTION sync_tombstone() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO sync_tombstones (entity, entity_id, deleted_at)
+    VALUES (TG_ARGV[0], OLD.id, clock_timestamp() AT TIME ZONE 'utc');
+    RETURN OLD;
+END
+$$ LANGUAGE plpgsql
+"""
+
+def tombstone_trigger(table: str, entity: str) -> str:
+    return (
+        f"CREATE TRIGGER {table}_sync_tombstone AFTER DELETE ON {table} "
+        f"FOR EACH ROW EXECUTE FUNCTION sync_tombstone('{entity}')"
+    )
+
+def _uses_trigger(connection) -> bool:
+    return connection.dialect.name == "postgresql"
+
+def _record_tombstone(entity: str):
+    def listener(mapper, connection, target):
+        if _uses_trigger(connection):
+            return
+        connection.execute(
+            Tombstone.__table__.insert().values(
+                entity=entity,
+                entity_id=target.id,
+                deleted_at=datetime.utcnow()
+            )
+        )
+    return listener
+
+_ENTITIES = {model: entity for entity, model in SYNCED_MODELS.items()}
+
+@event.listens_for(Session, "do_orm_execute")
+def _record_bulk_tombstones(orm_execute_state):
+    """query.delete() / delete(Model) skip after_delete; tombstone them here"""
+    if not orm_execute_state.is_delete or orm_execute_state.bind_mapper is None:
+        return
+    model = orm_execute_state.bind_mapper.class_
+    entity = _ENTITIES.get(model)
+    session = orm_execute_state.session
+    if entity is None or _uses_trigger(session.get_bind(mapper=orm_execute_state.bind_mapper)):
+        return
+    ids = select(model.id)
+    if orm_execute_state.statement.whereclause is not None:
+        ids = ids.where(orm_execute_state.statement.whereclause)
+    now = datetime.utcnow()
+    rows = [{"entity": entity, "entity_id": row_id, "deleted_at": now} for row_id in session.scalars(ids)]
+    if rows:
+        session.execute(Tombstone.__table__.insert(), rows)
+
+for _entity, _model in SYNCED_MODELS.items():
+    event.listen(_model, "after_delete", _record_tombstone(_entity))
+    event.listen(
+        _model.__table__, "after_create",
+        DDL(TOMBSTONE_FUNCTION).execute_if(dialect="postgresql")
+    )
+    event.listen(
+        _model.__table__, "after_create",
+        DDL(tombstone_trigger(_model.__tablename__, _entity)).execute_if(dialect="postgresql")
+    )
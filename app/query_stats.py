@@ -0,0 +1,90 @@
+"""
+Per-request SQL query accounting and N+1 detection
+"""
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple, Any
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+class QueryStats:
+    """Counters for the statements executed within one unit of work"""
+
+    def __init__(self, record_statements: bool = False):
+        self.count = 0
+        self.total_time = 0.0
+        self.fingerprints: Counter = Counter()
+        self.record_statements = record_statements
+        self.statements: List[Tuple[str, Any]] = []
+
+    def record(self, statement: str, parameters: Any, elapsed: float):
+        self.count += 1
+        self.total_time += elapsed
+        self.fingerprints[fingerprint(statement)] += 1
+        if self.record_statements:
+            self.statements.append((statement, parameters))
+
+    def repeated(self, threshold: int = 2) -> Dict[str, int]:
+        """Statements executed at least threshold times (likely N+1 loops)"""
+        return {
+            fp: n for fp, n in self.fingerprints.most_common() if n >= threshold
+        }
+
+    @property
+    def total_time_ms(self) -> float:
+        return round(self.total_time * 1000, 2)
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+_PARAM_PATTERN = re.compile(r"%\(\w+\)s|\$\d+")
+_IN_LIST_PATTERN = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_VALUES_PATTERN = re.compile(r"(VALUES\s*\([^)]*\))(?:\s*,\s*\([^)]*\))+", re.IGNORECASE)
+_LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+_SPACE_PATTERN = re.compile(r"\s+")
+
+def fingerprint(statement: str) -> str:
+    """Normalize a statement so repeated executions of the same query match"""
+    fp = _PARAM_PATTERN.sub("?", statement)
+    fp = _LITERAL_PATTERN.sub("?", fp)
+    fp = _VALUES_PATTERN.sub(r"\1, ...", fp)
+    fp = _IN_LIST_PATTERN.sub("(?, ...)", fp)
+    return _SPACE_PATTERN.sub(" ", fp).strip()
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    starts = conn.info.get("query_start_time")
+    elapsed = time.perf_counter() - starts.pop() if starts else 0.0
+    stats.record(statement, parameters, elapsed)
+
+def current_stats() -> Optional[QueryStats]:
+    """Stats for the unit of work in progress, if any"""
+    return _current_stats.get()
+
+@contextmanager
+def track_queries(record_statements: bool = False):
+    """Count every statement executed in this context.
+
+    Usable around a request (see the middleware in main.py), a worker job or
+    a block of test code:
+
+        with track_queries() as stats:
+            get_user_tickets("a@b.com", db)
+        assert stats.count <= 3
+    """
+    stats = QueryStats(record_statements=record_statements)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
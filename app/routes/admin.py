@@ -8,6 +8,7 @@ from decimal import Decimal
 from ..database import get_db
 from ..models import Event, TicketBatch, Order, Attendee, Coupon
 from ..schemas import EventCreate, EventUpdate, EventResponse
+from ..services.sync import get_changes
 from ..rate_limit import limiter
 
 router = APIRouter(prefix="/admin", tags=["admin"])
@@ -33,6 +34,19 @@ def admin_status(db: Session = Depends(get_db)):
         "paid_orders": paid_orders
     }
 
+@router.get("/sync")
+def sync_changes(
+    cursor: Optional[str] = None,
+    limit: int = 500,
+    db: Session = Depends(get_db)
+):
+    """Rows created, changed or deleted since cursor"""
+    limit = max(1, min(limit, 1000))
+    try:
+        return get_changes(db, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/events")
 def list_events(db: Session = Depends(get_db)):
     """List all events"""
@@ -7,7 +7,7 @@ from decimal import Decimal
 from ..database import get_db
 from ..models import Event, TicketBatch, Order, OrderItem, Attendee
 from ..schemas import OrderCreate
-from ..services.qrcode.generator import generate_qr_payload
+from ..services.orders import mark_order_paid
 from ..rate_limit import limiter
 
 router = APIRouter(prefix="/checkout", tags=["checkout"])
@@ -130,8 +130,7 @@ def payment_success(
     """Success page"""
     order = db.query(Order).filter(Order.id == order_id).first()
     if order:
-        order.status = "paid"
-        db.commit()
+        mark_order_paid(db, order)
     
     return templates.TemplateResponse("success.html", {
         "request": request,
@@ -4,6 +4,7 @@ from sqlalchemy import text
 from ..database import get_db
 import boto3
 from ..config import settings
+from ..services.payments.dedup import recent_notifications
 
 router = APIRouter()
 
@@ -27,6 +28,8 @@ def health_check(db: Session = Depends(get_db)):
             "status": "healthy",
             "database": "ok",
             "sqs": sqs_status,
+            # This process's webhook resend hit rate; spikes mean a retry storm
+            "webhook_dedup": recent_notifications.stats(),
             "version": "1.0.0"
         }
     except Exception as e:
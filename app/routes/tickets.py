@@ -1,16 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Header
 from sqlalchemy.orm import Session
-from datetime import datetime
+from typing import Optional
 from ..database import get_db
-from ..models import Attendee, Order
+from ..config import settings
+from ..schemas import CheckinBatchRequest, OfflineCheckinUpload
 from ..services.qrcode.generator import verify_qr_payload
+from ..services.checkin import build_manifest, manifest_public_key, apply_offline_checkins, validate_batch, check_in_ticket
 from ..security import require_admin
 
 router = APIRouter(prefix="/tickets", tags=["tickets"])
 
+@router.post("/validate/batch")
+def validate_tickets_batch(
+    request: CheckinBatchRequest,
+    device_id: Optional[str] = Header(None, alias="X-Device-ID"),
+    db: Session = Depends(get_db),
+    current_user = Depends(require_admin)
+):
+    """Validate several QR codes for check-in in one round trip"""
+    if len(request.codes) > settings.checkin_batch_max:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.checkin_batch_max} codes per batch"
+        )
+    return {"results": validate_batch(db, request.codes, device_id)}
+
 @router.get("/validate/{qr_code}")
 def validate_ticket(
     qr_code: str,
+    device_id: Optional[str] = Header(None, alias="X-Device-ID"),
     db: Session = Depends(get_db),
     current_user = Depends(require_admin)
 ):
@@ -21,43 +39,69 @@ def validate_ticket(
     if not qr_data["valid"]:
         raise HTTPException(status_code=400, detail="Invalid QR code")
     
-    # Find attendee
-    attendee = db.query(Attendee).filter(
-        Attendee.id == qr_data["attendee_id"],
-        Attendee.qr_code == qr_code
-    ).first()
+    # Atomic check-in; the result tells us why it didn't happen, if it didn't
+    result = check_in_ticket(db, qr_data["attendee_id"], qr_code, device_id)
+    ticket = result["ticket"]
     
-    if not attendee:
+    if result["status"] == "not_found":
         raise HTTPException(status_code=404, detail="Ticket not found")
     
-    # Check if order is paid
-    if attendee.order.status != "paid":
+    if result["status"] == "not_paid":
         raise HTTPException(status_code=400, detail="Ticket not paid")
     
-    # Check if already checked in
-    if attendee.is_checked_in:
+    if result["status"] == "already_checked_in":
         return {
             "valid": True,
             "already_checked_in": True,
             "attendee": {
-                "name": attendee.full_name,
-                "email": attendee.email,
-                "checked_in_at": attendee.checked_in_at
+                "name": ticket.full_name,
+                "email": ticket.email,
+                "checked_in_at": ticket.checked_in_at,
+                "checked_in_by": ticket.checked_in_by
             }
         }
     
-    # Perform check-in
-    attendee.is_checked_in = True
-    attendee.checked_in_at = datetime.utcnow()
-    db.commit()
-    
     return {
         "valid": True,
         "checked_in": True,
         "attendee": {
-            "name": attendee.full_name,
-            "email": attendee.email,
-            "event": attendee.order.event.name,
-            "ticket_type": attendee.order.order_items[0].ticket_batch.name if attendee.order.order_items else "N/A"
+            "name": ticket.full_name,
+            "email": ticket.email,
+            "event": ticket.event_name,
+            "ticket_type": ticket.batch_name or "N/A"
         }
-    }
\ No newline at end of file
+    }
+
+@router.get("/manifest/public-key")
+def get_manifest_public_key(current_user = Depends(require_admin)):
+    """Ed25519 public key scanners use to verify manifests"""
+    return {"algorithm": "Ed25519", "public_key": manifest_public_key()}
+
+@router.get("/manifest/{event_id}")
+def get_checkin_manifest(
+    event_id: int,
+    db: Session = Depends(get_db),
+    current_user = Depends(require_admin)
+):
+    """Signed manifest of valid tickets for offline check-in"""
+    return build_manifest(db, event_id)
+
+@router.post("/checkins/offline")
+def upload_offline_checkins(
+    upload: OfflineCheckinUpload,
+    db: Session = Depends(get_db),
+    current_user = Depends(require_admin)
+):
+    """Apply check-ins queued by an offline scanner"""
+    if len(upload.scans) > settings.checkin_offline_max:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.checkin_offline_max} scans per upload"
+        )
+    scans = [scan.dict() for scan in upload.scans]
+    results = apply_offline_checkins(db, upload.event_id, scans, upload.device_id)
+    return {
+        "event_id": upload.event_id,
+        "accepted": sum(1 for r in results if r["status"] == "checked_in"),
+        "results": results
+    }
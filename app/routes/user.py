@@ -2,8 +2,10 @@ from fastapi import APIRouter, Depends, Request
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
+from sqlalchemy import func
 from ..database import get_db
 from ..models import Order, Event, Attendee, TicketBatch
+from ..services.user_cache import user_orders_cache, user_tickets_cache
 
 router = APIRouter(tags=["user"])
 templates = Jinja2Templates(directory="templates")
@@ -21,49 +23,86 @@ def meus_ingressos_page(request: Request):
 @router.get("/user/orders")
 def get_user_orders(email: str, db: Session = Depends(get_db)):
     """Get user orders by email"""
-    orders = db.query(Order).filter(Order.email == email).all()
+    cached = user_orders_cache.get(email)
+    if cached is not None:
+        return cached
     
-    result = []
-    for order in orders:
-        # Get event info
-        event = db.query(Event).filter(Event.id == order.event_id).first()
-        
-        result.append({
-            "id": order.id,
-            "event_name": event.name if event else "Evento",
-            "total_amount": float(order.total_amount),
-            "status": order.status,
-            "created_at": order.created_at.isoformat(),
-            "attendees_count": len(order.attendees)
-        })
+    # One query: event name and attendee count joined/aggregated per order
+    rows = db.query(
+        Order.id,
+        Order.total_amount,
+        Order.status,
+        Order.created_at,
+        Event.name,
+        func.count(Attendee.id)
+    ).outerjoin(
+        Event, Event.id == Order.event_id
+    ).outerjoin(
+        Attendee, Attendee.order_id == Order.id
+    ).filter(
+        Order.email == email
+    ).group_by(
+        Order.id, Order.total_amount, Order.status, Order.created_at, Event.name
+    ).order_by(Order.id).all()
     
+    result = [
+        {
+            "id": order_id,
+            "event_name": event_name or "Evento",
+            "total_amount": float(total_amount),
+            "status": status,
+            "created_at": created_at.isoformat(),
+            "attendees_count": attendees_count
+        } for order_id, total_amount, status, created_at, event_name, attendees_count in rows
+    ]
+    
+    user_orders_cache.set(email, result)
     return result
 
 @router.get("/api/user/tickets")
 def get_user_tickets(email: str, db: Session = Depends(get_db)):
     """Get user tickets by email"""
-    # Get all attendees for this email
-    attendees = db.query(Attendee).filter(Attendee.email == email).all()
+    cached = user_tickets_cache.get(email)
+    if cached is not None:
+        return cached
+    
+    # One query: order, event and batch joined per attendee
+    rows = db.query(
+        Attendee.id,
+        Attendee.full_name,
+        Order.id,
+        Order.status,
+        Event.name,
+        Event.start_date,
+        Event.location,
+        TicketBatch.name,
+        TicketBatch.price
+    ).join(
+        Order, Order.id == Attendee.order_id
+    ).outerjoin(
+        Event, Event.id == Order.event_id
+    ).outerjoin(
+        TicketBatch, TicketBatch.id == Attendee.ticket_batch_id
+    ).filter(
+        Attendee.email == email
+    ).order_by(Attendee.id).all()
     
-    result = []
-    for attendee in attendees:
-        order = db.query(Order).filter(Order.id == attendee.order_id).first()
-        if order:
-            event = db.query(Event).filter(Event.id == order.event_id).first()
-            batch = db.query(TicketBatch).filter(TicketBatch.id == attendee.ticket_batch_id).first()
-            
-            result.append({
-                "id": attendee.id,
-                "attendee_name": attendee.full_name,
-                "event_name": event.name if event else "Evento",
-                "event_date": event.start_date.isoformat() if event and event.start_date else None,
-                "event_location": event.location if event else None,
-                "batch_name": batch.name if batch else "Ingresso",
-                "price": float(batch.price) if batch else 0.0,
-                "payment_status": order.status,
-                "order_id": order.id
-            })
+    result = [
+        {
+            "id": attendee_id,
+            "attendee_name": attendee_name,
+            "event_name": event_name or "Evento",
+            "event_date": event_date.isoformat() if event_date else None,
+            "event_location": event_location,
+            "batch_name": batch_name or "Ingresso",
+            "price": float(batch_price) if batch_price is not None else 0.0,
+            "payment_status": order_status,
+            "order_id": order_id
+        } for (attendee_id, attendee_name, order_id, order_status, event_name,
+               event_date, event_location, batch_name, batch_price) in rows
+    ]
     
+    user_tickets_cache.set(email, result)
     return result
 
 @router.get("/admin-login", response_class=HTMLResponse)
@@ -1,32 +1,69 @@
-from fastapi import APIRouter, Request, HTTPException, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Request, HTTPException, BackgroundTasks
+from starlette.concurrency import run_in_threadpool
 import json
-from ..database import get_db
-from ..models import Order, Payment
-from ..config import settings
+from typing import Dict, Any
+from ..database import SessionLocal
 from ..rate_limit import limiter
+from ..tasks import metrics
+from ..services.payments.dedup import notification_id, recent_notifications
+from ..services.payments.webhooks import get_payment_provider, process_payment_webhook
+from ..services.queue.factory import enqueue, queue_enabled
 
 router = APIRouter(prefix="/webhook", tags=["webhook"])
 
+def process_inline(webhook_data: Dict[str, Any]):
+    """Development fallback when no queue is configured"""
+    db = SessionLocal()
+    try:
+        process_payment_webhook(webhook_data, db)
+    except Exception as e:
+        print(f"Webhook processing error: {e}")
+    finally:
+        db.close()
+
 @router.post("/")
 @limiter.limit("100/minute")
-async def mercado_pago_webhook(
-    request: Request,
-    db: Session = Depends(get_db)
-):
-    """Process Mercado Pago webhook (mock for development)"""
+async def mercado_pago_webhook(request: Request, background_tasks: BackgroundTasks):
+    """Verify a Mercado Pago notification and hand it to the worker.
+
+    Answers as soon as the event is on the queue; the Mercado Pago API
+    call and the database work happen in the worker, so slow dependencies
+    never make the provider time out and retry. Without a queue
+    (development) the event is processed after the response.
+    """
+    body = await request.body()
+    if not get_payment_provider().verify_webhook(body, request.headers.get("x-signature", "")):
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+
     try:
-        # Get raw body
-        body = await request.body()
-        
-        # Parse webhook data
         webhook_data = json.loads(body.decode()) if body else {}
-        
-        # Mock processing for development
-        print(f"📨 Webhook received: {webhook_data}")
-        
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Webhook body is not valid JSON")
+    if not webhook_data:
+        # IPN-style notifications carry the event in the query string
+        params = request.query_params
+        webhook_data = {
+            "type": params.get("type") or params.get("topic"),
+            "data": {"id": params.get("data.id") or params.get("id")}
+        }
+
+    # Resends seen by this process are acked without queueing them again
+    event_id = notification_id(webhook_data)
+    if event_id and recent_notifications.check_and_add(event_id):
+        metrics.WEBHOOK_NOTIFICATIONS.labels(stage="ingest", result="duplicate_memory").inc()
+        return {"status": "ok"}
+    metrics.WEBHOOK_NOTIFICATIONS.labels(stage="ingest", result="new").inc()
+
+    if not queue_enabled():
+        background_tasks.add_task(process_inline, webhook_data)
         return {"status": "ok"}
-        
+
+    try:
+        await run_in_threadpool(enqueue, [{"type": "payment_webhook", "data": webhook_data}])
     except Exception as e:
-        print(f"Webhook error: {e}")
-        raise HTTPException(status_code=500, detail="Webhook processing failed")
\ No newline at end of file
+        # Not acknowledged, so Mercado Pago delivers it again later
+        if event_id:
+            recent_notifications.forget(event_id)
+        print(f"Failed to queue webhook: {e}")
+        raise HTTPException(status_code=503, detail="Webhook not accepted, retry later")
+    return {"status": "ok"}
@@ -3,10 +3,12 @@ from .ticket_batch import TicketBatchCreate, TicketBatchUpdate, TicketBatchRespo
 from .order import OrderCreate, OrderResponse, OrderItemCreate
 from .attendee import AttendeeResponse
 from .payment import PaymentResponse
+from .checkin import CheckinBatchRequest, OfflineScan, OfflineCheckinUpload
 
 __all__ = [
     "EventCreate", "EventUpdate", "EventResponse",
     "TicketBatchCreate", "TicketBatchUpdate", "TicketBatchResponse",
     "OrderCreate", "OrderResponse", "OrderItemCreate",
-    "AttendeeResponse", "PaymentResponse"
+    "AttendeeResponse", "PaymentResponse",
+    "CheckinBatchRequest", "OfflineScan", "OfflineCheckinUpload"
 ]
\ No newline at end of file
@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Optional
+
+class CheckinBatchRequest(BaseModel):
+    codes: List[str]
+
+class OfflineScan(BaseModel):
+    attendee_id: int
+    scanned_at: datetime
+
+class OfflineCheckinUpload(BaseModel):
+    event_id: int
+    device_id: Optional[str] = None
+    scans: List[OfflineScan]
@@ -0,0 +1,351 @@
+import base64
+import hashlib
+import json
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Set, Tuple
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+from sqlalchemy import update, select, bindparam, or_, values, column, Integer, DateTime
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..models import Attendee, Order, Event, TicketBatch
+from .qrcode.generator import verify_qr_payload
+
+MANIFEST_VERSION = 1
+
+@lru_cache()
+def manifest_signing_key() -> Ed25519PrivateKey:
+    """Ed25519 key for check-in manifests.
+
+    Derived from secret_key so every app process signs with the same key;
+    scanners only hold the public half and cannot forge manifests or tickets.
+    """
+    seed = hashlib.sha256(b"checkin-manifest:" + settings.secret_key.encode()).digest()
+    return Ed25519PrivateKey.from_private_bytes(seed)
+
+def manifest_public_key() -> str:
+    """Base64 raw public key scanners use to verify manifests"""
+    raw = manifest_signing_key().public_key().public_bytes(Encoding.Raw, PublicFormat.Raw)
+    return base64.b64encode(raw).decode()
+
+def qr_hash(qr_code: str) -> str:
+    """Short hash of a QR payload, as stored in manifests"""
+    return hashlib.sha256(qr_code.encode()).hexdigest()[:16]
+
+def _canonical(data: Dict[str, Any]) -> bytes:
+    return json.dumps(data, sort_keys=True, separators=(",", ":")).encode()
+
+def build_manifest(db: Session, event_id: int) -> Dict[str, Any]:
+    """Signed list of every valid ticket for an event.
+
+    tickets is sorted by QR hash so scanners can binary-search the hash of a
+    scanned payload. One query, no per-attendee loads.
+    """
+    rows = db.query(
+        Attendee.id,
+        Attendee.qr_code,
+        Attendee.ticket_batch_id,
+        Attendee.is_checked_in,
+        TicketBatch.name
+    ).join(
+        Order, Order.id == Attendee.order_id
+    ).join(
+        TicketBatch, TicketBatch.id == Attendee.ticket_batch_id
+    ).filter(
+        Order.event_id == event_id,
+        Order.status == "paid",
+        Attendee.qr_code.isnot(None)
+    ).all()
+
+    batches = {}
+    tickets = []
+    checked_in = []
+    for attendee_id, qr_code, batch_id, is_checked_in, batch_name in rows:
+        batches[str(batch_id)] = batch_name
+        tickets.append([qr_hash(qr_code), attendee_id, batch_id])
+        if is_checked_in:
+            checked_in.append(attendee_id)
+    tickets.sort()
+    checked_in.sort()
+
+    manifest = {
+        "v": MANIFEST_VERSION,
+        "event_id": event_id,
+        "generated_at": datetime.utcnow().isoformat(),
+        "batches": batches,
+        "tickets": tickets,
+        "checked_in": checked_in
+    }
+    signature = manifest_signing_key().sign(_canonical(manifest))
+    manifest["signature"] = base64.b64encode(signature).decode()
+    return manifest
+
+def check_in_ticket(db: Session, attendee_id: int, qr_code: str, device_id: Optional[str] = None) -> Dict[str, Any]:
+    """Check a single ticket in with one atomic conditional UPDATE.
+
+    Concurrent scans of the same ticket race on the UPDATE itself, so
+    exactly one of them gets the row back; the row lock is held only for
+    that statement. Returns {"status": ..., "ticket": row} where status is
+    "checked_in", "already_checked_in", "not_paid" or "not_found".
+    """
+    attendees = Attendee.__table__
+    paid_order = select(Order.id).where(
+        Order.id == attendees.c.order_id,
+        Order.status == "paid"
+    ).exists()
+
+    won = db.execute(
+        update(attendees).where(
+            attendees.c.id == attendee_id,
+            attendees.c.qr_code == qr_code,
+            attendees.c.is_checked_in.isnot(True),
+            paid_order
+        ).values(
+            is_checked_in=True,
+            checked_in_at=datetime.utcnow(),
+            checked_in_by=device_id
+        ).returning(attendees.c.id)
+    ).first() is not None
+    db.commit()
+
+    ticket = db.query(
+        Attendee.id,
+        Attendee.full_name,
+        Attendee.email,
+        Attendee.is_checked_in,
+        Attendee.checked_in_at,
+        Attendee.checked_in_by,
+        Order.status,
+        Event.name.label("event_name"),
+        TicketBatch.name.label("batch_name")
+    ).join(
+        Order, Order.id == Attendee.order_id
+    ).join(
+        Event, Event.id == Order.event_id
+    ).outerjoin(
+        TicketBatch, TicketBatch.id == Attendee.ticket_batch_id
+    ).filter(
+        Attendee.id == attendee_id,
+        Attendee.qr_code == qr_code
+    ).first()
+
+    if won:
+        status = "checked_in"
+    elif ticket is None:
+        status = "not_found"
+    elif ticket.status != "paid":
+        status = "not_paid"
+    else:
+        status = "already_checked_in"
+    return {"status": status, "ticket": ticket}
+
+def _as_utc_naive(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def apply_offline_checkins(
+    db: Session,
+    event_id: int,
+    scans: List[Dict[str, Any]],
+    device_id: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Apply check-ins queued by offline scanners, earliest scan wins.
+
+    scans is a list of {"attendee_id", "scanned_at"}. Returns one result per
+    scan, in order: "checked_in" when this scan is the earliest known for the
+    ticket, "duplicate" when an earlier scan exists and "invalid" when the
+    ticket doesn't belong to a paid order of the event.
+    """
+    scanned_at = [_as_utc_naive(scan["scanned_at"]) for scan in scans]
+
+    ids = {scan["attendee_id"] for scan in scans}
+    current = {
+        attendee_id: checked_in_at if is_checked_in else None
+        for attendee_id, is_checked_in, checked_in_at in db.query(
+            Attendee.id, Attendee.is_checked_in, Attendee.checked_in_at
+        ).join(
+            Order, Order.id == Attendee.order_id
+        ).filter(
+            Attendee.id.in_(ids),
+            Order.event_id == event_id,
+            Order.status == "paid"
+        ).all()
+    } if ids else {}
+
+    # Earliest uploaded scan per ticket
+    earliest: Dict[int, int] = {}
+    for index, scan in enumerate(scans):
+        attendee_id = scan["attendee_id"]
+        if attendee_id not in current:
+            continue
+        best = earliest.get(attendee_id)
+        if best is None or scanned_at[index] < scanned_at[best]:
+            earliest[attendee_id] = index
+
+    winners = {
+        attendee_id: index for attendee_id, index in earliest.items()
+        if current[attendee_id] is None or scanned_at[index] < current[attendee_id]
+    }
+
+    if winners:
+        # The guard keeps the earliest timestamp if another gate checked
+        # the ticket in between our read and this write; those rows don't
+        # apply and their scans are reported as duplicates
+        applied = _write_checkins(db, [
+            (attendee_id, scanned_at[index]) for attendee_id, index in winners.items()
+        ], device_id)
+        db.commit()
+        winners = {attendee_id: index for attendee_id, index in winners.items() if attendee_id in applied}
+
+    results = []
+    for index, scan in enumerate(scans):
+        attendee_id = scan["attendee_id"]
+        if attendee_id not in current:
+            status = "invalid"
+        elif winners.get(attendee_id) == index:
+            status = "checked_in"
+        else:
+            status = "duplicate"
+        results.append({"attendee_id": attendee_id, "status": status})
+    return results
+
+def _write_checkins(db: Session, rows: List[Tuple[int, datetime]], device_id: Optional[str]) -> Set[int]:
+    """Conditionally check in (attendee_id, scanned_at) rows; returns the ids applied.
+
+    One UPDATE ... FROM (VALUES ...) RETURNING on PostgreSQL; one guarded
+    UPDATE per row elsewhere, so each row's rowcount is known.
+    """
+    attendees = Attendee.__table__
+    if db.get_bind().dialect.name == "postgresql":
+        scans = values(
+            column("attendee_id", Integer),
+            column("scanned_at", DateTime),
+            name="scans"
+        ).data(rows)
+        result = db.execute(
+            update(attendees).where(
+                attendees.c.id == scans.c.attendee_id,
+                or_(attendees.c.is_checked_in.isnot(True), attendees.c.checked_in_at > scans.c.scanned_at)
+            ).values(
+                is_checked_in=True,
+                checked_in_at=scans.c.scanned_at,
+                checked_in_by=device_id
+            ).returning(attendees.c.id)
+        )
+        return {attendee_id for attendee_id, in result}
+
+    stmt = update(attendees).where(
+        attendees.c.id == bindparam("attendee_id"),
+        or_(attendees.c.is_checked_in.isnot(True), attendees.c.checked_in_at > bindparam("scanned_at"))
+    ).values(
+        is_checked_in=True,
+        checked_in_at=bindparam("scanned_at"),
+        checked_in_by=device_id
+    )
+    applied = set()
+    for attendee_id, scanned_at in rows:
+        if db.execute(stmt, {"attendee_id": attendee_id, "scanned_at": scanned_at}).rowcount:
+            applied.add(attendee_id)
+    return applied
+
+def validate_batch(db: Session, codes: List[str], device_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Validate and check in several QR codes at once.
+
+    Signatures are checked in memory, all tickets are fetched with one
+    joined query and the check-ins are written with one conditional UPDATE,
+    whatever the batch size. Results are returned in the order of codes.
+    """
+    parsed = [verify_qr_payload(code) for code in codes]
+    ids = {p["attendee_id"] for p in parsed if p["valid"]}
+
+    tickets = {
+        row.id: row for row in db.query(
+            Attendee.id,
+            Attendee.qr_code,
+            Attendee.full_name,
+            Attendee.email,
+            Attendee.is_checked_in,
+            Attendee.checked_in_at,
+            Order.status,
+            Event.name.label("event_name"),
+            TicketBatch.name.label("batch_name")
+        ).join(
+            Order, Order.id == Attendee.order_id
+        ).join(
+            Event, Event.id == Order.event_id
+        ).outerjoin(
+            TicketBatch, TicketBatch.id == Attendee.ticket_batch_id
+        ).filter(
+            Attendee.id.in_(ids)
+        ).all()
+    } if ids else {}
+
+    to_check_in = set()
+    for code, p in zip(codes, parsed):
+        ticket = tickets.get(p.get("attendee_id"))
+        if p["valid"] and ticket and ticket.qr_code == code and ticket.status == "paid" and not ticket.is_checked_in:
+            to_check_in.add(ticket.id)
+
+    checked_in_at = datetime.utcnow()
+    checked_in = set()
+    if to_check_in:
+        # The is_checked_in guard makes the write authoritative: a ticket
+        # scanned at another gate meanwhile is simply not returned
+        checked_in = set(db.execute(
+            update(Attendee.__table__).where(
+                Attendee.__table__.c.id.in_(to_check_in),
+                Attendee.__table__.c.is_checked_in.isnot(True)
+            ).values(
+                is_checked_in=True,
+                checked_in_at=checked_in_at,
+                checked_in_by=device_id
+            ).returning(Attendee.__table__.c.id)
+        ).scalars().all())
+        db.commit()
+
+    # When each ticket not already checked in at the SELECT got checked in:
+    # by this batch, or by the gate that won the race for the rest
+    checked_in_times = dict.fromkeys(checked_in, checked_in_at)
+    lost = to_check_in - checked_in
+    if lost:
+        checked_in_times.update(
+            db.query(Attendee.id, Attendee.checked_in_at).filter(Attendee.id.in_(lost)).all()
+        )
+
+    results = []
+    reported = set()
+    for code, p in zip(codes, parsed):
+        ticket = tickets.get(p.get("attendee_id"))
+        if not p["valid"]:
+            results.append({"code": code, "valid": False, "error": "Invalid QR code"})
+        elif not ticket or ticket.qr_code != code:
+            results.append({"code": code, "valid": False, "error": "Ticket not found"})
+        elif ticket.status != "paid":
+            results.append({"code": code, "valid": False, "error": "Ticket not paid"})
+        elif ticket.id in checked_in and ticket.id not in reported:
+            reported.add(ticket.id)
+            results.append({
+                "code": code,
+                "valid": True,
+                "checked_in": True,
+                "attendee": {
+                    "name": ticket.full_name,
+                    "email": ticket.email,
+                    "event": ticket.event_name,
+                    "ticket_type": ticket.batch_name or "N/A"
+                }
+            })
+        else:
+            results.append({
+                "code": code,
+                "valid": True,
+                "already_checked_in": True,
+                "attendee": {
+                    "name": ticket.full_name,
+                    "email": ticket.email,
+                    "checked_in_at": ticket.checked_in_at or checked_in_times.get(ticket.id)
+                }
+            })
+    return results
@@ -0,0 +1,25 @@
+import mailbox
+import threading
+from email.message import Message
+from typing import Optional
+from ...config import settings
+from .transport import MailTransport
+
+class MaildirTransport(MailTransport):
+    """Writes messages into a local Maildir instead of sending them.
+    
+    Stands in for a real relay in development and load tests; any mail
+    client (mutt -f, Thunderbird) can open the directory.
+    """
+    
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.mail_sink_path
+        self.maildir = mailbox.Maildir(self.path, create=True)
+        # Maildir picks unique names from a shared counter that isn't
+        # thread-safe
+        self._lock = threading.Lock()
+    
+    def send(self, message: Message) -> str:
+        with self._lock:
+            self.maildir.add(message)
+        return message['Message-ID']
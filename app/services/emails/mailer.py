@@ -0,0 +1,101 @@
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.mime.application import MIMEApplication
+from email.utils import make_msgid
+from jinja2 import Template
+from typing import List, Optional, Union
+from ...config import settings
+from .transport import MailTransport, get_transport
+
+HTML_TEMPLATE = Template("""
+<html>
+<body>
+    <h2>Confirmação de Inscrição - {{ event_name }}</h2>
+    <p>Olá {{ attendee_name }},</p>
+    <p>Sua inscrição foi confirmada com sucesso!</p>
+    <p><strong>Evento:</strong> {{ event_name }}</p>
+    <p><strong>Pedido:</strong> #{{ order_id }}</p>
+    {% if tickets > 1 %}
+    <p>Seus {{ tickets }} ingressos estão em anexo. Apresente um QR Code por pessoa na entrada do evento.</p>
+    {% else %}
+    <p>Seu ingresso está em anexo. Apresente o QR Code na entrada do evento.</p>
+    {% endif %}
+    <p>Obrigado!</p>
+</body>
+</html>
+""")
+
+TEXT_TEMPLATE = Template("""
+Confirmação de Inscrição - {{ event_name }}
+
+Olá {{ attendee_name }},
+
+Sua inscrição foi confirmada com sucesso!
+
+Evento: {{ event_name }}
+Pedido: #{{ order_id }}
+
+{% if tickets > 1 -%}
+Seus {{ tickets }} ingressos estão em anexo. Apresente um QR Code por pessoa na entrada do evento.
+{%- else -%}
+Seu ingresso está em anexo. Apresente o QR Code na entrada do evento.
+{%- endif %}
+
+Obrigado!
+""")
+
+def build_confirmation_email(
+    to_email: str,
+    attendee_name: str,
+    event_name: str,
+    qr_codes: List[bytes],
+    order_id: int
+) -> MIMEMultipart:
+    """Confirmation message with one QR attachment per ticket"""
+    context = {
+        "attendee_name": attendee_name,
+        "event_name": event_name,
+        "order_id": order_id,
+        "tickets": len(qr_codes),
+    }
+    
+    msg = MIMEMultipart('mixed')
+    msg['Subject'] = f'Confirmação de Inscrição - {event_name}'
+    msg['From'] = settings.ses_sender_email
+    msg['To'] = to_email
+    msg['Message-ID'] = make_msgid(domain=settings.ses_sender_email.rpartition('@')[2] or None)
+    
+    msg_body = MIMEMultipart('alternative')
+    msg_body.attach(MIMEText(TEXT_TEMPLATE.render(**context), 'plain'))
+    msg_body.attach(MIMEText(HTML_TEMPLATE.render(**context), 'html'))
+    msg.attach(msg_body)
+    
+    for index, qr_code_data in enumerate(qr_codes, start=1):
+        qr_attachment = MIMEApplication(qr_code_data)
+        filename = f'ticket_{order_id}.png' if len(qr_codes) == 1 else f'ticket_{order_id}_{index}.png'
+        qr_attachment.add_header('Content-Disposition', 'attachment', filename=filename)
+        msg.attach(qr_attachment)
+    
+    return msg
+
+class Mailer:
+    """Builds confirmation emails and hands them to a mail transport"""
+    
+    def __init__(self, transport: Optional[MailTransport] = None):
+        self.transport = transport or get_transport()
+    
+    def send_confirmation_email(
+        self, 
+        to_email: str, 
+        attendee_name: str, 
+        event_name: str,
+        qr_code_data: Union[bytes, List[bytes]],
+        order_id: int
+    ):
+        """Send ticket confirmation email with one or more QR codes attached"""
+        qr_codes = [qr_code_data] if isinstance(qr_code_data, bytes) else list(qr_code_data)
+        msg = build_confirmation_email(to_email, attendee_name, event_name, qr_codes, order_id)
+        try:
+            return {"success": True, "message_id": self.transport.send(msg)}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
@@ -1,104 +1,83 @@
 import boto3
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from email.mime.application import MIMEApplication
-from jinja2 import Template
-from typing import List, Optional
+import random
+import threading
+import time
+from botocore.exceptions import ClientError
+from email.message import Message
+from typing import Optional
 from ...config import settings
+from ..throttle import TokenBucket
+from .mailer import Mailer
+from .transport import MailTransport
 
-class SESMailer:
-    def __init__(self):
-        self.ses_client = boto3.client('ses', region_name=settings.aws_region)
+# SES answers "Throttling" both for the per-second rate and the daily quota;
+# only the former clears by waiting
+RATE_EXCEEDED = "Maximum sending rate exceeded"
+
+# Used when the account quota can't be read (SES sandbox default)
+FALLBACK_SEND_RATE = 1.0
+
+_send_bucket: Optional[TokenBucket] = None
+_send_bucket_lock = threading.Lock()
+
+def send_rate_bucket(ses_client) -> TokenBucket:
+    """Process-wide token bucket at the account's SES max send rate.
+
+    SES_MAX_SEND_RATE overrides the quota, e.g. to split it between
+    several worker processes.
+    """
+    global _send_bucket
+    with _send_bucket_lock:
+        if _send_bucket is None:
+            rate = settings.ses_max_send_rate
+            if not rate:
+                try:
+                    rate = float(ses_client.get_send_quota()['MaxSendRate'])
+                except Exception as e:
+                    print(f"Could not read SES send quota, using {FALLBACK_SEND_RATE}/s: {e}")
+                    rate = FALLBACK_SEND_RATE
+            _send_bucket = TokenBucket(rate)
+        return _send_bucket
+
+class SESTransport(MailTransport):
+    """Sends raw messages through SES within the account's send rate.
+    
+    Throttling on the per-second rate is retried with full-jitter
+    exponential backoff, so concurrent senders spread out instead of
+    retrying in lockstep.
+    """
+    
+    def __init__(self, bucket: Optional[TokenBucket] = None, client=None):
+        self.ses_client = client or boto3.client('ses', region_name=settings.aws_region)
+        self._bucket = bucket
+    
+    @property
+    def bucket(self) -> TokenBucket:
+        # Resolved on first send so constructing a transport makes no AWS calls
+        if self._bucket is None:
+            self._bucket = send_rate_bucket(self.ses_client)
+        return self._bucket
+    
+    def send(self, message: Message) -> str:
+        raw_message = message.as_string()
+        for attempt in range(settings.ses_throttle_retries + 1):
+            self.bucket.acquire()
+            try:
+                response = self.ses_client.send_raw_email(
+                    Source=settings.ses_sender_email,
+                    Destinations=[message['To']],
+                    RawMessage={'Data': raw_message}
+                )
+                return response['MessageId']
+            except ClientError as e:
+                error = e.response.get('Error', {})
+                throttled = error.get('Code') == 'Throttling' and RATE_EXCEEDED in error.get('Message', '')
+                if not throttled or attempt == settings.ses_throttle_retries:
+                    raise
+                time.sleep(random.uniform(0, min(10.0, 0.5 * 2 ** attempt)))
+
+class SESMailer(Mailer):
+    """Mailer bound to SES regardless of MAIL_TRANSPORT"""
     
-    def send_confirmation_email(
-        self, 
-        to_email: str, 
-        attendee_name: str, 
-        event_name: str,
-        qr_code_data: bytes,
-        order_id: int
-    ):
-        """Send ticket confirmation email with QR code"""
-        
-        # Email template
-        html_template = Template("""
-        <html>
-        <body>
-            <h2>Confirmação de Inscrição - {{ event_name }}</h2>
-            <p>Olá {{ attendee_name }},</p>
-            <p>Sua inscrição foi confirmada com sucesso!</p>
-            <p><strong>Evento:</strong> {{ event_name }}</p>
-            <p><strong>Pedido:</strong> #{{ order_id }}</p>
-            <p>Seu ingresso está em anexo. Apresente o QR Code na entrada do evento.</p>
-            <p>Obrigado!</p>
-        </body>
-        </html>
-        """)
-        
-        text_template = Template("""
-        Confirmação de Inscrição - {{ event_name }}
-        
-        Olá {{ attendee_name }},
-        
-        Sua inscrição foi confirmada com sucesso!
-        
-        Evento: {{ event_name }}
-        Pedido: #{{ order_id }}
-        
-        Seu ingresso está em anexo. Apresente o QR Code na entrada do evento.
-        
-        Obrigado!
-        """)
-        
-        # Create message
-        msg = MIMEMultipart('mixed')
-        msg['Subject'] = f'Confirmação de Inscrição - {event_name}'
-        msg['From'] = settings.ses_sender_email
-        msg['To'] = to_email
-        
-        # Create message body
-        msg_body = MIMEMultipart('alternative')
-        
-        # Text part
-        text_part = MIMEText(
-            text_template.render(
-                attendee_name=attendee_name,
-                event_name=event_name,
-                order_id=order_id
-            ),
-            'plain'
-        )
-        msg_body.attach(text_part)
-        
-        # HTML part
-        html_part = MIMEText(
-            html_template.render(
-                attendee_name=attendee_name,
-                event_name=event_name,
-                order_id=order_id
-            ),
-            'html'
-        )
-        msg_body.attach(html_part)
-        
-        msg.attach(msg_body)
-        
-        # Attach QR code
-        qr_attachment = MIMEApplication(qr_code_data)
-        qr_attachment.add_header(
-            'Content-Disposition',
-            'attachment',
-            filename=f'ticket_{order_id}.png'
-        )
-        msg.attach(qr_attachment)
-        
-        # Send email
-        try:
-            response = self.ses_client.send_raw_email(
-                Source=settings.ses_sender_email,
-                Destinations=[to_email],
-                RawMessage={'Data': msg.as_string()}
-            )
-            return {"success": True, "message_id": response['MessageId']}
-        except Exception as e:
-            return {"success": False, "error": str(e)}
\ No newline at end of file
+    def __init__(self, bucket: Optional[TokenBucket] = None):
+        super().__init__(SESTransport(bucket=bucket))
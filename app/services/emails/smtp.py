@@ -0,0 +1,121 @@
+import queue
+import smtplib
+import threading
+import time
+from email.message import Message
+from typing import Optional
+from ...config import settings
+from .transport import MailTransport
+
+class PooledConnection:
+    def __init__(self, smtp: smtplib.SMTP):
+        self.smtp = smtp
+        self.sent = 0
+        self.last_used = time.monotonic()
+
+    def close(self):
+        try:
+            self.smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            self.smtp.close()
+
+class SMTPTransport(MailTransport):
+    """Sends through an SMTP relay over a pool of persistent connections.
+
+    Up to pool_size connections stay open and each carries up to
+    max_messages messages before it is replaced, so connect, TLS and AUTH
+    happen once per connection instead of once per email. Connections idle
+    for longer than idle_timeout are probed with NOOP before reuse; one
+    the server dropped is replaced and the message resent once.
+    """
+
+    def __init__(
+        self,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        starttls: Optional[bool] = None,
+        pool_size: Optional[int] = None,
+        max_messages: Optional[int] = None,
+        timeout: float = 30,
+        idle_timeout: float = 60
+    ):
+        self.host = host or settings.smtp_host
+        self.port = port or settings.smtp_port
+        self.username = settings.smtp_username if username is None else username
+        self.password = settings.smtp_password if password is None else password
+        self.starttls = settings.smtp_starttls if starttls is None else starttls
+        self.max_messages = max(1, max_messages or settings.smtp_max_messages_per_connection)
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self._idle: "queue.LifoQueue[PooledConnection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max(1, pool_size or settings.smtp_pool_size))
+        self.connections_opened = 0
+
+    def _connect(self) -> PooledConnection:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            smtp.ehlo()
+            if self.starttls and smtp.has_extn('starttls'):
+                smtp.starttls()
+                smtp.ehlo()
+            if self.username:
+                smtp.login(self.username, self.password)
+        except Exception:
+            smtp.close()
+            raise
+        self.connections_opened += 1
+        return PooledConnection(smtp)
+
+    def _checkout(self) -> PooledConnection:
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+            if time.monotonic() - conn.last_used < self.idle_timeout:
+                return conn
+            try:
+                if conn.smtp.noop()[0] == 250:
+                    return conn
+            except (smtplib.SMTPException, OSError):
+                pass
+            conn.close()
+
+    def _checkin(self, conn: PooledConnection):
+        conn.sent += 1
+        conn.last_used = time.monotonic()
+        if conn.sent >= self.max_messages:
+            conn.close()
+        else:
+            self._idle.put(conn)
+
+    def send(self, message: Message) -> str:
+        with self._slots:
+            conn = self._checkout()
+            try:
+                try:
+                    conn.smtp.send_message(message)
+                except (smtplib.SMTPServerDisconnected, ConnectionError):
+                    # Server closed a pooled connection; retry on a fresh one
+                    conn.close()
+                    conn = self._connect()
+                    conn.smtp.send_message(message)
+            except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused):
+                # Rejected message; smtplib already reset the session so the
+                # connection can be reused
+                self._checkin(conn)
+                raise
+            except Exception:
+                conn.close()
+                raise
+            self._checkin(conn)
+        return message['Message-ID']
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
@@ -0,0 +1,34 @@
+from abc import ABC, abstractmethod
+from email.message import Message
+from ...config import settings
+
+TRANSPORTS = ("ses", "smtp", "file")
+
+class MailTransport(ABC):
+    """Delivers fully built MIME messages"""
+    
+    @abstractmethod
+    def send(self, message: Message) -> str:
+        """Deliver message to its To recipients and return its message id.
+        
+        Raises on failure; the mailer turns errors into a failed result.
+        """
+        pass
+    
+    def close(self) -> None:
+        """Release connections or files held by the transport"""
+        pass
+
+def get_transport() -> MailTransport:
+    """The transport selected by MAIL_TRANSPORT (ses, smtp or file)"""
+    transport = settings.mail_transport
+    if transport == "ses":
+        from .ses_mailer import SESTransport
+        return SESTransport()
+    if transport == "smtp":
+        from .smtp import SMTPTransport
+        return SMTPTransport()
+    if transport == "file":
+        from .file_sink import MaildirTransport
+        return MaildirTransport()
+    raise ValueError(f"Unknown mail transport {transport!r}; expected one of {', '.join(TRANSPORTS)}")
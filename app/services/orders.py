@@ -0,0 +1,106 @@
+from datetime import datetime
+from typing import Iterable, List
+from sqlalchemy import update, values, column, bindparam, Integer, String
+from sqlalchemy.orm import Session
+from ..models import Order, Attendee
+from .qrcode.generator import generate_qr_payload
+from .user_cache import invalidate_on_commit
+from . import outbox
+
+# Attendees per UPDATE; keeps bind parameters well under driver limits
+QR_ASSIGN_CHUNK = 1000
+
+def assign_qr_codes(db: Session, order_ids: Iterable[int]) -> int:
+    """Give every attendee of the orders that still lacks one a QR payload.
+
+    Payloads are computed in memory and written with one
+    UPDATE ... FROM (VALUES ...) per chunk on PostgreSQL (an executemany on
+    other databases), so an order with hundreds of tickets costs one SELECT
+    and one UPDATE. The qr_code IS NULL guard makes it safe to run twice.
+    Does not commit. Returns the number of attendees updated.
+    """
+    order_ids = list(order_ids)
+    if not order_ids:
+        return 0
+
+    pending = db.query(Attendee.id, Attendee.order_id, Attendee.email).filter(
+        Attendee.order_id.in_(order_ids),
+        Attendee.qr_code.is_(None)
+    ).order_by(Attendee.id).all()
+
+    attendees = Attendee.__table__
+    updated = 0
+    for start in range(0, len(pending), QR_ASSIGN_CHUNK):
+        rows = [
+            (attendee_id, generate_qr_payload(order_id, attendee_id))
+            for attendee_id, order_id, _ in pending[start:start + QR_ASSIGN_CHUNK]
+        ]
+        if db.get_bind().dialect.name == "postgresql":
+            payloads = values(
+                column("attendee_id", Integer),
+                column("qr_code", String),
+                name="payloads"
+            ).data(rows)
+            result = db.execute(
+                update(attendees).where(
+                    attendees.c.id == payloads.c.attendee_id,
+                    attendees.c.qr_code.is_(None)
+                ).values(qr_code=payloads.c.qr_code)
+            )
+        else:
+            result = db.execute(
+                update(attendees).where(
+                    attendees.c.id == bindparam("attendee_id"),
+                    attendees.c.qr_code.is_(None)
+                ).values(qr_code=bindparam("payload")),
+                [{"attendee_id": attendee_id, "payload": payload} for attendee_id, payload in rows]
+            )
+        updated += result.rowcount
+
+    invalidate_on_commit(db, {email for _, _, email in pending})
+    return updated
+
+def mark_orders_paid(db: Session, order_ids: Iterable[int]) -> List[int]:
+    """Move orders to paid and issue their tickets' QR payloads, in bulk.
+
+    One guarded UPDATE per chunk flips the orders that aren't paid yet; on
+    PostgreSQL a concurrent caller blocks on the row locks and then matches
+    nothing, so each order is moved (and gets its confirmation outbox row)
+    exactly once. QR payloads are filled in for every order given, which
+    heals partially processed ones. Does not commit. Returns the ids that
+    changed.
+    """
+    order_ids = list(order_ids)
+    if not order_ids:
+        return []
+    db.flush()
+
+    orders = Order.__table__
+    changed: List[int] = []
+    for start in range(0, len(order_ids), QR_ASSIGN_CHUNK):
+        result = db.execute(
+            update(orders).where(
+                orders.c.id.in_(order_ids[start:start + QR_ASSIGN_CHUNK]),
+                orders.c.status != "paid"
+            ).values(status="paid", updated_at=datetime.utcnow()).returning(orders.c.id)
+        )
+        changed.extend(order_id for order_id, in result)
+
+    assign_qr_codes(db, order_ids)
+    for order_id in changed:
+        outbox.add_message(db, "send_confirmation", {"order_id": order_id})
+    return changed
+
+def mark_order_paid(db: Session, order: Order) -> bool:
+    """Move an order to paid and issue its tickets' QR payloads.
+
+    The status change, the QR payloads and an outbox row for the
+    confirmation emails are committed together; the outbox relay queues
+    the emails afterwards, off the request path. Returns False when the
+    order was already paid; QR payloads are still filled in for any
+    attendee missing one, so a retried callback heals a partially
+    processed order.
+    """
+    changed = bool(mark_orders_paid(db, [order.id]))
+    db.commit()
+    return changed
@@ -0,0 +1,99 @@
+import json
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+from sqlalchemy import update, delete, or_
+from sqlalchemy.orm import Session
+from ..models import OutboxMessage
+from ..config import settings
+from .queue.factory import enqueue
+
+class OutboxMessageBusy(RuntimeError):
+    """Another consumer is handling the same outbox message right now"""
+
+def add_message(db: Session, message_type: str, payload: Dict[str, Any]) -> OutboxMessage:
+    """Stage a queue message in the caller's transaction. Does not commit."""
+    message = OutboxMessage(message_type=message_type, payload=json.dumps(payload))
+    db.add(message)
+    return message
+
+def relay_batch(db: Session, batch_size: Optional[int] = None) -> int:
+    """Send up to batch_size pending outbox rows to the queue and mark them sent.
+
+    Rows are locked with SKIP LOCKED on PostgreSQL, so several relays can
+    run side by side without sending the same row. A crash between the send
+    and the commit resends the batch; consumers skip the duplicates by
+    outbox id. Returns the number of messages sent.
+    """
+    pending = db.query(OutboxMessage.id, OutboxMessage.message_type, OutboxMessage.payload).filter(
+        OutboxMessage.sent_at.is_(None)
+    ).order_by(OutboxMessage.id).limit(batch_size or settings.outbox_batch_size).with_for_update(skip_locked=True).all()
+    if not pending:
+        db.rollback()
+        return 0
+
+    try:
+        enqueue([
+            {**json.loads(payload), "type": message_type, "outbox_id": outbox_id}
+            for outbox_id, message_type, payload in pending
+        ])
+    except Exception:
+        db.rollback()
+        raise
+
+    outbox = OutboxMessage.__table__
+    db.execute(
+        update(outbox).where(outbox.c.id.in_([row.id for row in pending])).values(sent_at=datetime.utcnow())
+    )
+    db.commit()
+    return len(pending)
+
+def claim_message(db: Session, outbox_id: int) -> bool:
+    """Claim an outbox message before handling it.
+
+    Returns False when it was already processed (a duplicate delivery).
+    Raises OutboxMessageBusy while another consumer holds a claim younger
+    than OUTBOX_CLAIM_TIMEOUT, so the duplicate is retried later instead of
+    running concurrently. Commits.
+    """
+    now = datetime.utcnow()
+    outbox = OutboxMessage.__table__
+    result = db.execute(
+        update(outbox).where(
+            outbox.c.id == outbox_id,
+            outbox.c.processed_at.is_(None),
+            or_(
+                outbox.c.claimed_at.is_(None),
+                outbox.c.claimed_at < now - timedelta(seconds=settings.outbox_claim_timeout)
+            )
+        ).values(claimed_at=now)
+    )
+    db.commit()
+    if result.rowcount:
+        return True
+
+    row = db.query(OutboxMessage.processed_at).filter(OutboxMessage.id == outbox_id).first()
+    # Purged rows were processed long ago
+    if row is None or row.processed_at is not None:
+        return False
+    raise OutboxMessageBusy(f"Outbox message {outbox_id} is being handled by another consumer")
+
+def mark_processed(db: Session, outbox_id: int):
+    outbox = OutboxMessage.__table__
+    db.execute(update(outbox).where(outbox.c.id == outbox_id).values(processed_at=datetime.utcnow()))
+    db.commit()
+
+def release_message(db: Session, outbox_id: int):
+    """Drop a claim after a failed attempt so the retry can take it"""
+    outbox = OutboxMessage.__table__
+    db.execute(update(outbox).where(outbox.c.id == outbox_id).values(claimed_at=None))
+    db.commit()
+
+def purge_processed(db: Session, retention_days: Optional[int] = None) -> int:
+    """Delete rows processed more than retention_days ago"""
+    days = settings.outbox_retention_days if retention_days is None else retention_days
+    outbox = OutboxMessage.__table__
+    result = db.execute(
+        delete(outbox).where(outbox.c.processed_at < datetime.utcnow() - timedelta(days=days))
+    )
+    db.commit()
+    return result.rowcount
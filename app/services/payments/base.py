@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, List
 from ...models.order import Order
 
 class PaymentProvider(ABC):
@@ -23,4 +23,9 @@ class PaymentProvider(ABC):
     @abstractmethod
     def get_payment_status(self, payment_id: str) -> Dict[str, Any]:
         """Get payment status from provider"""
-        pass
\ No newline at end of file
+        pass
+    
+    @abstractmethod
+    def find_payments(self, external_reference: str) -> List[Dict[str, Any]]:
+        """Payments made against an order, newest first"""
+        pass
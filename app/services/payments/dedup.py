@@ -0,0 +1,106 @@
+import threading
+from typing import Any, Dict, Optional
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from ...config import settings
+from ...models import WebhookEvent
+from ..cache import TTLCache
+
+def notification_id(data: Dict[str, Any]) -> Optional[str]:
+    """The provider's id for a notification; the same on every resend.
+
+    IPN-style notifications have none and are not deduplicated; applying
+    them again is harmless, just not free.
+    """
+    event_id = data.get("id")
+    return str(event_id) if event_id not in (None, "") else None
+
+class RecentNotifications:
+    """In-process front of webhook deduplication.
+
+    Remembers notification ids seen in the last ttl seconds (LRU-bounded)
+    and counts lookups and duplicates, so a retry storm shows up as a
+    rising hit rate.
+    """
+
+    def __init__(self, ttl: float, maxsize: int):
+        self._seen = TTLCache(ttl=ttl, maxsize=maxsize)
+        self._lock = threading.Lock()
+        self.checked = 0
+        self.duplicates = 0
+
+    def check_and_add(self, event_id: str) -> bool:
+        """True if event_id was seen recently; otherwise remember it"""
+        with self._lock:
+            self.checked += 1
+            if self._seen.get(event_id) is not None:
+                self.duplicates += 1
+                return True
+            self._seen.set(event_id, True)
+            return False
+
+    def __contains__(self, event_id: str) -> bool:
+        with self._lock:
+            self.checked += 1
+            if self._seen.get(event_id) is not None:
+                self.duplicates += 1
+                return True
+            return False
+
+    def add(self, event_id: str):
+        self._seen.set(event_id, True)
+
+    def forget(self, event_id: str):
+        self._seen.invalidate(event_id)
+
+    def clear(self):
+        with self._lock:
+            self._seen.clear()
+            self.checked = 0
+            self.duplicates = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            checked, duplicates = self.checked, self.duplicates
+        return {
+            "checked": checked,
+            "duplicates": duplicates,
+            "hit_rate": round(duplicates / checked, 4) if checked else 0.0,
+        }
+
+# Ids acked at ingest. Kept apart from applied_notifications: with no
+# queue the same process applies the notification after acking it.
+recent_notifications = RecentNotifications(
+    ttl=settings.webhook_dedup_ttl_seconds,
+    maxsize=settings.webhook_dedup_max_entries
+)
+
+# Ids this process has applied (or found applied) in the worker
+applied_notifications = RecentNotifications(
+    ttl=settings.webhook_dedup_ttl_seconds,
+    maxsize=settings.webhook_dedup_max_entries
+)
+
+def notification_applied(db: Session, provider: str, event_id: str) -> bool:
+    """Whether the notification was already applied; takes no locks"""
+    return db.query(
+        db.query(WebhookEvent).filter(WebhookEvent.provider == provider, WebhookEvent.event_id == event_id).exists()
+    ).scalar()
+
+def claim_notification(db: Session, provider: str, event_id: str) -> bool:
+    """Record the notification in the caller's transaction.
+
+    Must be the first write of the transaction: on a duplicate it rolls
+    back and returns False. The row commits together with the payment
+    update, so a failed attempt leaves no trace and its retry runs again.
+    On PostgreSQL a concurrent duplicate waits on the unique index until
+    the first attempt commits (then it's dropped) or rolls back, so claim
+    after any provider call, not before it.
+    """
+    db.add(WebhookEvent(provider=provider, event_id=event_id))
+    try:
+        db.flush()
+    except IntegrityError:
+        db.rollback()
+        return False
+    return True
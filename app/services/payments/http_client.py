@@ -0,0 +1,267 @@
+import asyncio
+import random
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+import httpx
+import requests
+from mercadopago.http import HttpClient
+from requests.adapters import HTTPAdapter
+from ...config import settings
+
+# Provider errors worth another attempt; anything else is the answer
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Methods that are safe to resend after the request may have reached the
+# provider. A POST is only resent when it provably wasn't sent (connect
+# failure) or was refused with 429.
+IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "DELETE"}
+
+class CircuitOpenError(Exception):
+    """The provider has been failing; the call was not attempted"""
+
+class CircuitBreaker:
+    """Fails calls fast while a dependency is down.
+
+    After failure_threshold consecutive failed calls the circuit opens and
+    every call is refused for reset_timeout seconds. Then one trial call is
+    let through (half-open): success closes the circuit, failure opens it
+    for another reset_timeout.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float, name: str = "circuit"):
+        self._lock = threading.Lock()
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.name = name
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half_open"
+            return "open"
+
+    def before_call(self):
+        """Raise CircuitOpenError unless this call may go ahead"""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_running:
+                raise CircuitOpenError(f"{self.name} circuit open after {self.failures} failures")
+            self._trial_running = True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_result(self, status: int):
+        """A 4xx means the provider is up and answering; 429/5xx don't"""
+        if status in RETRY_STATUSES:
+            self.record_failure()
+        else:
+            self.record_success()
+
+    def release(self):
+        """The call was abandoned; let another one be the trial"""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_running or self.failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    print(f"{self.name} circuit opened after {self.failures} consecutive failures")
+                self._opened_at = time.monotonic()
+            self._trial_running = False
+
+def should_retry(method: str, status: Optional[int] = None, connect_failed: bool = False) -> bool:
+    """Whether a failed attempt (status None: no response) may be resent"""
+    if status is not None and status not in RETRY_STATUSES:
+        return False
+    if connect_failed or status == 429:
+        return True
+    return method.upper() in IDEMPOTENT_METHODS
+
+def backoff_delay(attempt: int, base: float) -> float:
+    """Full-jitter exponential backoff, capped at 5 seconds"""
+    return random.uniform(0, min(5.0, base * 2 ** attempt))
+
+def _parse_body(status: int, text: str, json_body) -> Dict[str, Any]:
+    try:
+        return {"status": status, "response": json_body()}
+    except ValueError:
+        # Proxies and load balancers answer outages with HTML
+        return {"status": status, "response": {"message": text[:500]}}
+
+class PooledHttpClient(HttpClient):
+    """HTTP client for the Mercado Pago SDK with one pooled keep-alive session.
+
+    Replaces mercadopago.http.HttpClient, which opens a new session (and
+    TLS connection) per call and relies on the SDK's 60 second timeout.
+    Here every call reuses up to pool_size kept-alive connections and is
+    bounded by connect and read timeouts. Failures (connection errors,
+    timeouts, 429 and 5xx) are retried a bounded number of times with
+    full-jitter backoff, and a circuit breaker shared by all calls refuses
+    requests fast while the provider keeps failing.
+    """
+
+    def __init__(
+        self,
+        pool_size: Optional[int] = None,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+        backoff: Optional[float] = None,
+        breaker: Optional[CircuitBreaker] = None
+    ):
+        self.pool_size = pool_size or settings.mercado_pago_pool_size
+        self.connect_timeout = connect_timeout or settings.mercado_pago_connect_timeout
+        self.read_timeout = read_timeout or settings.mercado_pago_read_timeout
+        self.retries = settings.mercado_pago_retries if retries is None else retries
+        self.backoff = settings.mercado_pago_retry_backoff if backoff is None else backoff
+        self.breaker = breaker or CircuitBreaker(
+            settings.mercado_pago_breaker_failures, settings.mercado_pago_breaker_reset_seconds, "Mercado Pago"
+        )
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _timeout(self, timeout: Optional[float]) -> Tuple[float, float]:
+        return (self.connect_timeout, timeout or self.read_timeout)
+
+    def request(self, method: str, url: str, maxretries: Optional[int] = None, timeout: Optional[float] = None, **kwargs) -> Dict[str, Any]:
+        """Call the API; returns {"status", "response"} like the SDK's client"""
+        retries = self.retries if maxretries is None else min(maxretries, self.retries)
+        self.breaker.before_call()
+        try:
+            result = self._send(method, url, retries, self._timeout(timeout), **kwargs)
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            self.breaker.release()
+            raise
+        self.breaker.record_result(result["status"])
+        return result
+
+    def _send(self, method: str, url: str, retries: int, timeout: Tuple[float, float], **kwargs) -> Dict[str, Any]:
+        attempt = 0
+        while True:
+            try:
+                api_result = self.session.request(method, url, timeout=timeout, **kwargs)
+            except requests.RequestException as e:
+                connect_failed = isinstance(e, requests.ConnectTimeout)
+                if attempt < retries and should_retry(method, connect_failed=connect_failed):
+                    time.sleep(backoff_delay(attempt, self.backoff))
+                    attempt += 1
+                    continue
+                raise
+            if attempt < retries and should_retry(method, api_result.status_code):
+                time.sleep(backoff_delay(attempt, self.backoff))
+                attempt += 1
+                continue
+            return _parse_body(api_result.status_code, api_result.text, api_result.json)
+
+    def get(self, url, headers, params=None, timeout=None, maxretries=None):
+        return self.request("GET", url=url, headers=headers, params=params, timeout=timeout, maxretries=maxretries)
+
+    def post(self, url, headers, data=None, params=None, timeout=None, maxretries=None):
+        return self.request("POST", url=url, headers=headers, data=data, params=params, timeout=timeout, maxretries=maxretries)
+
+    def put(self, url, headers, data=None, params=None, timeout=None, maxretries=None):
+        return self.request("PUT", url=url, headers=headers, data=data, params=params, timeout=timeout, maxretries=maxretries)
+
+    def delete(self, url, headers, params=None, timeout=None, maxretries=None):
+        return self.request("DELETE", url=url, headers=headers, params=params, timeout=timeout, maxretries=maxretries)
+
+    def close(self):
+        self.session.close()
+
+class AsyncHttpClient:
+    """Async counterpart of PooledHttpClient for async routes.
+
+    Same pool size, timeouts, retry policy and circuit breaker semantics,
+    on an httpx.AsyncClient. Pass the sync client's breaker to share one
+    view of the provider's health between both.
+    """
+
+    def __init__(
+        self,
+        base_url: str = "",
+        headers: Optional[Dict[str, str]] = None,
+        pool_size: Optional[int] = None,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+        backoff: Optional[float] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        pool_size = pool_size or settings.mercado_pago_pool_size
+        self.retries = settings.mercado_pago_retries if retries is None else retries
+        self.backoff = settings.mercado_pago_retry_backoff if backoff is None else backoff
+        self.breaker = breaker or CircuitBreaker(
+            settings.mercado_pago_breaker_failures, settings.mercado_pago_breaker_reset_seconds, "Mercado Pago"
+        )
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=httpx.Timeout(
+                read_timeout or settings.mercado_pago_read_timeout,
+                connect=connect_timeout or settings.mercado_pago_connect_timeout
+            ),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            transport=transport
+        )
+
+    async def request(self, method: str, url: str, **kwargs) -> Dict[str, Any]:
+        """Call the API; returns {"status", "response"} like the sync client"""
+        self.breaker.before_call()
+        try:
+            result = await self._send(method, url, **kwargs)
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            # Cancelled: says nothing about the provider
+            self.breaker.release()
+            raise
+        self.breaker.record_result(result["status"])
+        return result
+
+    async def _send(self, method: str, url: str, **kwargs) -> Dict[str, Any]:
+        attempt = 0
+        while True:
+            try:
+                api_result = await self.client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                connect_failed = isinstance(e, (httpx.ConnectTimeout, httpx.PoolTimeout))
+                if attempt < self.retries and should_retry(method, connect_failed=connect_failed):
+                    await asyncio.sleep(backoff_delay(attempt, self.backoff))
+                    attempt += 1
+                    continue
+                raise
+            if attempt < self.retries and should_retry(method, api_result.status_code):
+                await asyncio.sleep(backoff_delay(attempt, self.backoff))
+                attempt += 1
+                continue
+            return _parse_body(api_result.status_code, api_result.text, api_result.json)
+
+    async def get(self, url: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        return await self.request("GET", url, params=params)
+
+    async def post(self, url: str, json: Any = None) -> Dict[str, Any]:
+        return await self.request("POST", url, json=json)
+
+    async def aclose(self):
+        await self.client.aclose()
@@ -1,14 +1,45 @@
 import mercadopago
 import hmac
 import hashlib
-from typing import Dict, Any
+import requests
+from typing import Dict, Any, List, Optional
+from mercadopago.config import RequestOptions
 from .base import PaymentProvider
+from .http_client import PooledHttpClient, AsyncHttpClient, CircuitOpenError
 from ...models.order import Order
 from ...config import settings
 
+API_BASE_URL = "https://api.mercadopago.com"
+
+def payment_info_from(payment: Dict[str, Any]) -> Dict[str, Any]:
+    """The fields we keep from a Mercado Pago payment resource"""
+    return {
+        "payment_id": payment.get("id"),
+        "status": payment.get("status"),
+        "external_reference": payment.get("external_reference"),
+        "amount": payment.get("transaction_amount"),
+        "payment_method": payment.get("payment_method_id")
+    }
+
 class MercadoPagoProvider(PaymentProvider):
-    def __init__(self):
-        self.sdk = mercadopago.SDK(settings.mercado_pago_access_token)
+    """Mercado Pago through one pooled, retrying, circuit-broken HTTP client.
+
+    The SDK passes its request options (timeout, retries) on every call;
+    they are set from our settings so SDK and client agree. Async routes
+    use get_payment_status_async, which shares the client's breaker.
+    """
+
+    def __init__(self, http_client: Optional[PooledHttpClient] = None):
+        self.http_client = http_client or PooledHttpClient()
+        self.sdk = mercadopago.SDK(
+            settings.mercado_pago_access_token,
+            http_client=self.http_client,
+            request_options=RequestOptions(
+                connection_timeout=float(self.http_client.read_timeout),
+                max_retries=self.http_client.retries
+            )
+        )
+        self._async_client: Optional[AsyncHttpClient] = None
     
     def create_payment(self, order: Order) -> Dict[str, Any]:
         """Create Mercado Pago preference"""
@@ -40,7 +71,10 @@ class MercadoPagoProvider(PaymentProvider):
             "auto_return": "approved"
         }
         
-        response = self.sdk.preference().create(preference_data)
+        try:
+            response = self.sdk.preference().create(preference_data)
+        except (CircuitOpenError, requests.RequestException) as e:
+            return {"success": False, "error": str(e)}
         
         if response["status"] == 201:
             return {
@@ -70,16 +104,22 @@ class MercadoPagoProvider(PaymentProvider):
             payment_id = data["data"]["id"]
             payment_info = self.get_payment_status(payment_id)
             
-            return {
-                "payment_id": payment_id,
-                "status": payment_info.get("status"),
-                "external_reference": payment_info.get("external_reference"),
-                "amount": payment_info.get("transaction_amount"),
-                "payment_method": payment_info.get("payment_method_id")
-            }
+            return dict(payment_info_from(payment_info), payment_id=payment_id)
         
         return {}
     
+    def find_payments(self, external_reference: str) -> List[Dict[str, Any]]:
+        """Payments made against an order, newest first; raises if the search fails"""
+        response = self.sdk.payment().search(filters={
+            "external_reference": external_reference,
+            "sort": "date_created",
+            "criteria": "desc"
+        })
+        
+        if response["status"] != 200:
+            raise RuntimeError(f"Mercado Pago payment search failed ({response['status']}): {response['response']}")
+        return [payment_info_from(payment) for payment in response["response"].get("results", [])]
+    
     def get_payment_status(self, payment_id: str) -> Dict[str, Any]:
         """Get payment status from Mercado Pago"""
         response = self.sdk.payment().get(payment_id)
@@ -87,4 +127,29 @@ class MercadoPagoProvider(PaymentProvider):
         if response["status"] == 200:
             return response["response"]
         else:
-            return {}
\ No newline at end of file
+            return {}
+
+    @property
+    def async_client(self) -> AsyncHttpClient:
+        if self._async_client is None:
+            self._async_client = AsyncHttpClient(
+                base_url=API_BASE_URL,
+                headers={"Authorization": f"Bearer {settings.mercado_pago_access_token}"},
+                breaker=self.http_client.breaker
+            )
+        return self._async_client
+
+    async def get_payment_status_async(self, payment_id: str) -> Dict[str, Any]:
+        """get_payment_status for async routes, without blocking the event loop"""
+        response = await self.async_client.get(f"/v1/payments/{payment_id}")
+
+        if response["status"] == 200:
+            return response["response"]
+        else:
+            return {}
+
+    async def aclose(self):
+        self.http_client.close()
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
@@ -0,0 +1,127 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session
+from ...models import Order
+from ...models.order import OrderStatus
+from ...models.payment import PaymentStatus
+from ...config import settings
+from ...tasks import metrics
+from ..orders import mark_orders_paid
+from ..throttle import TokenBucket
+from .base import PaymentProvider
+from .http_client import CircuitOpenError
+from .webhooks import get_payment_provider, record_payments
+
+def pending_orders(db: Session, since: datetime, until: datetime, after: Tuple[datetime, int], limit: int):
+    """Next keyset page of pending orders created in [since, until).
+
+    Served by the partial ix_orders_pending_created_at_id index, so each
+    page is an index range scan however many paid orders the table holds.
+    """
+    return db.query(Order.id, Order.created_at, Order.total_amount).filter(
+        Order.status == OrderStatus.PENDING.value,
+        Order.created_at >= since,
+        Order.created_at < until,
+        tuple_(Order.created_at, Order.id) > after
+    ).order_by(Order.created_at, Order.id).limit(limit).all()
+
+class PaymentReconciler:
+    """Finds payments whose webhooks never arrived and applies them.
+
+    Pending orders created between lookback_hours ago and grace_minutes ago
+    (younger ones still have their webhook in flight) are read in keyset
+    pages of batch_size. Each order's payments are searched for at the
+    provider by external reference on a pool of concurrency threads that
+    share a rate_limit token bucket, so the job stays under the provider's
+    limits however many orders are pending. Every page is then applied
+    with one Payment upsert and one bulk mark_orders_paid, and committed.
+
+    An open circuit breaker stops the run after applying what was fetched;
+    the next run picks the remaining orders up.
+    """
+
+    def __init__(
+        self,
+        provider: Optional[PaymentProvider] = None,
+        concurrency: Optional[int] = None,
+        rate_limit: Optional[float] = None,
+        batch_size: Optional[int] = None,
+        lookback_hours: Optional[float] = None,
+        grace_minutes: Optional[float] = None
+    ):
+        self.provider = provider or get_payment_provider()
+        self.concurrency = concurrency or settings.reconcile_concurrency
+        self.batch_size = batch_size or settings.reconcile_batch_size
+        self.lookback = timedelta(hours=lookback_hours or settings.reconcile_lookback_hours)
+        self.grace = timedelta(minutes=settings.reconcile_grace_minutes if grace_minutes is None else grace_minutes)
+        # Burst no larger than the pool, so a fresh run starts at the rate
+        self.bucket = TokenBucket(rate_limit or settings.reconcile_rate_limit, capacity=self.concurrency)
+
+    def lookup(self, order_id: int) -> Tuple[int, Any]:
+        """Payments of one order, or the exception that prevented finding them"""
+        self.bucket.acquire()
+        try:
+            return order_id, self.provider.find_payments(str(order_id))
+        except Exception as e:
+            return order_id, e
+
+    def apply(self, db: Session, orders: List[Any], results: List[Tuple[int, Any]]) -> Dict[str, int]:
+        """Record the payments found and mark approved orders paid; commits"""
+        by_id = {order.id: order for order in orders}
+        counts = {"paid": 0, "unpaid": 0, "no_payment": 0, "error": 0}
+        found = []
+        approved = []
+        for order_id, payments in results:
+            if isinstance(payments, Exception):
+                counts["error"] += 1
+                continue
+            if not payments:
+                counts["no_payment"] += 1
+                continue
+            found.extend((by_id[order_id], info) for info in payments if info.get("payment_id"))
+            if any(info.get("status") == PaymentStatus.APPROVED for info in payments):
+                approved.append(order_id)
+            else:
+                counts["unpaid"] += 1
+
+        if found:
+            record_payments(db, found)
+        paid = mark_orders_paid(db, approved)
+        db.commit()
+        # Approved but already paid: a webhook got there first
+        counts["paid"] = len(paid)
+        counts["unpaid"] += len(approved) - len(paid)
+        for result, count in counts.items():
+            if count:
+                metrics.RECONCILED_ORDERS.labels(result=result).inc(count)
+        return counts
+
+    def run_once(self, db: Session, now: Optional[datetime] = None) -> Dict[str, int]:
+        """Reconcile every pending order in the window; returns counts by result"""
+        now = now or datetime.utcnow()
+        since, until = now - self.lookback, now - self.grace
+        after = (since, 0)
+        totals = {"checked": 0, "paid": 0, "unpaid": 0, "no_payment": 0, "error": 0}
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="reconcile") as pool:
+            while True:
+                orders = pending_orders(db, since, until, after, self.batch_size)
+                # Don't hold the snapshot (or locks) while the provider is called
+                db.rollback()
+                if not orders:
+                    break
+                after = (orders[-1].created_at, orders[-1].id)
+
+                results = list(pool.map(self.lookup, [order.id for order in orders]))
+                totals["checked"] += len(orders)
+                for result, count in self.apply(db, orders, results).items():
+                    totals[result] += count
+
+                breaker_open = next((e for _, e in results if isinstance(e, CircuitOpenError)), None)
+                if breaker_open is not None:
+                    raise breaker_open
+                if len(orders) < self.batch_size:
+                    break
+        return totals
@@ -1,50 +1,153 @@
 import qrcode
+from qrcode.image.svg import SvgPathImage
+import base64
 import hashlib
 import hmac
+from functools import lru_cache
 from io import BytesIO
-from typing import Dict, Any
-from ...config import settings
+from typing import Dict, Any, Tuple
+from ...config import settings, parse_qr_signing_keys
+
+# Compact payload: base32 (QR alphanumeric mode) of
+#   [version:4 bits | key id:4 bits] [order_id varint] [attendee_id varint] [MAC]
+# Typical IDs give 24 characters, which fits a version 1 QR code.
+PAYLOAD_VERSION = 1
+MAC_BYTES = 8
+LEGACY_KEY_ID = 0
+
+@lru_cache()
+def _signing_keys() -> Dict[int, bytes]:
+    """Key id -> secret. Key 0 is secret_key, which also signs legacy codes"""
+    keys = {LEGACY_KEY_ID: settings.secret_key.encode()}
+    for key_id, secret in parse_qr_signing_keys(settings.qr_signing_keys).items():
+        keys[key_id] = secret.encode()
+    return keys
+
+@lru_cache()
+def _hmac_states() -> Dict[int, "hmac.HMAC"]:
+    """Keyed HMAC states, built once and copied per call"""
+    return {
+        key_id: hmac.new(secret, digestmod=hashlib.sha256)
+        for key_id, secret in _signing_keys().items()
+    }
+
+def _mac(key_id: int, data: bytes) -> bytes:
+    state = _hmac_states()[key_id].copy()
+    state.update(data)
+    return state.digest()
+
+def _encode_varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+def _decode_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+        if shift > 63:
+            raise ValueError("varint too long")
+
+# RFC 4648 base32 alphabet mapped onto int(..., 32) digits; decoding through
+# int() is several times faster than base64.b32decode for short payloads
+_B32_TO_INT_DIGITS = str.maketrans(
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZ234567",
+    "0123456789abcdefghijklmnopqrstuv"
+)
+_B32_ALPHABET = set("ABCDEFGHIJKLMNOPQRSTUVWXYZ234567")
+
+def _b32decode(text: str) -> bytes:
+    """Decode unpadded base32, rejecting non-canonical trailing bits"""
+    if not _B32_ALPHABET.issuperset(text):
+        raise ValueError("invalid base32")
+    length = len(text) * 5 // 8
+    pad_bits = len(text) * 5 - length * 8
+    value = int(text.translate(_B32_TO_INT_DIGITS), 32)
+    if value & ((1 << pad_bits) - 1):
+        raise ValueError("non-canonical base32")
+    return (value >> pad_bits).to_bytes(length, "big")
 
 def generate_qr_payload(order_id: int, attendee_id: int) -> str:
     """Generate signed QR code payload"""
+    key_id = settings.qr_active_key_id
+    body = bytes([PAYLOAD_VERSION << 4 | key_id]) + _encode_varint(order_id) + _encode_varint(attendee_id)
+    raw = body + _mac(key_id, body)[:MAC_BYTES]
+    return base64.b32encode(raw).decode().rstrip("=")
+
+def _verify_legacy_payload(payload: str) -> Dict[str, Any]:
+    """Verify an order:attendee:signature payload issued before the compact format"""
+    parts = payload.split(":")
+    if len(parts) != 3:
+        return {"valid": False}
+    
+    order_id, attendee_id, signature = parts
     data = f"{order_id}:{attendee_id}"
-    signature = hmac.new(
-        settings.secret_key.encode(),
-        data.encode(),
-        hashlib.sha256
-    ).hexdigest()[:16]  # First 16 chars
+    expected_signature = _mac(LEGACY_KEY_ID, data.encode()).hex()[:16]
     
-    return f"{data}:{signature}"
+    if not hmac.compare_digest(signature, expected_signature):
+        return {"valid": False}
+    
+    return {
+        "valid": True,
+        "order_id": int(order_id),
+        "attendee_id": int(attendee_id)
+    }
 
 def verify_qr_payload(payload: str) -> Dict[str, Any]:
     """Verify QR code payload"""
     try:
-        parts = payload.split(":")
-        if len(parts) != 3:
-            return {"valid": False}
+        if ":" in payload:
+            return _verify_legacy_payload(payload)
         
-        order_id, attendee_id, signature = parts
-        data = f"{order_id}:{attendee_id}"
+        raw = _b32decode(payload)
+        if len(raw) < 3 + MAC_BYTES or raw[0] >> 4 != PAYLOAD_VERSION:
+            return {"valid": False}
         
-        expected_signature = hmac.new(
-            settings.secret_key.encode(),
-            data.encode(),
-            hashlib.sha256
-        ).hexdigest()[:16]
+        key_id = raw[0] & 0x0F
+        body, signature = raw[:-MAC_BYTES], raw[-MAC_BYTES:]
+        if key_id not in _hmac_states():
+            return {"valid": False}
+        if not hmac.compare_digest(signature, _mac(key_id, body)[:MAC_BYTES]):
+            return {"valid": False}
         
-        if not hmac.compare_digest(signature, expected_signature):
+        order_id, pos = _decode_varint(body, 1)
+        attendee_id, pos = _decode_varint(body, pos)
+        if pos != len(body):
             return {"valid": False}
         
         return {
             "valid": True,
-            "order_id": int(order_id),
-            "attendee_id": int(attendee_id)
+            "order_id": order_id,
+            "attendee_id": attendee_id,
+            "key_id": key_id
         }
     except (ValueError, IndexError):
         return {"valid": False}
 
-def generate_qr_code(payload: str) -> bytes:
-    """Generate QR code image"""
+def render_qr_image(payload: str, fmt: str = "png") -> bytes:
+    """Render a QR code as a 1-bit PNG or an SVG path"""
+    if fmt == "svg":
+        qr = qrcode.QRCode(
+            error_correction=qrcode.constants.ERROR_CORRECT_L,
+            border=4,
+            image_factory=SvgPathImage
+        )
+        qr.add_data(payload)
+        qr.make(fit=True)
+        return qr.make_image().to_string()
+    
     qr = qrcode.QRCode(
         version=1,
         error_correction=qrcode.constants.ERROR_CORRECT_L,
@@ -54,9 +157,13 @@ def generate_qr_code(payload: str) -> bytes:
     qr.add_data(payload)
     qr.make(fit=True)
     
-    img = qr.make_image(fill_color="black", back_color="white")
+    img = qr.make_image(fill_color="black", back_color="white").get_image().convert("1")
     
     # Convert to bytes
     img_buffer = BytesIO()
-    img.save(img_buffer, format='PNG')
-    return img_buffer.getvalue()
\ No newline at end of file
+    img.save(img_buffer, format='PNG', optimize=True)
+    return img_buffer.getvalue()
+
+def generate_qr_code(payload: str) -> bytes:
+    """Generate QR code image"""
+    return render_qr_image(payload, "png")
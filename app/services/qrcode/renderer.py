@@ -0,0 +1,172 @@
+import hashlib
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Optional
+from ...config import settings
+from ..storage import S3Storage
+from .generator import render_qr_image
+
+# Bump when render_qr_image output changes so stale cache entries are ignored
+RENDER_VERSION = 1
+
+CONTENT_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+
+# Below this many misses the process pool costs more than it saves
+POOL_THRESHOLD = 16
+
+# Eviction trims the disk cache to this fraction of its cap, so it doesn't
+# rescan the directory on every write once full
+EVICT_TO = 0.8
+
+def _render(args) -> bytes:
+    payload, fmt = args
+    return render_qr_image(payload, fmt)
+
+class QRRenderer:
+    """QR image rendering with a content-addressed cache.
+
+    Images are keyed by a hash of payload and format, stored on local disk
+    and, when S3 backing is enabled, in the assets bucket so every worker
+    serves the same bytes. Cache misses in a batch are rendered in a
+    process pool. The disk cache is capped at max_bytes; hits refresh a
+    file's mtime and the least recently used files are evicted first.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        storage: Optional[S3Storage] = None,
+        workers: Optional[int] = None,
+        max_bytes: Optional[int] = None
+    ):
+        self.cache_dir = cache_dir or settings.qr_cache_dir
+        self.max_bytes = settings.qr_cache_max_bytes if max_bytes is None else max_bytes
+        self._disk_bytes: Optional[int] = None
+        self._disk_lock = threading.Lock()
+        self.storage = storage if storage is not None else (S3Storage() if settings.qr_cache_s3 else None)
+        self.workers = workers if workers is not None else (settings.qr_render_workers or os.cpu_count())
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def cache_key(payload: str, fmt: str = "png") -> str:
+        return hashlib.sha256(f"{RENDER_VERSION}:{fmt}:{payload}".encode()).hexdigest()
+
+    def _path(self, key: str, fmt: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.{fmt}")
+
+    def _s3_key(self, key: str, fmt: str) -> str:
+        return f"qr/{key[:2]}/{key}.{fmt}"
+
+    def _read_cached(self, key: str, fmt: str) -> Optional[bytes]:
+        path = self._path(key, fmt)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+            return data
+        except FileNotFoundError:
+            pass
+
+        if self.storage:
+            data = self.storage.download_file(self._s3_key(key, fmt))
+            if data is not None:
+                self._write_local(key, fmt, data)
+                return data
+        return None
+
+    def _write_local(self, key: str, fmt: str, data: bytes):
+        path = self._path(key, fmt)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write-then-rename so concurrent readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self._account(len(data))
+
+    def _cached_files(self):
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield stat.st_mtime, stat.st_size, path
+
+    def _account(self, added: int):
+        """Track disk usage; evict least recently used files over the cap.
+
+        The running total is per process and other processes share the
+        directory, so eviction recounts from disk before deleting.
+        """
+        with self._disk_lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = sum(size for _, size, _ in self._cached_files())
+            else:
+                self._disk_bytes += added
+            if self._disk_bytes <= self.max_bytes:
+                return
+            files = sorted(self._cached_files())
+            total = sum(size for _, size, _ in files)
+            target = self.max_bytes * EVICT_TO
+            for _, size, path in files:
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+            self._disk_bytes = total
+
+    def _store(self, key: str, fmt: str, data: bytes):
+        self._write_local(key, fmt, data)
+        if self.storage:
+            self.storage.upload_file(data, self._s3_key(key, fmt), CONTENT_TYPES[fmt])
+
+    def render(self, payload: str, fmt: str = "png") -> bytes:
+        """Image bytes for one payload, rendered only on a cache miss"""
+        return self.render_many([payload], fmt)[payload]
+
+    def render_many(self, payloads: Iterable[str], fmt: str = "png") -> Dict[str, bytes]:
+        """Image bytes for many payloads; misses are rendered in parallel"""
+        if fmt not in CONTENT_TYPES:
+            raise ValueError(f"Unsupported QR image format: {fmt}")
+
+        images: Dict[str, bytes] = {}
+        misses = []
+        for payload in dict.fromkeys(payloads):
+            cached = self._read_cached(self.cache_key(payload, fmt), fmt)
+            if cached is None:
+                misses.append(payload)
+            else:
+                images[payload] = cached
+
+        if len(misses) >= POOL_THRESHOLD and self.workers > 1:
+            chunksize = max(1, len(misses) // (self.workers * 4))
+            rendered = self._get_pool().map(_render, [(p, fmt) for p in misses], chunksize=chunksize)
+        else:
+            rendered = (_render((p, fmt)) for p in misses)
+
+        for payload, data in zip(misses, rendered):
+            self._store(self.cache_key(payload, fmt), fmt, data)
+            images[payload] = data
+        return images
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        # Worker threads share one renderer
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool
+
+    def close(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
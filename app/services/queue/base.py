@@ -0,0 +1,80 @@
+import json
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Any, List, Optional, Tuple
+
+class QueueMessage:
+    """A received message.
+
+    receipt identifies this delivery (SQS receipt handle, stream entry id,
+    local row receipt) and is what ack/retry/extend operate on. attempts
+    counts deliveries including this one. sent_at is when the message was
+    (last) enqueued, as a Unix timestamp, if the backend knows it.
+    """
+
+    def __init__(self, id: str, body: str, receipt: str, attempts: int = 1, sent_at: Optional[float] = None):
+        self.id = id
+        self.body = body
+        self.receipt = receipt
+        self.attempts = attempts
+        self.sent_at = sent_at
+        self.received_at = time.time()
+
+    def json(self) -> Dict[str, Any]:
+        return json.loads(self.body)
+
+    def __repr__(self):
+        return f"QueueMessage(id={self.id!r}, attempts={self.attempts})"
+
+class QueueBackend(ABC):
+    """Base class for worker queue backends.
+
+    Every operation works on batches so a backend can map it to one round
+    trip. Delivery is at-least-once: a message that isn't acked before its
+    visibility timeout runs out is delivered again.
+    """
+
+    # Whether dead_letter() has somewhere to put messages
+    supports_dead_letter = True
+
+    @abstractmethod
+    def send_batch(self, bodies: List[Dict[str, Any]]) -> None:
+        """Enqueue JSON-serializable message bodies"""
+        pass
+
+    @abstractmethod
+    def receive(self, max_messages: int = 10, wait_seconds: int = 20, visibility_timeout: int = 60) -> List[QueueMessage]:
+        """Receive up to max_messages, waiting up to wait_seconds for the first one"""
+        pass
+
+    @abstractmethod
+    def ack(self, messages: List[QueueMessage]) -> List[QueueMessage]:
+        """Remove processed messages; returns the ones that couldn't be removed"""
+        pass
+
+    @abstractmethod
+    def retry(self, retries: List[Tuple[QueueMessage, int]]) -> None:
+        """Make each message visible again after its delay in seconds"""
+        pass
+
+    @abstractmethod
+    def extend(self, messages: List[QueueMessage], visibility_timeout: int) -> None:
+        """Reset the visibility timeout of in-flight messages"""
+        pass
+
+    @abstractmethod
+    def dead_letter(self, entries: List[Tuple[QueueMessage, str]]) -> List[QueueMessage]:
+        """Move messages with their error to the dead-letter queue; returns the moved ones"""
+        pass
+
+    @abstractmethod
+    def depth(self) -> int:
+        """Approximate number of messages waiting to be received"""
+        pass
+
+    def send(self, body: Dict[str, Any]) -> None:
+        self.send_batch([body])
+
+def chunks(items: list, size: int = 10) -> list:
+    """Split items into lists of at most size (SQS batch calls take 10)"""
+    return [items[start:start + size] for start in range(0, len(items), size)]
@@ -0,0 +1,57 @@
+from functools import lru_cache
+from typing import Dict, Any, List
+from ...config import settings
+from .base import QueueBackend
+
+BACKENDS = ("sqs", "redis", "local")
+
+# Message types that must not wait behind bulk work; everything else
+# goes to the default lane
+PRIORITY_LANE = "priority"
+DEFAULT_LANE = "default"
+MESSAGE_LANES = {
+    "payment_webhook": PRIORITY_LANE,
+}
+
+def queue_enabled() -> bool:
+    """Whether a queue is configured for this environment"""
+    return settings.queue_backend != "sqs" or bool(settings.sqs_queue_url)
+
+def lane_for(message_type: str) -> str:
+    return MESSAGE_LANES.get(message_type, DEFAULT_LANE)
+
+def configured_lanes() -> List[str]:
+    """Lanes with a queue of their own, highest priority first.
+
+    SQS needs SQS_PRIORITY_QUEUE_URL for a separate priority queue; without
+    it every type shares the default queue as before.
+    """
+    if settings.queue_backend == "sqs" and not settings.sqs_priority_queue_url:
+        return [DEFAULT_LANE]
+    return [PRIORITY_LANE, DEFAULT_LANE]
+
+@lru_cache()
+def get_queue(lane: str = DEFAULT_LANE) -> QueueBackend:
+    """The worker queue for a lane, selected by QUEUE_BACKEND (sqs, redis or local)"""
+    if lane not in configured_lanes():
+        lane = DEFAULT_LANE
+    backend = settings.queue_backend
+    name = settings.queue_name if lane == DEFAULT_LANE else f"{settings.queue_name}-{lane}"
+    if backend == "sqs":
+        from .sqs import SQSQueue
+        return SQSQueue(queue_url=settings.sqs_priority_queue_url if lane == PRIORITY_LANE else None)
+    if backend == "redis":
+        from .redis_streams import RedisStreamQueue
+        return RedisStreamQueue(stream=name)
+    if backend == "local":
+        from .local import LocalQueue
+        return LocalQueue(name=name)
+    raise ValueError(f"Unknown queue backend {backend!r}; expected one of {', '.join(BACKENDS)}")
+
+def enqueue(bodies: List[Dict[str, Any]]) -> None:
+    """Send messages to the lane of their type, one batch per lane"""
+    by_lane: Dict[str, List[Dict[str, Any]]] = {}
+    for body in bodies:
+        by_lane.setdefault(lane_for(body.get("type")), []).append(body)
+    for lane, lane_bodies in by_lane.items():
+        get_queue(lane).send_batch(lane_bodies)
@@ -0,0 +1,153 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, Any, List, Optional, Tuple
+from ...config import settings
+from .base import QueueBackend, QueueMessage
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS queue_messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    queue TEXT NOT NULL,
+    body TEXT NOT NULL,
+    visible_at REAL NOT NULL,
+    sent_at REAL,
+    receive_count INTEGER NOT NULL DEFAULT 0,
+    receipt TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_queue_messages_queue_visible_at ON queue_messages (queue, visible_at);
+CREATE TABLE IF NOT EXISTS queue_dead_letters (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    queue TEXT NOT NULL,
+    body TEXT NOT NULL,
+    error TEXT,
+    attempts INTEGER,
+    source_message_id TEXT,
+    created_at REAL NOT NULL
+);
+"""
+
+# How often a waiting receive re-checks for messages sent by other processes
+POLL_INTERVAL = 0.05
+
+class LocalQueue(QueueBackend):
+    """SQLite-backed queue for development, tests and single-box load tests.
+
+    path=":memory:" gives an in-process queue; a file path can be shared by
+    several worker processes on one machine. Visibility timeouts, receive
+    counts and dead letters behave like SQS.
+    """
+
+    def __init__(self, path: Optional[str] = None, name: Optional[str] = None):
+        self.path = path or settings.local_queue_path
+        self.name = name or settings.queue_name
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+        if self.path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._sent = threading.Condition(self._lock)
+
+    def send_batch(self, bodies: List[Dict[str, Any]]) -> None:
+        now = time.time()
+        with self._sent:
+            self._conn.executemany(
+                "INSERT INTO queue_messages (queue, body, visible_at, sent_at) VALUES (?, ?, ?, ?)",
+                [(self.name, json.dumps(body), now, now) for body in bodies]
+            )
+            self._sent.notify_all()
+
+    def _claim(self, max_messages: int, visibility_timeout: int) -> List[QueueMessage]:
+        now = time.time()
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = self._conn.execute(
+                "SELECT id, body, receive_count, sent_at FROM queue_messages "
+                "WHERE queue = ? AND visible_at <= ? ORDER BY visible_at, id LIMIT ?",
+                (self.name, now, max_messages)
+            ).fetchall()
+            messages = [
+                QueueMessage(id=str(id), body=body, receipt=uuid.uuid4().hex, attempts=count + 1, sent_at=sent_at)
+                for id, body, count, sent_at in rows
+            ]
+            self._conn.executemany(
+                "UPDATE queue_messages SET visible_at = ?, receive_count = receive_count + 1, receipt = ? "
+                "WHERE id = ?",
+                [(now + visibility_timeout, m.receipt, int(m.id)) for m in messages]
+            )
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        return messages
+
+    def receive(self, max_messages: int = 10, wait_seconds: int = 20, visibility_timeout: int = 60) -> List[QueueMessage]:
+        deadline = time.monotonic() + wait_seconds
+        with self._sent:
+            while True:
+                messages = self._claim(max_messages, visibility_timeout)
+                remaining = deadline - time.monotonic()
+                if messages or remaining <= 0:
+                    return messages
+                self._sent.wait(min(remaining, POLL_INTERVAL))
+
+    def ack(self, messages: List[QueueMessage]) -> List[QueueMessage]:
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM queue_messages WHERE id = ? AND receipt = ?",
+                [(int(m.id), m.receipt) for m in messages]
+            )
+        return []
+
+    def retry(self, retries: List[Tuple[QueueMessage, int]]) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE queue_messages SET visible_at = ? WHERE id = ? AND receipt = ?",
+                [(now + delay, int(m.id), m.receipt) for m, delay in retries]
+            )
+
+    def extend(self, messages: List[QueueMessage], visibility_timeout: int) -> None:
+        self.retry([(message, visibility_timeout) for message in messages])
+
+    def depth(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM queue_messages WHERE queue = ? AND visible_at <= ?",
+                (self.name, time.time())
+            ).fetchone()[0]
+
+    def dead_letter(self, entries: List[Tuple[QueueMessage, str]]) -> List[QueueMessage]:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO queue_dead_letters (queue, body, error, attempts, source_message_id, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [(self.name, m.body, error, m.attempts, m.id, now) for m, error in entries]
+                )
+                self._conn.executemany(
+                    "DELETE FROM queue_messages WHERE id = ? AND receipt = ?",
+                    [(int(m.id), m.receipt) for m, _ in entries]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [m for m, _ in entries]
+
+    def dead_letters(self) -> List[Dict[str, Any]]:
+        """Dead-lettered messages of this queue, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT body, error, attempts, source_message_id FROM queue_dead_letters "
+                "WHERE queue = ? ORDER BY id",
+                (self.name,)
+            ).fetchall()
+        return [
+            {"body": body, "error": error, "attempts": attempts, "source_message_id": source}
+            for body, error, attempts, source in rows
+        ]
@@ -0,0 +1,157 @@
+import json
+import time
+import redis
+from typing import Dict, Any, List, Optional, Tuple
+from ...config import settings
+from .base import QueueBackend, QueueMessage
+
+# Moves due delayed retries back onto the stream atomically, so a crash
+# between the two steps can't lose a message
+PROMOTE_DUE = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, member in ipairs(due) do
+    redis.call('ZREM', KEYS[1], member)
+    local entry = cjson.decode(member)
+    redis.call('XADD', KEYS[2], '*', 'body', entry['body'], 'attempt', entry['attempt'])
+end
+return #due
+"""
+
+class RedisStreamQueue(QueueBackend):
+    """Redis Streams backend using a consumer group.
+
+    Messages are stream entries; the group's pending list plays the role
+    of SQS in-flight messages. Entries idle for longer than the visibility
+    timeout are reclaimed by the next receive, extend() resets idle time
+    with XCLAIM, and delayed retries wait in a sorted set until due. Dead
+    letters go to a "<stream>:dead" stream.
+
+    Redeliveries after a consumer crash don't count towards attempts; only
+    explicit retries do.
+    """
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        stream: Optional[str] = None,
+        group: str = "workers",
+        consumer: Optional[str] = None,
+        client=None
+    ):
+        self.redis = client or redis.from_url(url or settings.redis_url or "redis://localhost:6379/0")
+        self.stream = stream or settings.queue_name
+        self.group = group
+        self.consumer = consumer or f"worker-{id(self):x}"
+        self.delayed_key = f"{self.stream}:delayed"
+        self.dead_stream = f"{self.stream}:dead"
+        self._promote = self.redis.register_script(PROMOTE_DUE)
+        try:
+            self.redis.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    def send_batch(self, bodies: List[Dict[str, Any]]) -> None:
+        pipe = self.redis.pipeline(transaction=False)
+        for body in bodies:
+            pipe.xadd(self.stream, {"body": json.dumps(body), "attempt": 0})
+        pipe.execute()
+
+    @staticmethod
+    def _message(entry_id, fields) -> QueueMessage:
+        entry_id = entry_id.decode() if isinstance(entry_id, bytes) else entry_id
+        fields = {
+            (k.decode() if isinstance(k, bytes) else k): (v.decode() if isinstance(v, bytes) else v)
+            for k, v in fields.items()
+        }
+        return QueueMessage(
+            id=entry_id,
+            body=fields["body"],
+            receipt=entry_id,
+            attempts=int(fields.get("attempt", 0)) + 1,
+            # Entry ids start with their creation time in milliseconds
+            sent_at=int(entry_id.split("-")[0]) / 1000
+        )
+
+    def receive(self, max_messages: int = 10, wait_seconds: int = 20, visibility_timeout: int = 60) -> List[QueueMessage]:
+        self._promote(keys=[self.delayed_key, self.stream], args=[time.time(), 100])
+
+        # Entries abandoned by a consumer for longer than the visibility timeout
+        _, claimed, *_ = self.redis.xautoclaim(
+            self.stream, self.group, self.consumer,
+            min_idle_time=visibility_timeout * 1000,
+            start_id="0-0",
+            count=max_messages
+        )
+        messages = [self._message(entry_id, fields) for entry_id, fields in claimed if fields]
+        if len(messages) >= max_messages:
+            return messages
+
+        response = self.redis.xreadgroup(
+            self.group, self.consumer, {self.stream: ">"},
+            count=max_messages - len(messages),
+            block=None if messages or not wait_seconds else wait_seconds * 1000
+        )
+        for _, entries in response or []:
+            messages.extend(self._message(entry_id, fields) for entry_id, fields in entries)
+        return messages
+
+    def ack(self, messages: List[QueueMessage]) -> List[QueueMessage]:
+        if messages:
+            ids = [m.receipt for m in messages]
+            pipe = self.redis.pipeline()
+            pipe.xack(self.stream, self.group, *ids)
+            pipe.xdel(self.stream, *ids)
+            pipe.execute()
+        return []
+
+    def retry(self, retries: List[Tuple[QueueMessage, int]]) -> None:
+        """Park each message in the delayed set and drop the stream entry"""
+        if not retries:
+            return
+        now = time.time()
+        pipe = self.redis.pipeline()
+        for message, delay in retries:
+            member = json.dumps({"id": message.id, "body": message.body, "attempt": message.attempts})
+            pipe.zadd(self.delayed_key, {member: now + delay})
+        ids = [m.receipt for m, _ in retries]
+        pipe.xack(self.stream, self.group, *ids)
+        pipe.xdel(self.stream, *ids)
+        pipe.execute()
+
+    def extend(self, messages: List[QueueMessage], visibility_timeout: int) -> None:
+        if messages:
+            # Claiming to ourselves resets the entries' idle time
+            self.redis.xclaim(
+                self.stream, self.group, self.consumer,
+                min_idle_time=0,
+                message_ids=[m.receipt for m in messages],
+                justid=True
+            )
+
+    def depth(self) -> int:
+        """Entries not yet delivered to a consumer plus delayed retries that are due"""
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.xlen(self.stream)
+        pipe.xpending(self.stream, self.group)
+        pipe.zcount(self.delayed_key, "-inf", time.time())
+        length, pending, due = pipe.execute()
+        # Acked entries are deleted, so the stream holds waiting plus pending
+        return max(0, length - pending["pending"]) + due
+
+    def dead_letter(self, entries: List[Tuple[QueueMessage, str]]) -> List[QueueMessage]:
+        if not entries:
+            return []
+        pipe = self.redis.pipeline()
+        for message, error in entries:
+            pipe.xadd(self.dead_stream, {
+                "body": message.body,
+                "error": error,
+                "attempts": message.attempts,
+                "source_message_id": message.id
+            })
+        ids = [m.receipt for m, _ in entries]
+        pipe.xack(self.stream, self.group, *ids)
+        pipe.xdel(self.stream, *ids)
+        pipe.execute()
+        return [m for m, _ in entries]
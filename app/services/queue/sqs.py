@@ -0,0 +1,113 @@
+import json
+import boto3
+from typing import Dict, Any, List, Optional, Tuple
+from ...config import settings
+from .base import QueueBackend, QueueMessage, chunks
+
+class SQSQueue(QueueBackend):
+    """Amazon SQS backend; every batch operation is one API call per 10 messages"""
+
+    def __init__(self, queue_url: Optional[str] = None, dlq_url: Optional[str] = None, client=None):
+        self.sqs = client or boto3.client('sqs', region_name=settings.aws_region)
+        self.queue_url = queue_url or settings.sqs_queue_url
+        self.dlq_url = settings.sqs_dlq_url if dlq_url is None else dlq_url
+        self.supports_dead_letter = bool(self.dlq_url)
+
+    def send_batch(self, bodies: List[Dict[str, Any]]) -> None:
+        for chunk in chunks(bodies):
+            response = self.sqs.send_message_batch(
+                QueueUrl=self.queue_url,
+                Entries=[{'Id': str(i), 'MessageBody': json.dumps(body)} for i, body in enumerate(chunk)]
+            )
+            if response.get('Failed'):
+                raise RuntimeError(f"SQS send failed for {len(response['Failed'])} message(s)")
+
+    def receive(self, max_messages: int = 10, wait_seconds: int = 20, visibility_timeout: int = 60) -> List[QueueMessage]:
+        response = self.sqs.receive_message(
+            QueueUrl=self.queue_url,
+            MaxNumberOfMessages=min(max_messages, 10),
+            WaitTimeSeconds=wait_seconds,
+            MessageAttributeNames=['All'],
+            AttributeNames=['ApproximateReceiveCount', 'SentTimestamp'],
+            VisibilityTimeout=visibility_timeout
+        )
+        messages = []
+        for message in response.get('Messages', []):
+            attributes = message.get('Attributes', {})
+            sent_ms = attributes.get('SentTimestamp')
+            messages.append(QueueMessage(
+                id=message['MessageId'],
+                body=message['Body'],
+                receipt=message['ReceiptHandle'],
+                attempts=int(attributes.get('ApproximateReceiveCount', 1)),
+                sent_at=int(sent_ms) / 1000 if sent_ms else None
+            ))
+        return messages
+
+    def ack(self, messages: List[QueueMessage]) -> List[QueueMessage]:
+        """delete_message_batch, retrying entries that failed for a transient reason once"""
+        not_deleted = []
+        for chunk in chunks(messages):
+            pending = {str(i): message for i, message in enumerate(chunk)}
+            for attempt in range(2):
+                response = self.sqs.delete_message_batch(
+                    QueueUrl=self.queue_url,
+                    Entries=[{'Id': id, 'ReceiptHandle': m.receipt} for id, m in pending.items()]
+                )
+                failures = response.get('Failed', [])
+                retryable = {f['Id'] for f in failures if not f.get('SenderFault')}
+                for failure in failures:
+                    if failure['Id'] not in retryable or attempt == 1:
+                        print(f"Failed to delete message: {failure.get('Code')} {failure.get('Message')}")
+                        not_deleted.append(pending[failure['Id']])
+                pending = {id: m for id, m in pending.items() if id in retryable}
+                if not pending:
+                    break
+        return not_deleted
+
+    def retry(self, retries: List[Tuple[QueueMessage, int]]) -> None:
+        for chunk in chunks(retries):
+            self.sqs.change_message_visibility_batch(
+                QueueUrl=self.queue_url,
+                Entries=[
+                    {'Id': str(i), 'ReceiptHandle': message.receipt, 'VisibilityTimeout': delay}
+                    for i, (message, delay) in enumerate(chunk)
+                ]
+            )
+
+    def extend(self, messages: List[QueueMessage], visibility_timeout: int) -> None:
+        self.retry([(message, visibility_timeout) for message in messages])
+
+    def depth(self) -> int:
+        attributes = self.sqs.get_queue_attributes(
+            QueueUrl=self.queue_url,
+            AttributeNames=['ApproximateNumberOfMessages']
+        )['Attributes']
+        return int(attributes.get('ApproximateNumberOfMessages', 0))
+
+    def dead_letter(self, entries: List[Tuple[QueueMessage, str]]) -> List[QueueMessage]:
+        """Copy to the DLQ with the failure reason, then delete from the queue"""
+        if not self.dlq_url:
+            return []
+        moved = []
+        for chunk in chunks(entries):
+            response = self.sqs.send_message_batch(
+                QueueUrl=self.dlq_url,
+                Entries=[
+                    {
+                        'Id': str(i),
+                        'MessageBody': message.body,
+                        'MessageAttributes': {
+                            'error': {'DataType': 'String', 'StringValue': error[:1000] or 'unknown'},
+                            'attempts': {'DataType': 'Number', 'StringValue': str(message.attempts)},
+                            'source_message_id': {'DataType': 'String', 'StringValue': message.id},
+                        }
+                    }
+                    for i, (message, error) in enumerate(chunk)
+                ]
+            )
+            sent = {entry['Id'] for entry in response.get('Successful', [])}
+            moved.extend(message for i, (message, _) in enumerate(chunk) if str(i) in sent)
+        # Anything that couldn't be copied stays put and is redelivered
+        self.ack(moved)
+        return moved
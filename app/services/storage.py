@@ -23,6 +23,16 @@ class S3Storage:
             print(f"Error uploading to S3: {e}")
             return None
     
+    def download_file(self, key: str) -> Optional[bytes]:
+        """Download file from S3, or None if it doesn't exist"""
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket, Key=key)
+            return response['Body'].read()
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') not in ('NoSuchKey', '404'):
+                print(f"Error downloading from S3: {e}")
+            return None
+    
     def delete_file(self, key: str) -> bool:
         """Delete file from S3"""
         try:
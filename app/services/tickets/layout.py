@@ -0,0 +1,158 @@
+import io
+import qrcode
+from collections import OrderedDict
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+from PIL import Image, ImageDraw, ImageFont
+from ...config import settings
+
+# A6 portrait at 150 dpi: prints sharp, keeps each PDF around 50 KB
+DPI = 150
+PAGE_SIZE = (620, 874)
+MARGIN = 36
+ARTWORK_HEIGHT = 200
+QR_SIZE = 300
+HEADER_COLOR = (26, 26, 46)
+TEXT_COLOR = (20, 20, 20)
+MUTED_COLOR = (110, 110, 110)
+
+# Per-process cache of rendered event backgrounds
+LAYOUT_CACHE_SIZE = 32
+_layouts: "OrderedDict[str, Image.Image]" = OrderedDict()
+
+@lru_cache(maxsize=None)
+def font(size: int, bold: bool = False) -> ImageFont.ImageFont:
+    """Loaded once per size and weight per process"""
+    name = settings.ticket_pdf_font_bold if bold else settings.ticket_pdf_font
+    try:
+        return ImageFont.truetype(name, size)
+    except OSError:
+        return ImageFont.load_default(size)
+
+def wrap(text: str, text_font: ImageFont.ImageFont, width: int, max_lines: int = 2) -> List[str]:
+    """Greedy word wrap; the last line is ellipsized if the text doesn't fit"""
+    lines: List[str] = []
+    current = ""
+    for word in (text or "").split():
+        candidate = f"{current} {word}".strip()
+        if text_font.getlength(candidate) <= width or not current:
+            current = candidate
+        else:
+            lines.append(current)
+            current = word
+    if current:
+        lines.append(current)
+    if len(lines) > max_lines:
+        last = lines[max_lines - 1]
+        while last and text_font.getlength(last + "…") > width:
+            last = last[:-1]
+        lines = lines[:max_lines - 1] + [last.rstrip() + "…"]
+    return lines
+
+def _draw_lines(draw: ImageDraw.ImageDraw, lines: List[str], y: int, text_font, fill) -> int:
+    for line in lines:
+        draw.text((MARGIN, y), line, font=text_font, fill=fill)
+        y += int(text_font.size * 1.25)
+    return y
+
+def _fit_artwork(artwork: bytes) -> Optional[Image.Image]:
+    """Crop-to-fill the artwork into the header band"""
+    try:
+        image = Image.open(io.BytesIO(artwork)).convert("RGB")
+    except Exception as e:
+        print(f"Unreadable event artwork: {e}")
+        return None
+    target_w, target_h = PAGE_SIZE[0], ARTWORK_HEIGHT
+    scale = max(target_w / image.width, target_h / image.height)
+    image = image.resize((round(image.width * scale), round(image.height * scale)), Image.LANCZOS)
+    left = (image.width - target_w) // 2
+    top = (image.height - target_h) // 2
+    return image.crop((left, top, left + target_w, top + target_h))
+
+def _format_date(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.strftime("%d/%m/%Y às %H:%M")
+    return str(value or "")
+
+def build_layout(event: Dict[str, Any]) -> Image.Image:
+    """Everything on the page that is the same for every ticket of the event"""
+    page = Image.new("RGB", PAGE_SIZE, "white")
+    draw = ImageDraw.Draw(page)
+
+    artwork = _fit_artwork(event["artwork"]) if event.get("artwork") else None
+    if artwork is not None:
+        page.paste(artwork, (0, 0))
+    else:
+        # No artwork: a plain band with the brand
+        draw.rectangle((0, 0, PAGE_SIZE[0], ARTWORK_HEIGHT), fill=HEADER_COLOR)
+        brand_font = font(40, bold=True)
+        draw.text(
+            ((PAGE_SIZE[0] - brand_font.getlength("DuckTickets")) / 2, (ARTWORK_HEIGHT - brand_font.size) / 2),
+            "DuckTickets", font=brand_font, fill="white"
+        )
+
+    width = PAGE_SIZE[0] - 2 * MARGIN
+    y = ARTWORK_HEIGHT + 24
+    y = _draw_lines(draw, wrap(event["name"], font(28, bold=True), width), y, font(28, bold=True), TEXT_COLOR)
+    y = _draw_lines(draw, [_format_date(event.get("start_date"))], y + 4, font(20), TEXT_COLOR)
+    _draw_lines(draw, wrap(event.get("location") or "", font(20), width), y, font(20), MUTED_COLOR)
+
+    footer = "Apresente este QR Code na entrada do evento."
+    footer_font = font(16)
+    draw.text(
+        ((PAGE_SIZE[0] - footer_font.getlength(footer)) / 2, PAGE_SIZE[1] - MARGIN - footer_font.size),
+        footer, font=footer_font, fill=MUTED_COLOR
+    )
+    return page
+
+def event_layout(event: Dict[str, Any]) -> Image.Image:
+    """Cached background for the event; layout_key changes when the event does"""
+    key = event["layout_key"]
+    layout = _layouts.get(key)
+    if layout is None:
+        layout = build_layout(event)
+        _layouts[key] = layout
+        if len(_layouts) > LAYOUT_CACHE_SIZE:
+            _layouts.popitem(last=False)
+    else:
+        _layouts.move_to_end(key)
+    return layout
+
+def _qr_image(payload: str) -> Image.Image:
+    qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_L, box_size=10, border=2)
+    qr.add_data(payload)
+    qr.make(fit=True)
+    image = qr.make_image(fill_color="black", back_color="white").get_image().convert("L")
+    # Whole pixels per module, and nearest-neighbour, keep edges hard
+    modules = image.width // 10
+    size = QR_SIZE // modules * modules
+    return image.resize((size, size), Image.NEAREST)
+
+def render_ticket_pdf(event: Dict[str, Any], ticket: Dict[str, Any]) -> bytes:
+    """One-page PDF for a ticket on top of its event's cached layout"""
+    page = event_layout(event).copy()
+    draw = ImageDraw.Draw(page)
+    width = PAGE_SIZE[0] - 2 * MARGIN
+
+    y = ARTWORK_HEIGHT + 185
+    y = _draw_lines(draw, wrap(ticket["batch_name"], font(24, bold=True), width, 1), y, font(24, bold=True), TEXT_COLOR)
+    _draw_lines(draw, wrap(ticket["full_name"], font(22), width, 1), y, font(22), TEXT_COLOR)
+
+    qr_top = PAGE_SIZE[1] - MARGIN - 40 - QR_SIZE
+    qr = _qr_image(ticket["qr_code"])
+    page.paste(qr, ((PAGE_SIZE[0] - qr.width) // 2, qr_top + (QR_SIZE - qr.height) // 2))
+    reference = f"Pedido #{ticket['order_id']} · Ingresso #{ticket['attendee_id']}"
+    draw.text(
+        ((PAGE_SIZE[0] - font(16).getlength(reference)) / 2, qr_top - 26),
+        reference, font=font(16), fill=MUTED_COLOR
+    )
+
+    buffer = io.BytesIO()
+    page.save(buffer, format="PDF", resolution=DPI, quality=90, title=f"Ingresso #{ticket['attendee_id']}")
+    return buffer.getvalue()
+
+def render_chunk(args: Tuple[Dict[str, Any], List[Dict[str, Any]]]) -> List[Tuple[int, bytes]]:
+    """Process pool task: render a chunk of one event's tickets"""
+    event, tickets = args
+    return [(ticket["attendee_id"], render_ticket_pdf(event, ticket)) for ticket in tickets]
@@ -0,0 +1,142 @@
+import os
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from functools import lru_cache
+from itertools import chain, islice
+from typing import Any, Dict, Iterable, List, Optional
+from sqlalchemy.orm import Session
+from ...config import settings
+from ...models import Event, Order, Attendee, TicketBatch
+from .layout import render_chunk
+from .sinks import TicketSink
+
+# Bump when the ticket layout changes so cached event layouts are rebuilt
+LAYOUT_VERSION = 1
+
+# Tickets per process pool task; large enough to amortize pickling the
+# event (with its artwork) once per task
+TICKETS_PER_TASK = 50
+
+# Rows per keyset page when reading attendees
+PAGE_SIZE = 1000
+
+@lru_cache(maxsize=32)
+def load_artwork(url: str) -> Optional[bytes]:
+    """Event banner bytes, fetched once per process"""
+    try:
+        with urllib.request.urlopen(url, timeout=10) as response:
+            return response.read()
+    except Exception as e:
+        print(f"Could not fetch event artwork {url}: {e}")
+        return None
+
+def event_spec(event: Event) -> Dict[str, Any]:
+    """What the renderer needs to build an event's layout, picklable"""
+    updated = event.updated_at or event.created_at
+    return {
+        "id": event.id,
+        "name": event.name,
+        "start_date": event.start_date,
+        "location": event.location,
+        "artwork": load_artwork(event.banner_url) if event.banner_url else None,
+        "layout_key": f"{LAYOUT_VERSION}:{event.id}:{updated.isoformat() if updated else ''}",
+    }
+
+def ticket_key(event_id: int, attendee_id: int) -> str:
+    return f"tickets/{event_id}/{attendee_id}.pdf"
+
+class TicketPDFPipeline:
+    """Renders printable ticket PDFs for a whole event into a sink.
+
+    Attendees are read in keyset pages and rendered in chunks on a process
+    pool. Each pool process builds an event's layout (artwork, fonts,
+    static text) once and only draws the per-ticket parts on a copy, and
+    finished PDFs stream into the sink as chunks complete, with a bounded
+    number of chunks in flight.
+    """
+
+    def __init__(self, sink: TicketSink, workers: Optional[int] = None, chunk_size: int = TICKETS_PER_TASK):
+        self.sink = sink
+        self.workers = workers if workers is not None else (settings.ticket_pdf_workers or os.cpu_count() or 1)
+        self.chunk_size = chunk_size
+
+    def tickets(self, db: Session, event_id: int, attendee_ids: Optional[Iterable[int]] = None) -> Iterable[List[Dict[str, Any]]]:
+        """Pages of ticket specs for paid attendees with a QR payload"""
+        after_id = 0
+        ids = list(attendee_ids) if attendee_ids is not None else None
+        while True:
+            query = db.query(
+                Attendee.id, Attendee.order_id, Attendee.full_name, Attendee.qr_code, TicketBatch.name
+            ).join(
+                Order, Order.id == Attendee.order_id
+            ).join(
+                TicketBatch, TicketBatch.id == Attendee.ticket_batch_id
+            ).filter(
+                Order.event_id == event_id,
+                Order.status == "paid",
+                Attendee.qr_code.isnot(None),
+                Attendee.id > after_id
+            )
+            if ids is not None:
+                query = query.filter(Attendee.id.in_(ids))
+            rows = query.order_by(Attendee.id).limit(PAGE_SIZE).all()
+            if not rows:
+                return
+            yield [
+                {
+                    "attendee_id": attendee_id,
+                    "order_id": order_id,
+                    "full_name": full_name,
+                    "qr_code": qr_code,
+                    "batch_name": batch_name,
+                }
+                for attendee_id, order_id, full_name, qr_code, batch_name in rows
+            ]
+            after_id = rows[-1][0]
+
+    def render_event(self, db: Session, event_id: int, attendee_ids: Optional[Iterable[int]] = None) -> int:
+        """Render tickets of the event (or only attendee_ids); returns how many"""
+        event = db.query(Event).filter(Event.id == event_id).first()
+        if event is None:
+            raise ValueError(f"Event {event_id} not found")
+        spec = event_spec(event)
+        return self.render(spec, (t for page in self.tickets(db, event_id, attendee_ids) for t in page))
+
+    def render(self, event: Dict[str, Any], tickets: Iterable[Dict[str, Any]]) -> int:
+        """Render ticket specs of one event into the sink"""
+        chunks = self._chunks(tickets)
+        head = list(islice(chunks, 2))
+        chunks = chain(head, chunks)
+        rendered = 0
+
+        if len(head) < 2 or self.workers <= 1:
+            # A single chunk renders faster inline than on a fresh pool
+            for chunk in chunks:
+                rendered += self._store(event, render_chunk((event, chunk)))
+            return rendered
+
+        pending = set()
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            for chunk in chunks:
+                if len(pending) >= self.workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    rendered += sum(self._store(event, future.result()) for future in done)
+                pending.add(pool.submit(render_chunk, (event, chunk)))
+            for future in pending:
+                rendered += self._store(event, future.result())
+        return rendered
+
+    def _chunks(self, tickets: Iterable[Dict[str, Any]]):
+        chunk = []
+        for ticket in tickets:
+            chunk.append(ticket)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _store(self, event: Dict[str, Any], results) -> int:
+        for attendee_id, pdf in results:
+            self.sink.write(ticket_key(event["id"], attendee_id), pdf)
+        return len(results)
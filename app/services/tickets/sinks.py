@@ -0,0 +1,61 @@
+import os
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from ..storage import S3Storage
+
+class TicketSink(ABC):
+    """Destination for rendered ticket PDFs"""
+
+    @abstractmethod
+    def write(self, key: str, data: bytes) -> None:
+        """Store one PDF under key (e.g. tickets/<event>/<attendee>.pdf)"""
+        pass
+
+    def close(self) -> None:
+        """Wait for pending writes"""
+        pass
+
+class LocalTicketSink(TicketSink):
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def write(self, key: str, data: bytes) -> None:
+        path = os.path.join(self.directory, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write-then-rename so readers never see a partial PDF
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+class S3TicketSink(TicketSink):
+    """Uploads to the assets bucket from a small thread pool.
+
+    At most max_pending uploads are queued, so a fast renderer can't pile
+    up PDFs in memory while S3 catches up.
+    """
+
+    def __init__(self, storage: Optional[S3Storage] = None, max_uploads: int = 8, max_pending: int = 64):
+        self.storage = storage or S3Storage()
+        self.failed = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_uploads, thread_name_prefix="ticket-upload")
+        self._pending = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+
+    def _upload(self, key: str, data: bytes):
+        try:
+            if self.storage.upload_file(data, key, "application/pdf") is None:
+                with self._lock:
+                    self.failed += 1
+        finally:
+            self._pending.release()
+
+    def write(self, key: str, data: bytes) -> None:
+        self._pending.acquire()
+        self._executor.submit(self._upload, key, data)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
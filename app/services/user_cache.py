@@ -0,0 +1,45 @@
+from typing import Iterable
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..models import Order, Attendee
+from .cache import TTLCache
+
+# Per-email responses of /user/orders and /api/user/tickets
+user_orders_cache = TTLCache(ttl=settings.user_cache_ttl_seconds)
+user_tickets_cache = TTLCache(ttl=settings.user_cache_ttl_seconds)
+
+def invalidate_user_cache(emails: Iterable[str]):
+    """Drop cached orders/tickets for the given emails"""
+    for email in emails:
+        user_orders_cache.invalidate(email)
+        user_tickets_cache.invalidate(email)
+
+def invalidate_on_commit(session: Session, emails: Iterable[str]):
+    """Invalidate emails when the session commits; for Core-level writes
+    the flush hook below can't see"""
+    session.info.setdefault("user_cache_emails", set()).update(emails)
+
+@event.listens_for(Session, "before_flush")
+def _collect_changed_emails(session, flush_context, instances):
+    """Remember emails whose orders or tickets change in this transaction"""
+    emails = session.info.setdefault("user_cache_emails", set())
+    for obj in session.new:
+        if isinstance(obj, (Order, Attendee)):
+            emails.add(obj.email)
+    for obj in session.dirty:
+        if isinstance(obj, Order) and inspect(obj).attrs.status.history.has_changes():
+            emails.add(obj.email)
+    for obj in session.deleted:
+        if isinstance(obj, (Order, Attendee)):
+            emails.add(obj.email)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    # Invalidate only once the change is visible to other sessions, so a
+    # concurrent reader can't re-cache the pre-commit state
+    invalidate_user_cache(session.info.pop("user_cache_emails", ()))
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop("user_cache_emails", None)
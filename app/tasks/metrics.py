@@ -0,0 +1,91 @@
+import threading
+from typing import Optional
+from prometheus_client import Counter, Gauge, Histogram, REGISTRY, start_http_server, write_to_textfile
+
+# Handler run times range from a cached email to a large order's fan-out
+PROCESSING_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+LAG_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+MESSAGES_PROCESSED = Counter(
+    "ducktickets_worker_messages_total",
+    "Messages handled by the worker, by type and outcome (success, failure)",
+    ["type", "outcome"]
+)
+MESSAGES_RETRIED = Counter(
+    "ducktickets_worker_retries_total",
+    "Failed messages scheduled for another attempt",
+    ["type"]
+)
+MESSAGES_DEAD_LETTERED = Counter(
+    "ducktickets_worker_dead_letters_total",
+    "Messages moved to the dead-letter queue",
+    ["type"]
+)
+PROCESSING_SECONDS = Histogram(
+    "ducktickets_worker_processing_seconds",
+    "Handler run time per message",
+    ["type"],
+    buckets=PROCESSING_BUCKETS
+)
+IN_FLIGHT = Gauge(
+    "ducktickets_worker_in_flight_messages",
+    "Messages received and not yet acked, retried or dead-lettered",
+    ["lane"]
+)
+QUEUE_LAG_SECONDS = Histogram(
+    "ducktickets_worker_queue_lag_seconds",
+    "Time from enqueue to receive",
+    ["type"],
+    buckets=LAG_BUCKETS
+)
+RECEIVE_TO_ACK_SECONDS = Histogram(
+    "ducktickets_worker_receive_to_ack_seconds",
+    "Time from receive until the message is acked, retried or dead-lettered",
+    ["lane"],
+    buckets=PROCESSING_BUCKETS
+)
+EMAIL_SEND_SECONDS = Histogram(
+    "ducktickets_email_send_seconds",
+    "Latency of one confirmation email send",
+    ["outcome"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+
+WEBHOOK_NOTIFICATIONS = Counter(
+    "ducktickets_webhook_notifications_total",
+    "Provider notifications by stage (ingest, worker) and result (new, duplicate_memory, duplicate_db)",
+    ["stage", "result"]
+)
+RECONCILED_ORDERS = Counter(
+    "ducktickets_reconciled_orders_total",
+    "Pending orders checked by payment reconciliation, by result (paid, unpaid, no_payment, error)",
+    ["result"]
+)
+
+def _write_textfile_forever(path: str, interval: float, stopped: threading.Event):
+    while not stopped.wait(interval):
+        try:
+            write_to_textfile(path, REGISTRY)
+        except OSError as e:
+            print(f"Failed to write metrics to {path}: {e}")
+
+def start_metrics(port: int = 0, textfile: Optional[str] = None, interval: float = 15) -> Optional[threading.Event]:
+    """Expose worker metrics over HTTP on port and/or as a textfile.
+
+    The textfile is rewritten every interval seconds (atomically) for the
+    node_exporter textfile collector. Returns an event that stops the
+    textfile writer, or None when only HTTP (or nothing) is enabled.
+    """
+    if port:
+        start_http_server(port)
+        print(f"Worker metrics on :{port}/metrics")
+    if not textfile:
+        return None
+    stopped = threading.Event()
+    threading.Thread(
+        target=_write_textfile_forever,
+        args=(textfile, interval, stopped),
+        name="metrics-textfile",
+        daemon=True
+    ).start()
+    return stopped
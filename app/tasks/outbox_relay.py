@@ -0,0 +1,64 @@
+import time
+from typing import Optional
+from ..database import SessionLocal
+from ..services import outbox
+from ..config import settings
+
+# How often processed rows past retention are deleted
+PURGE_INTERVAL = 3600
+
+class OutboxRelay:
+    """Moves committed outbox rows to the worker queue.
+
+    Drains full batches back to back and sleeps poll_interval only once
+    the outbox is empty, so a burst of paid orders is forwarded at queue
+    speed while an idle relay costs one small query per interval.
+    """
+
+    def __init__(self, batch_size: Optional[int] = None, poll_interval: Optional[float] = None):
+        self.batch_size = batch_size or settings.outbox_batch_size
+        self.poll_interval = settings.outbox_poll_interval if poll_interval is None else poll_interval
+        self.running = True
+        self._last_purge = 0.0
+
+    def relay_once(self) -> int:
+        db = SessionLocal()
+        try:
+            return outbox.relay_batch(db, self.batch_size)
+        finally:
+            db.close()
+
+    def purge(self):
+        db = SessionLocal()
+        try:
+            purged = outbox.purge_processed(db)
+            if purged:
+                print(f"Purged {purged} processed outbox message(s)")
+        finally:
+            db.close()
+
+    def run(self):
+        while self.running:
+            try:
+                sent = self.relay_once()
+                if time.monotonic() - self._last_purge > PURGE_INTERVAL:
+                    self._last_purge = time.monotonic()
+                    self.purge()
+            except Exception as e:
+                print(f"Outbox relay error: {e}")
+                time.sleep(max(self.poll_interval, 5))
+                continue
+            if sent < self.batch_size:
+                time.sleep(self.poll_interval)
+
+    def stop(self):
+        self.running = False
+
+def run_relay():
+    """Run outbox relay"""
+    relay = OutboxRelay()
+    print(f"Starting outbox relay to {settings.queue_backend} queue (batches of {relay.batch_size})...")
+    relay.run()
+
+if __name__ == "__main__":
+    run_relay()
@@ -0,0 +1,59 @@
+import time
+from typing import Optional
+from ..database import SessionLocal
+from ..services.payments.http_client import CircuitOpenError
+from ..services.payments.reconcile import PaymentReconciler
+from ..config import settings
+
+class Reconciler:
+    """Runs payment reconciliation every interval seconds.
+
+    A run that takes longer than the interval is followed by the next one
+    straight away; runs never overlap within a process.
+    """
+
+    def __init__(self, reconciler: Optional[PaymentReconciler] = None, interval: Optional[float] = None):
+        self.reconciler = reconciler or PaymentReconciler()
+        self.interval = settings.reconcile_interval_seconds if interval is None else interval
+        self.running = True
+
+    def reconcile_once(self):
+        db = SessionLocal()
+        started = time.monotonic()
+        try:
+            totals = self.reconciler.run_once(db)
+        finally:
+            db.close()
+        print(
+            f"Reconciled {totals['checked']} pending order(s) in {time.monotonic() - started:.1f}s: "
+            f"{totals['paid']} paid, {totals['unpaid']} unpaid, {totals['no_payment']} without payment, "
+            f"{totals['error']} error(s)"
+        )
+        return totals
+
+    def run(self):
+        while self.running:
+            next_run = time.monotonic() + self.interval
+            try:
+                self.reconcile_once()
+            except CircuitOpenError as e:
+                print(f"Reconciliation stopped early: {e}")
+            except Exception as e:
+                print(f"Reconciliation error: {e}")
+            while self.running and time.monotonic() < next_run:
+                time.sleep(min(1, max(0, next_run - time.monotonic())))
+
+    def stop(self):
+        self.running = False
+
+def run_reconciler():
+    """Run payment reconciliation"""
+    reconciler = Reconciler()
+    print(
+        f"Starting payment reconciliation every {reconciler.interval:.0f}s "
+        f"({settings.reconcile_rate_limit:g} calls/s over {reconciler.reconciler.concurrency} connections)..."
+    )
+    reconciler.run()
+
+if __name__ == "__main__":
+    run_reconciler()
@@ -1,110 +1,451 @@
-import boto3
-import json
+import signal
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple, Callable
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from ..database import SessionLocal
-from ..models import Order
-from ..services.emails.ses_mailer import SESMailer
-from ..services.qrcode.generator import generate_qr_code
+from ..models import Order, Attendee
+from ..services import outbox
+from ..services.emails.mailer import Mailer
+from ..services.payments.webhooks import process_payment_webhook
+from ..services.qrcode.renderer import QRRenderer
+from ..services.queue.base import QueueBackend, QueueMessage
+from ..services.queue.factory import get_queue, configured_lanes, PRIORITY_LANE, DEFAULT_LANE
 from ..config import settings
-from ..routes.webhook import process_payment_webhook
+from . import metrics
 
-class SQSWorker:
-    def __init__(self):
-        self.sqs = boto3.client('sqs', region_name=settings.aws_region)
-        self.queue_url = settings.sqs_queue_url
-        self.dlq_url = settings.sqs_dlq_url
-        self.mailer = SESMailer()
+# SQS caps a message's visibility timeout at 12 hours
+MAX_VISIBILITY_TIMEOUT = 43200
+
+class NonRetryableError(Exception):
+    """A message that can never succeed; it goes straight to the DLQ"""
+
+class EmailSendError(Exception):
+    """Some of an order's confirmation emails were not sent; retried"""
+
+class RetryPolicy:
+    """How often and how fast a message type is retried.
+    
+    Attempt n (the message's delivery count) that fails is made visible
+    again after base_delay * 2^(n-1) seconds, capped at max_delay. After
+    max_attempts receives the message is moved to the DLQ.
+    """
+    
+    def __init__(self, max_attempts: int = 5, base_delay: int = 10, max_delay: int = 900):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+    
+    def delay(self, attempt: int) -> int:
+        return min(self.max_delay, self.base_delay * 2 ** max(0, attempt - 1), MAX_VISIBILITY_TIMEOUT)
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+class VisibilityHeartbeat:
+    """Keeps in-flight messages invisible while they are being processed.
+    
+    Every interval seconds the visibility timeout of each tracked message is
+    reset to timeout, so long jobs aren't redelivered to another worker
+    halfway through. A worker that dies stops beating and its messages
+    reappear within one timeout.
+    """
+    
+    def __init__(self, queue: QueueBackend, timeout: int, interval: Optional[float] = None):
+        self.queue = queue
+        self.timeout = timeout
+        self.interval = interval or max(1, timeout / 3)
+        self._in_flight: Dict[str, QueueMessage] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="queue-heartbeat", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._stopped.set()
+        if self._thread:
+            self._thread.join()
+    
+    def track(self, messages: List[QueueMessage]):
+        with self._lock:
+            for message in messages:
+                self._in_flight[message.receipt] = message
+    
+    def release(self, messages: List[QueueMessage]):
+        # Taking the lock waits out a beat in progress, so a released
+        # message can't be extended after the caller changes its visibility
+        with self._lock:
+            for message in messages:
+                self._in_flight.pop(message.receipt, None)
+    
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.beat()
+            except Exception as e:
+                print(f"Visibility heartbeat error: {e}")
+    
+    def beat(self):
+        with self._lock:
+            if self._in_flight:
+                self.queue.extend(list(self._in_flight.values()), self.timeout)
+
+class AdaptivePoller:
+    """Sizes each receive from what the previous one returned.
+    
+    A full batch means a backlog: ask for up to max_batch and don't wait. A
+    partial batch means the queue is nearly drained, so the next receive
+    asks for about that many, leaving the rest of the fleet a share. An
+    empty one says nothing about the next burst, so it long-polls for a
+    full max_batch again.
+    """
+    
+    def __init__(self, max_batch: int, max_wait: int = 20):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batch_size = max_batch
+        self.wait_seconds = max_wait
+    
+    def observe(self, received: int):
+        if received >= self.batch_size:
+            self.batch_size = min(self.max_batch, self.batch_size * 2)
+            self.wait_seconds = 0
+        elif received == 0:
+            self.batch_size = self.max_batch
+            self.wait_seconds = self.max_wait
+        else:
+            self.batch_size = received
+            self.wait_seconds = self.max_wait
+
+class Lane:
+    """A queue with its own polling thread, worker threads and heartbeat.
+    
+    Lanes don't share threads, so a backlog in one can't delay another.
+    """
+    
+    def __init__(self, name: str, queue: QueueBackend, concurrency: int):
+        self.name = name
+        self.queue = queue
+        self.concurrency = max(1, concurrency)
+        # Handlers must be thread-safe; each message gets its own DB session
+        self.executor = (
+            ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix=f"lane-{name}")
+            if self.concurrency > 1 else None
+        )
+        self.heartbeat = VisibilityHeartbeat(queue, settings.sqs_visibility_timeout)
+        self.poller = AdaptivePoller(max_batch=min(10, self.concurrency))
+    
+    def stop(self):
+        if self.executor:
+            self.executor.shutdown(wait=True)
+        self.heartbeat.stop()
+
+def lane_concurrency(lanes: List[str], concurrency: int) -> Dict[str, int]:
+    """Split worker threads between lanes, reserving the priority share"""
+    if PRIORITY_LANE not in lanes:
+        return {lane: concurrency for lane in lanes}
+    priority = max(1, round(concurrency * settings.worker_priority_share))
+    return {PRIORITY_LANE: priority, DEFAULT_LANE: max(1, concurrency - priority)}
+
+Handler = Callable[[Dict[str, Any], Session], None]
+
+class QueueWorker:
+    """Processes queue messages with handlers registered per message type"""
+    
+    def __init__(self, queue: Optional[QueueBackend] = None, concurrency: Optional[int] = None):
+        self.mailer = Mailer()
+        self.qr_renderer = QRRenderer()
+        # Shared by all message threads so total SES concurrency stays bounded
+        self.email_pool = ThreadPoolExecutor(
+            max_workers=max(1, settings.email_send_workers),
+            thread_name_prefix="email"
+        )
+        self.concurrency = max(1, concurrency or settings.worker_concurrency)
+        if queue is not None:
+            self.lanes = [Lane(DEFAULT_LANE, queue, self.concurrency)]
+        else:
+            shares = lane_concurrency(configured_lanes(), self.concurrency)
+            self.lanes = [Lane(name, get_queue(name), threads) for name, threads in shares.items()]
+        # Default lane; handle_batch uses it when no lane is given
+        self.queue = self.lanes[-1].queue
+        self.handlers: Dict[str, Tuple[Handler, RetryPolicy]] = {}
+        self.running = True
+        
+        # Payment state must converge quickly; retry soon and often
+        self.register('payment_webhook', self.handle_payment_webhook, RetryPolicy(max_attempts=8, base_delay=5, max_delay=300))
+        # Emails usually fail on SES throttling, which clears in minutes
+        self.register('send_confirmation', self.handle_send_confirmation, RetryPolicy(max_attempts=5, base_delay=30, max_delay=900))
+    
+    def register(self, message_type: str, handler: Handler, retry_policy: Optional[RetryPolicy] = None):
+        """Route messages of message_type to handler(body, db)"""
+        self.handlers[message_type] = (handler, retry_policy or DEFAULT_RETRY_POLICY)
     
     def process_messages(self):
-        """Process SQS messages"""
-        while True:
+        """Poll every lane, each from its own thread, until stopped"""
+        threads = [
+            threading.Thread(target=self.poll_lane, args=(lane,), name=f"poll-{lane.name}", daemon=True)
+            for lane in self.lanes
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Polling has stopped; let the batches in flight finish
+        self.close()
+    
+    def poll_lane(self, lane: Lane):
+        lane.heartbeat.start()
+        while self.running:
             try:
-                # Receive messages
-                response = self.sqs.receive_message(
-                    QueueUrl=self.queue_url,
-                    MaxNumberOfMessages=10,
-                    WaitTimeSeconds=20,
-                    MessageAttributeNames=['All']
+                # Long polls return as soon as messages arrive, so no extra sleep
+                messages = lane.queue.receive(
+                    max_messages=lane.poller.batch_size,
+                    wait_seconds=lane.poller.wait_seconds,
+                    visibility_timeout=settings.sqs_visibility_timeout
                 )
-                
-                messages = response.get('Messages', [])
-                
-                for message in messages:
-                    try:
-                        self.process_single_message(message)
-                        
-                        # Delete message after successful processing
-                        self.sqs.delete_message(
-                            QueueUrl=self.queue_url,
-                            ReceiptHandle=message['ReceiptHandle']
-                        )
-                        
-                    except Exception as e:
-                        print(f"Error processing message: {e}")
-                        # Message will be retried or sent to DLQ
-                
-                if not messages:
-                    time.sleep(5)  # No messages, wait a bit
+                lane.poller.observe(len(messages))
+                if messages:
+                    self.handle_batch(messages, lane)
                     
             except Exception as e:
-                print(f"SQS polling error: {e}")
+                print(f"Queue polling error on {lane.name} lane: {e}")
                 time.sleep(10)
     
-    def process_single_message(self, message):
-        """Process a single SQS message"""
-        body = json.loads(message['Body'])
+    def stop(self):
+        """Exit the polling loops after their current receive and batch.
+        
+        Only sets a flag, so it is safe to call from a signal handler;
+        process_messages returns once in-flight work has finished.
+        """
+        self.running = False
+    
+    def close(self):
+        """Stop and wait for in-flight messages and emails to finish"""
+        self.running = False
+        for lane in self.lanes:
+            lane.stop()
+        self.email_pool.shutdown(wait=True)
+    
+    def handle_batch(self, messages: List[QueueMessage], lane: Optional[Lane] = None) -> List[QueueMessage]:
+        """Process a received batch in parallel and ack what succeeded.
+        
+        The heartbeat keeps the batch invisible while it runs. Failed
+        messages are rescheduled per their type's retry policy or moved to
+        the DLQ. Returns the failed messages.
+        """
+        lane = lane or self.lanes[-1]
+        in_flight = metrics.IN_FLIGHT.labels(lane=lane.name)
+        in_flight.inc(len(messages))
+        for message in messages:
+            if message.sent_at:
+                metrics.QUEUE_LAG_SECONDS.labels(type=self.message_type(message)).observe(
+                    max(0.0, message.received_at - message.sent_at)
+                )
+        
+        lane.heartbeat.track(messages)
+        try:
+            run = lane.executor.map if lane.executor else map
+            outcomes = list(zip(messages, run(self._run_message, messages)))
+        finally:
+            lane.heartbeat.release(messages)
+        
+        succeeded, failed = [], []
+        for message, error in outcomes:
+            if error is None:
+                succeeded.append(message)
+            else:
+                print(f"Error processing message {message.id}: {error}")
+                failed.append((message, error))
+        
+        try:
+            lane.queue.ack(succeeded)
+            self.handle_failures(failed, lane.queue)
+        finally:
+            settled = time.time()
+            ack_latency = metrics.RECEIVE_TO_ACK_SECONDS.labels(lane=lane.name)
+            for message in messages:
+                ack_latency.observe(settled - message.received_at)
+            in_flight.dec(len(messages))
+        return [message for message, _ in failed]
+    
+    def message_type(self, message: QueueMessage) -> str:
+        """The message's type for routing and metrics; 'unknown' if unregistered or unreadable"""
+        try:
+            message_type = message.json().get('type')
+        except (ValueError, AttributeError):
+            return 'unknown'
+        return message_type if message_type in self.handlers else 'unknown'
+    
+    def retry_policy(self, message: QueueMessage) -> RetryPolicy:
+        return self.handlers.get(self.message_type(message), (None, DEFAULT_RETRY_POLICY))[1]
+    
+    def handle_failures(self, failures: List[Tuple[QueueMessage, Exception]], queue: QueueBackend):
+        """Back failed messages off exponentially, or dead-letter them"""
+        retries, dead = [], []
+        for message, error in failures:
+            policy = self.retry_policy(message)
+            if isinstance(error, NonRetryableError) or message.attempts >= policy.max_attempts:
+                dead.append((message, str(error) or type(error).__name__))
+            else:
+                retries.append((message, policy.delay(message.attempts)))
+        
+        if dead and not queue.supports_dead_letter:
+            # Without a DLQ the queue's own redrive policy has the last word
+            print("No dead-letter queue configured; leaving exhausted messages on the queue")
+            retries.extend((message, DEFAULT_RETRY_POLICY.max_delay) for message, _ in dead)
+            dead = []
+        
+        if retries:
+            queue.retry(retries)
+            for message, _ in retries:
+                metrics.MESSAGES_RETRIED.labels(type=self.message_type(message)).inc()
+        for message in queue.dead_letter(dead) if dead else []:
+            metrics.MESSAGES_DEAD_LETTERED.labels(type=self.message_type(message)).inc()
+            print(f"Moved message {message.id} to DLQ after {message.attempts} attempt(s)")
+    
+    def _run_message(self, message: QueueMessage) -> Optional[Exception]:
+        """Process one message, returning the error instead of raising it"""
+        message_type = self.message_type(message)
+        started = time.perf_counter()
+        try:
+            self.process_single_message(message)
+            error = None
+        except Exception as e:
+            error = e
+        metrics.PROCESSING_SECONDS.labels(type=message_type).observe(time.perf_counter() - started)
+        metrics.MESSAGES_PROCESSED.labels(type=message_type, outcome="failure" if error else "success").inc()
+        return error
+    
+    def process_single_message(self, message: QueueMessage):
+        """Dispatch a message to the handler registered for its type"""
+        try:
+            body = message.json()
+        except ValueError:
+            raise NonRetryableError("Message body is not valid JSON")
+        
         message_type = body.get('type')
+        if message_type not in self.handlers:
+            raise NonRetryableError(f"Unknown message type: {message_type}")
+        handler, _ = self.handlers[message_type]
         
         db = SessionLocal()
         try:
-            if message_type == 'payment_webhook':
-                # Process payment webhook
-                webhook_data = body.get('data', {})
-                process_payment_webhook(webhook_data, db)
-                
-            elif message_type == 'send_confirmation':
-                # Send confirmation email
-                order_id = body.get('order_id')
-                self.send_confirmation_emails(order_id, db)
-                
-            else:
-                print(f"Unknown message type: {message_type}")
-                
+            # Messages relayed from the outbox may arrive more than once;
+            # the claim lets exactly one delivery run the handler
+            outbox_id = body.get('outbox_id')
+            if outbox_id is not None and not outbox.claim_message(db, outbox_id):
+                print(f"Skipping duplicate of outbox message {outbox_id}")
+                return
+            try:
+                handler(body, db)
+            except Exception:
+                if outbox_id is not None:
+                    db.rollback()
+                    outbox.release_message(db, outbox_id)
+                raise
+            if outbox_id is not None:
+                outbox.mark_processed(db, outbox_id)
         finally:
             db.close()
     
+    def handle_payment_webhook(self, body: Dict[str, Any], db: Session):
+        process_payment_webhook(body.get('data', {}), db)
+    
+    def handle_send_confirmation(self, body: Dict[str, Any], db: Session):
+        self.send_confirmation_emails(body.get('order_id'), db)
+    
     def send_confirmation_emails(self, order_id: int, db: Session):
-        """Send confirmation emails for order"""
+        """Send confirmation emails for order.
+        
+        Attendees sharing an address get one email with all their tickets
+        attached. Sends run on the shared email pool and wait on the SES
+        send-rate bucket, so large orders go out in parallel without
+        tripping SES throttling.
+        
+        Attendees whose email went out are stamped with confirmation_sent_at
+        and committed before a failed send raises EmailSendError, so the
+        queue's retry only resends to the addresses that failed.
+        """
         order = db.query(Order).filter(Order.id == order_id).first()
         
         if not order or order.status != "paid":
             return
         
-        for attendee in order.attendees:
-            try:
-                # Generate QR code image
-                qr_code_data = generate_qr_code(attendee.qr_code)
-                
-                # Send email
-                result = self.mailer.send_confirmation_email(
-                    attendee.email,
-                    attendee.full_name,
-                    order.event.name,
-                    qr_code_data,
-                    order.id
-                )
-                
-                print(f"Email sent to {attendee.email}: {result}")
-                
-            except Exception as e:
-                print(f"Error sending email to {attendee.email}: {e}")
+        pending = [a for a in order.attendees if a.qr_code and a.confirmation_sent_at is None]
+        if not pending:
+            return
+        
+        # Render (or fetch cached) QR images for the whole order at once
+        qr_images = self.qr_renderer.render_many([a.qr_code for a in pending])
+        
+        recipients: Dict[str, list] = {}
+        for attendee in pending:
+            recipients.setdefault(attendee.email.lower(), []).append(attendee)
+        
+        futures = [
+            (attendees, self.email_pool.submit(
+                self.send_confirmation_email,
+                attendees[0].email,
+                attendees[0].full_name,
+                order.event.name,
+                [qr_images[a.qr_code] for a in attendees],
+                order.id
+            ))
+            for attendees in recipients.values()
+        ]
+        sent = []
+        failed = []
+        for attendees, future in futures:
+            result = future.result()
+            if result.get("success"):
+                sent.extend(a.id for a in attendees)
+            else:
+                failed.append(f"{attendees[0].email}: {result.get('error')}")
+        
+        if sent:
+            db.execute(
+                update(Attendee).where(Attendee.id.in_(sent)).values(confirmation_sent_at=datetime.utcnow())
+            )
+            db.commit()
+        if failed:
+            raise EmailSendError(f"Order {order.id}: {len(failed)} confirmation email(s) failed ({'; '.join(failed)})")
+    
+    def send_confirmation_email(self, to_email: str, attendee_name: str, event_name: str, qr_codes: List[bytes], order_id: int) -> Dict[str, Any]:
+        """Send one email; returns the mailer's {"success", ...} result, never raises"""
+        started = time.perf_counter()
+        try:
+            result = self.mailer.send_confirmation_email(to_email, attendee_name, event_name, qr_codes, order_id)
+        except Exception as e:
+            result = {"success": False, "error": str(e)}
+        outcome = "sent" if result.get("success") else "error"
+        metrics.EMAIL_SEND_SECONDS.labels(outcome=outcome).observe(time.perf_counter() - started)
+        if result.get("success"):
+            print(f"Email sent to {to_email}: {result.get('message_id')}")
+        else:
+            print(f"Error sending email to {to_email}: {result.get('error')}")
+        return result
+
+# Name used by existing deployments
+SQSWorker = QueueWorker
 
-def run_worker():
-    """Run SQS worker"""
-    worker = SQSWorker()
-    print("Starting SQS worker...")
+def run_worker(metrics_port: Optional[int] = None, metrics_textfile: Optional[str] = None):
+    """Run queue worker until SIGTERM or SIGINT, then drain in-flight work"""
+    worker = QueueWorker()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda signum, frame: worker.stop())
+    metrics.start_metrics(
+        settings.worker_metrics_port if metrics_port is None else metrics_port,
+        settings.worker_metrics_textfile if metrics_textfile is None else metrics_textfile
+    )
+    lanes = ", ".join(f"{lane.name}: {lane.concurrency}" for lane in worker.lanes)
+    print(f"Starting worker on {settings.queue_backend} queue ({lanes} concurrent messages)...")
     worker.process_messages()
+    print("Worker stopped")
 
 if __name__ == "__main__":
     run_worker()
\ No newline at end of file
@@ -0,0 +1,192 @@
+import math
+import multiprocessing
+import os
+import signal
+import time
+from typing import Callable, Dict, List, Optional
+from ..config import settings
+from ..database import engine
+from ..services.queue.factory import get_queue, configured_lanes
+
+# A worker slot that exits is restarted at most this often (seconds)
+RESTART_BACKOFF = 5
+
+def preload():
+    """Do the expensive imports and setup once, before forking workers.
+
+    Children inherit the loaded modules, compiled templates and botocore's
+    service model cache, so creating their own clients is cheap. Nothing
+    here opens a connection; each child makes its own after the fork.
+    """
+    import boto3
+    from . import sqs_worker  # noqa: F401  models, handlers, mailer, renderer
+    for service in ("sqs", "ses", "s3"):
+        boto3.client(service, region_name=settings.aws_region)
+    engine.dispose()
+
+def worker_main(slot: int):
+    """Entry point of a forked worker process"""
+    from .sqs_worker import run_worker
+    from ..services.payments.webhooks import get_payment_provider
+    # Connections opened by the supervisor belong to it, not to us
+    get_queue.cache_clear()
+    get_payment_provider.cache_clear()
+    engine.dispose(close=False)
+    port = settings.worker_metrics_port + slot if settings.worker_metrics_port else 0
+    textfile = settings.worker_metrics_textfile
+    if textfile:
+        root, ext = os.path.splitext(textfile)
+        textfile = f"{root}_{slot}{ext}"
+    run_worker(metrics_port=port, metrics_textfile=textfile)
+
+class Supervisor:
+    """Runs between min and max forked worker processes, sized by queue depth.
+
+    Every scale_interval seconds the approximate number of waiting messages
+    across all lanes is read and the pool is resized to one process per
+    backlog_per_process messages. Scaling up is immediate; scaling down
+    retires one process at a time after the backlog has stayed low for
+    scale_down_delay seconds. Retired and stopping workers get SIGTERM and
+    finish their in-flight messages; any still running after
+    shutdown_timeout are killed, and their messages reappear on the queue.
+
+    Each worker slot exports metrics on WORKER_METRICS_PORT + slot (and a
+    textfile with a _<slot> suffix).
+    """
+
+    def __init__(
+        self,
+        min_processes: Optional[int] = None,
+        max_processes: Optional[int] = None,
+        backlog_per_process: Optional[int] = None,
+        scale_interval: Optional[float] = None,
+        scale_down_delay: Optional[float] = None,
+        shutdown_timeout: Optional[float] = None,
+        target: Callable[[int], None] = worker_main
+    ):
+        self.min_processes = max(1, min_processes or settings.worker_processes_min)
+        self.max_processes = max(
+            self.min_processes,
+            max_processes or settings.worker_processes_max or os.cpu_count() or 1
+        )
+        self.backlog_per_process = max(1, backlog_per_process or settings.worker_scale_backlog)
+        self.scale_interval = scale_interval or settings.worker_scale_interval
+        self.scale_down_delay = settings.worker_scale_down_delay if scale_down_delay is None else scale_down_delay
+        self.shutdown_timeout = settings.worker_shutdown_timeout if shutdown_timeout is None else shutdown_timeout
+        self.target = target
+        self.processes: Dict[int, multiprocessing.Process] = {}
+        self.draining: List[multiprocessing.Process] = []
+        self.running = True
+        self._started_at: Dict[int, float] = {}
+        self._low_since: Optional[float] = None
+        self._context = multiprocessing.get_context("fork")
+
+    def desired_processes(self, depth: int) -> int:
+        wanted = math.ceil(depth / self.backlog_per_process)
+        return min(self.max_processes, max(self.min_processes, wanted))
+
+    def queue_depth(self) -> Optional[int]:
+        try:
+            return sum(get_queue(lane).depth() for lane in configured_lanes())
+        except Exception as e:
+            print(f"Could not read queue depth: {e}")
+            return None
+
+    def spawn(self, slot: int):
+        process = self._context.Process(target=self.target, args=(slot,), name=f"worker-{slot}")
+        process.start()
+        self.processes[slot] = process
+        self._started_at[slot] = time.monotonic()
+        print(f"Started worker {slot} (pid {process.pid})")
+
+    def retire(self, slot: int):
+        process = self.processes.pop(slot)
+        if process.is_alive():
+            os.kill(process.pid, signal.SIGTERM)
+            self.draining.append(process)
+        print(f"Retiring worker {slot} (pid {process.pid})")
+
+    def reap(self):
+        """Collect exited workers and restart their slots"""
+        for slot, process in list(self.processes.items()):
+            if process.is_alive():
+                continue
+            process.join()
+            del self.processes[slot]
+            print(f"Worker {slot} (pid {process.pid}) exited with code {process.exitcode}")
+            if self.running and time.monotonic() - self._started_at[slot] >= RESTART_BACKOFF:
+                self.spawn(slot)
+        for process in [p for p in self.draining if not p.is_alive()]:
+            process.join()
+            self.draining.remove(process)
+
+    def scale(self, depth: int):
+        target = self.desired_processes(depth)
+        current = len(self.processes)
+        if target > current:
+            self._low_since = None
+            free = [slot for slot in range(self.max_processes) if slot not in self.processes]
+            print(f"Queue depth {depth}: scaling up to {target} workers")
+            for slot in free[:target - current]:
+                self.spawn(slot)
+        elif target < current:
+            now = time.monotonic()
+            if self._low_since is None:
+                self._low_since = now
+            elif now - self._low_since >= self.scale_down_delay:
+                print(f"Queue depth {depth}: scaling down to {current - 1} workers")
+                self.retire(max(self.processes))
+                self._low_since = now
+        else:
+            self._low_since = None
+
+    def run(self):
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda signum, frame: self.stop())
+        for slot in range(self.min_processes):
+            self.spawn(slot)
+
+        next_scale = time.monotonic() + self.scale_interval
+        while self.running:
+            self.reap()
+            if time.monotonic() >= next_scale:
+                next_scale = time.monotonic() + self.scale_interval
+                depth = self.queue_depth()
+                if depth is not None:
+                    self.scale(depth)
+            time.sleep(1)
+        self.shutdown()
+
+    def stop(self):
+        self.running = False
+
+    def shutdown(self):
+        """SIGTERM every worker, wait for them to drain, kill stragglers"""
+        processes = list(self.processes.values()) + self.draining
+        for process in processes:
+            if process.is_alive():
+                os.kill(process.pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.shutdown_timeout
+        for process in processes:
+            process.join(max(0, deadline - time.monotonic()))
+        for process in processes:
+            if process.is_alive():
+                print(f"Worker pid {process.pid} still busy after {self.shutdown_timeout}s; killing it")
+                process.kill()
+                process.join()
+        self.processes.clear()
+        self.draining = []
+
+def run_supervisor():
+    """Run worker supervisor"""
+    supervisor = Supervisor()
+    print(
+        f"Starting worker supervisor ({supervisor.min_processes}-{supervisor.max_processes} processes, "
+        f"one per {supervisor.backlog_per_process} waiting messages)..."
+    )
+    preload()
+    supervisor.run()
+    print("Supervisor stopped")
+
+if __name__ == "__main__":
+    run_supervisor()
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Check-in throughput benchmark
+
+Seeds an event with paid tickets and replays a randomized mix of valid,
+invalid and duplicate scans through every check-in path:
+
+    single   GET  /tickets/validate/{qr}       one request per scan
+    batch    POST /tickets/validate/batch      --batch-size codes per request
+    offline  POST /tickets/checkins/offline    --batch-size scans per upload
+
+Each path starts from a clean slate (no ticket checked in) and replays the
+same scan sequence. Reports scans/s, request latency percentiles, DB
+statements per scan and whether every scan got the expected outcome, as
+JSON for trend tracking.
+
+Requests go through the full middleware stack in-process, without network
+or auth cost (require_admin is overridden). Point DATABASE_URL at a
+throwaway database; the seeded event is left in place.
+
+Usage:
+    python benchmarks/checkin.py [--attendees N] [--scans N] [--batch-size N]
+                                 [--invalid F] [--duplicate F] [--seed N]
+                                 [--paths single,batch,offline] [--output FILE]
+"""
+import sys
+import os
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Every scan comes from the same client; keep the per-client limit out of the way
+os.environ.setdefault("RATE_LIMIT_CALLS", "100000000")
+
+from sqlalchemy import event, update
+from fastapi.testclient import TestClient
+from app.main import app
+from app.database import SessionLocal, engine, Base
+from app.models import Event, TicketBatch, Order, Attendee
+from app.security import require_admin
+from app.services.orders import assign_qr_codes
+from app.services.qrcode.generator import generate_qr_payload
+
+PATHS = ("single", "batch", "offline")
+
+def seed(attendee_count: int) -> dict:
+    """Create an event with attendee_count paid tickets"""
+    db = SessionLocal()
+    try:
+        event_row = Event(
+            name="Check-in Benchmark",
+            start_date=datetime.utcnow() + timedelta(days=1),
+            end_date=datetime.utcnow() + timedelta(days=1, hours=8)
+        )
+        db.add(event_row)
+        db.flush()
+
+        batch = TicketBatch(
+            event_id=event_row.id,
+            name="Benchmark Batch",
+            price=Decimal("10.00"),
+            quantity=attendee_count,
+            sale_start=datetime.utcnow(),
+            sale_end=datetime.utcnow() + timedelta(days=1)
+        )
+        db.add(batch)
+        db.flush()
+
+        per_order = 4
+        order_ids = []
+        for start in range(0, attendee_count, per_order):
+            email = f"gate{start}@example.com"
+            order = Order(
+                event_id=event_row.id,
+                email=email,
+                full_name="Benchmark",
+                total_amount=Decimal("40.00"),
+                status="paid"
+            )
+            db.add(order)
+            db.flush()
+            order_ids.append(order.id)
+            db.add_all([
+                Attendee(order_id=order.id, ticket_batch_id=batch.id, full_name="Benchmark", email=email)
+                for _ in range(min(per_order, attendee_count - start))
+            ])
+        db.flush()
+        assign_qr_codes(db, order_ids)
+        db.commit()
+
+        tickets = db.query(Attendee.id, Attendee.order_id, Attendee.qr_code).filter(
+            Attendee.order_id.in_(order_ids)
+        ).all()
+        return {"event_id": event_row.id, "order_ids": order_ids, "tickets": tickets}
+    finally:
+        db.close()
+
+def reset_checkins(order_ids: list):
+    """Undo every check-in of the benchmark event"""
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(Attendee.__table__).where(
+                Attendee.__table__.c.order_id.in_(order_ids)
+            ).values(is_checked_in=False, checked_in_at=None, checked_in_by=None)
+        )
+        db.commit()
+    finally:
+        db.close()
+
+def build_scans(tickets: list, count: int, invalid: float, duplicate: float, rng: random.Random) -> list:
+    """Scan sequence of (kind, ticket) with kind valid/invalid/duplicate
+
+    Valid scans draw tickets without replacement; duplicates rescan a ticket
+    already seen earlier in the sequence. Once every ticket has been scanned
+    the remaining valid scans become duplicates.
+    """
+    unscanned = list(tickets)
+    rng.shuffle(unscanned)
+    scanned = []
+    scans = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < invalid:
+            scans.append(("invalid", rng.choice(tickets)))
+        elif (roll < invalid + duplicate and scanned) or not unscanned:
+            scans.append(("duplicate", rng.choice(scanned)))
+        else:
+            ticket = unscanned.pop()
+            scanned.append(ticket)
+            scans.append(("valid", ticket))
+    return scans
+
+def invalid_code(ticket, rng: random.Random) -> str:
+    """Either a tampered signature or a well-signed code for an unknown ticket"""
+    if rng.random() < 0.5:
+        last = ticket.qr_code[-1]
+        return ticket.qr_code[:-1] + ("A" if last != "A" else "B")
+    return generate_qr_payload(ticket.order_id, ticket.id + 10_000_000)
+
+def percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return round(sorted_values[index], 3)
+
+class StatementCounter:
+    """Counts statements sent to the database while active"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(engine, "before_cursor_execute", self)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(engine, "before_cursor_execute", self)
+
+def run_single(client, scans, args, rng):
+    for kind, ticket in scans:
+        code = invalid_code(ticket, rng) if kind == "invalid" else ticket.qr_code
+        response = client.get(f"/tickets/validate/{code}", headers={"X-Device-ID": "bench-single"})
+        if response.status_code != 200:
+            outcome = "invalid"
+        elif response.json().get("checked_in"):
+            outcome = "valid"
+        else:
+            outcome = "duplicate"
+        yield [outcome]
+
+def run_batch(client, scans, args, rng):
+    for start in range(0, len(scans), args.batch_size):
+        chunk = scans[start:start + args.batch_size]
+        codes = [invalid_code(t, rng) if kind == "invalid" else t.qr_code for kind, t in chunk]
+        response = client.post(
+            "/tickets/validate/batch",
+            json={"codes": codes},
+            headers={"X-Device-ID": "bench-batch"}
+        )
+        yield [
+            "invalid" if not r["valid"] else "valid" if r.get("checked_in") else "duplicate"
+            for r in response.json()["results"]
+        ]
+
+def run_offline(client, scans, args, rng):
+    started = datetime.utcnow()
+    for start in range(0, len(scans), args.batch_size):
+        chunk = scans[start:start + args.batch_size]
+        payload = [
+            {
+                "attendee_id": t.id + 10_000_000 if kind == "invalid" else t.id,
+                "scanned_at": (started + timedelta(milliseconds=start + i)).isoformat()
+            }
+            for i, (kind, t) in enumerate(chunk)
+        ]
+        response = client.post("/tickets/checkins/offline", json={
+            "event_id": args.event_id,
+            "device_id": "bench-offline",
+            "scans": payload
+        })
+        yield [
+            {"checked_in": "valid", "duplicate": "duplicate"}.get(r["status"], "invalid")
+            for r in response.json()["results"]
+        ]
+
+RUNNERS = {"single": run_single, "batch": run_batch, "offline": run_offline}
+
+def benchmark_path(client, path: str, scans: list, args) -> dict:
+    rng = random.Random(args.seed)
+    runner = RUNNERS[path](client, scans, args, rng)
+    latencies = []
+    outcomes = []
+
+    with StatementCounter() as statements:
+        started = time.perf_counter()
+        while True:
+            request_started = time.perf_counter()
+            try:
+                outcomes.extend(next(runner))
+            except StopIteration:
+                break
+            latencies.append((time.perf_counter() - request_started) * 1000)
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    mismatches = sum(1 for (kind, _), outcome in zip(scans, outcomes) if kind != outcome)
+    return {
+        "requests": len(latencies),
+        "scans": len(outcomes),
+        "elapsed_s": round(elapsed, 3),
+        "scans_per_s": round(len(outcomes) / elapsed, 1) if elapsed else None,
+        "latency_ms": {
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": round(latencies[-1], 3) if latencies else 0.0,
+        },
+        "statements": statements.count,
+        "statements_per_scan": round(statements.count / len(outcomes), 3) if outcomes else None,
+        "mismatches": mismatches,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Check-in throughput per validation path")
+    parser.add_argument("--attendees", type=int, default=1000, help="tickets to seed")
+    parser.add_argument("--scans", type=int, default=2000, help="scans replayed per path")
+    parser.add_argument("--batch-size", type=int, default=20, help="codes per batch/offline request")
+    parser.add_argument("--invalid", type=float, default=0.1, help="fraction of invalid scans")
+    parser.add_argument("--duplicate", type=float, default=0.2, help="fraction of duplicate scans")
+    parser.add_argument("--seed", type=int, default=42, help="random seed for the scan sequence")
+    parser.add_argument("--paths", default=",".join(PATHS), help="comma-separated paths to run")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    paths = [p.strip() for p in args.paths.split(",") if p.strip()]
+    unknown = set(paths) - set(PATHS)
+    if unknown:
+        parser.error(f"unknown paths: {', '.join(sorted(unknown))}")
+
+    Base.metadata.create_all(bind=engine)
+    seeded = seed(args.attendees)
+    args.event_id = seeded["event_id"]
+    scans = build_scans(seeded["tickets"], args.scans, args.invalid, args.duplicate, random.Random(args.seed))
+
+    app.dependency_overrides[require_admin] = lambda: {"id": "checkin-benchmark"}
+    report = {
+        "timestamp": datetime.utcnow().isoformat(),
+        "database": engine.dialect.name,
+        "config": {
+            "attendees": args.attendees,
+            "scans": args.scans,
+            "batch_size": args.batch_size,
+            "invalid": args.invalid,
+            "duplicate": args.duplicate,
+            "seed": args.seed,
+        },
+        "mix": {kind: sum(1 for k, _ in scans if k == kind) for kind in ("valid", "invalid", "duplicate")},
+        "paths": {},
+    }
+    try:
+        with TestClient(app) as client:
+            for path in paths:
+                reset_checkins(seeded["order_ids"])
+                report["paths"][path] = benchmark_path(client, path, scans, args)
+    finally:
+        app.dependency_overrides.pop(require_admin, None)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
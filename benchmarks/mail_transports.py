@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Mail transport throughput benchmark
+
+Sends --messages confirmation emails (with --tickets QR attachments each)
+from --concurrency threads through each transport and reports messages/s,
+per-send latency percentiles and SMTP connections opened, as JSON:
+
+    file           Maildir sink in a temporary directory
+    smtp           pooled persistent connections (SMTP_POOL_SIZE)
+    smtp-unpooled  a new connection per message, the baseline for pooling
+    ses            the real SES account in settings; only when asked for
+
+Without --smtp-host the SMTP transports talk to a local sink server that
+accepts and discards everything, adding --rtt-ms to every reply and
+--connect-ms to every new connection to stand in for network round trips
+and the TLS/AUTH handshake.
+
+Usage:
+    python benchmarks/mail_transports.py [--messages N] [--tickets N]
+                                         [--concurrency N] [--rtt-ms MS]
+                                         [--connect-ms MS] [--smtp-host HOST]
+                                         [--smtp-port N]
+                                         [--transports file,smtp,smtp-unpooled]
+                                         [--output FILE]
+"""
+import sys
+import os
+import argparse
+import json
+import socketserver
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.services.emails.file_sink import MaildirTransport
+from app.services.emails.mailer import build_confirmation_email
+from app.services.emails.smtp import SMTPTransport
+from app.services.qrcode.renderer import render_qr_image
+
+class SinkSMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough ESMTP to accept messages and throw them away"""
+
+    def reply(self, line: str):
+        time.sleep(self.server.rtt_s)
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        time.sleep(self.server.connect_s)
+        self.reply("220 sink ESMTP")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors="replace").strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                self.reply("250 sink")
+            elif command == "DATA":
+                self.reply("354 go ahead")
+                while self.rfile.readline() not in (b".\r\n", b""):
+                    pass
+                self.reply("250 queued")
+            elif command == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                # MAIL, RCPT, RSET, NOOP
+                self.reply("250 ok")
+
+class SinkSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, rtt_ms: float, connect_ms: float):
+        super().__init__(("127.0.0.1", 0), SinkSMTPHandler)
+        self.rtt_s = rtt_ms / 1000
+        self.connect_s = connect_ms / 1000
+
+def percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return round(sorted_values[index], 2)
+
+def make_transport(name: str, host: str, port: int, concurrency: int):
+    if name == "file":
+        return MaildirTransport(os.path.join(tempfile.mkdtemp(), "mail"))
+    if name == "smtp":
+        return SMTPTransport(host=host, port=port, pool_size=concurrency)
+    if name == "smtp-unpooled":
+        return SMTPTransport(host=host, port=port, pool_size=concurrency, max_messages=1)
+    if name == "ses":
+        from app.services.emails.ses_mailer import SESTransport
+        return SESTransport()
+    raise ValueError(f"Unknown transport {name!r}")
+
+def run(transport, messages: list, concurrency: int) -> dict:
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def send(message):
+        started = time.perf_counter()
+        try:
+            transport.send(message)
+        except Exception as e:
+            with lock:
+                errors.append(str(e))
+            return
+        with lock:
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(send, messages))
+    elapsed = time.perf_counter() - started
+    transport.close()
+
+    latencies.sort()
+    result = {
+        "sent": len(latencies),
+        "errors": len(errors),
+        "elapsed_s": round(elapsed, 3),
+        "messages_per_s": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "send_ms": {
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+        },
+    }
+    if isinstance(transport, SMTPTransport):
+        result["connections_opened"] = transport.connections_opened
+    if errors:
+        result["first_error"] = errors[0]
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Messages/s per mail transport")
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--tickets", type=int, default=2, help="QR attachments per message")
+    parser.add_argument("--concurrency", type=int, default=settings.email_send_workers)
+    parser.add_argument("--rtt-ms", type=float, default=2, help="sink server delay per SMTP reply")
+    parser.add_argument("--connect-ms", type=float, default=30, help="sink server delay per new connection")
+    parser.add_argument("--smtp-host", help="use this relay instead of the local sink server")
+    parser.add_argument("--smtp-port", type=int, default=settings.smtp_port)
+    parser.add_argument("--transports", default="file,smtp,smtp-unpooled")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    host, port, server = args.smtp_host, args.smtp_port, None
+    if not host:
+        server = SinkSMTPServer(args.rtt_ms, args.connect_ms)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = server.server_address
+
+    qr_codes = [render_qr_image(f"bench-{n}") for n in range(args.tickets)]
+    messages = [
+        build_confirmation_email(f"bench{i}@example.com", "Benchmark", "Mail Benchmark", qr_codes, i)
+        for i in range(args.messages)
+    ]
+
+    report = {
+        "timestamp": datetime.utcnow().isoformat(),
+        "config": {
+            "messages": args.messages,
+            "tickets_per_message": args.tickets,
+            "message_bytes": len(messages[0].as_bytes()),
+            "concurrency": args.concurrency,
+            "smtp": f"{host}:{port}" if args.smtp_host else f"sink (rtt {args.rtt_ms}ms, connect {args.connect_ms}ms)",
+        },
+        "transports": {},
+    }
+    for name in args.transports.split(","):
+        transport = make_transport(name, host, port, args.concurrency)
+        report["transports"][name] = run(transport, messages, args.concurrency)
+
+    if server:
+        server.shutdown()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
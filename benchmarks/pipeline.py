@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Purchase → confirmation email pipeline benchmark
+
+Creates and pays --orders orders through the checkout routes, which stage
+one confirmation message each in the outbox, relays the outbox to the
+queue, then drains the queue with a worker. SES is
+replaced by an in-memory mailer that sleeps --send-ms per email, so the
+numbers reflect queue, database and QR rendering cost plus a fixed,
+realistic send latency. All purchases happen before the worker starts
+draining, like a sell-out, so paid_to_email includes time spent queued
+behind the backlog.
+
+Runs on one machine with QUEUE_BACKEND=local (default here) or against
+Redis/SQS when configured. Point DATABASE_URL at a throwaway database.
+
+Usage:
+    python benchmarks/pipeline.py [--orders N] [--tickets N] [--concurrency N]
+                                  [--send-ms MS] [--output FILE]
+"""
+import sys
+import os
+import argparse
+import json
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("QUEUE_BACKEND", "local")
+os.environ.setdefault("LOCAL_QUEUE_PATH", os.path.join(tempfile.mkdtemp(), "queue.db"))
+os.environ.setdefault("RATE_LIMIT_CALLS", "100000000")
+
+from fastapi.testclient import TestClient
+from app.main import app
+from app.config import settings
+from app.database import SessionLocal, engine, Base
+from app.models import Event, TicketBatch
+from app.services.queue.factory import get_queue
+from app.tasks.outbox_relay import OutboxRelay
+from app.tasks.sqs_worker import QueueWorker
+
+class TimingMailer:
+    """Stands in for SES: records when each order's tickets went out"""
+
+    def __init__(self, send_ms: float):
+        self.send_s = send_ms / 1000
+        self.sent_at = {}
+        self.count = 0
+        self.emails = 0
+        self._lock = threading.Lock()
+
+    def send_confirmation_email(self, to_email, attendee_name, event_name, qr_code_data, order_id):
+        time.sleep(self.send_s)
+        with self._lock:
+            self.emails += 1
+            # One email carries all of a recipient's tickets
+            self.count += len(qr_code_data)
+            self.sent_at[order_id] = time.perf_counter()
+        return {"success": True, "message_id": f"bench-{self.emails}"}
+
+def seed_event(ticket_count: int) -> tuple:
+    db = SessionLocal()
+    try:
+        event_row = Event(
+            name="Pipeline Benchmark",
+            start_date=datetime.utcnow() + timedelta(days=7),
+            end_date=datetime.utcnow() + timedelta(days=7, hours=8)
+        )
+        db.add(event_row)
+        db.flush()
+        batch = TicketBatch(
+            event_id=event_row.id,
+            name="Pipeline Batch",
+            price=Decimal("10.00"),
+            quantity=ticket_count,
+            sale_start=datetime.utcnow(),
+            sale_end=datetime.utcnow() + timedelta(days=7)
+        )
+        db.add(batch)
+        db.commit()
+        return event_row.id, batch.id
+    finally:
+        db.close()
+
+def percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return round(sorted_values[index], 1)
+
+def main():
+    parser = argparse.ArgumentParser(description="Purchase to confirmation email throughput")
+    parser.add_argument("--orders", type=int, default=200)
+    parser.add_argument("--tickets", type=int, default=2, help="tickets per order")
+    parser.add_argument("--concurrency", type=int, default=settings.worker_concurrency, help="worker threads")
+    parser.add_argument("--send-ms", type=float, default=50, help="simulated SES latency per email")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    event_id, batch_id = seed_event(args.orders * args.tickets)
+
+    queue = get_queue()
+    worker = QueueWorker(queue=queue, concurrency=args.concurrency)
+    worker.mailer = TimingMailer(args.send_ms)
+    expected = args.orders * args.tickets
+
+    paid_at = {}
+    with TestClient(app) as client:
+        started = time.perf_counter()
+        for i in range(args.orders):
+            order_id = client.post("/checkout/order", json={
+                "event_id": event_id,
+                "email": f"pipeline{i}@example.com",
+                "full_name": "Pipeline Benchmark",
+                "items": [{"ticket_batch_id": batch_id, "quantity": args.tickets}]
+            }).json()["id"]
+            client.get(f"/checkout/success?order_id={order_id}")
+            paid_at[order_id] = time.perf_counter()
+        purchase_s = time.perf_counter() - started
+
+    relay = OutboxRelay()
+    relay_started = time.perf_counter()
+    while relay.relay_once():
+        pass
+    relay_s = time.perf_counter() - relay_started
+
+    drain_started = time.perf_counter()
+    while worker.mailer.count < expected:
+        messages = queue.receive(max_messages=10, wait_seconds=1, visibility_timeout=settings.sqs_visibility_timeout)
+        if not messages:
+            break
+        worker.handle_batch(messages)
+    drain_s = time.perf_counter() - drain_started
+    worker.close()
+
+    latencies = sorted(
+        (worker.mailer.sent_at[order_id] - paid) * 1000
+        for order_id, paid in paid_at.items() if order_id in worker.mailer.sent_at
+    )
+    report = {
+        "timestamp": datetime.utcnow().isoformat(),
+        "queue_backend": settings.queue_backend,
+        "database": engine.dialect.name,
+        "config": {
+            "orders": args.orders,
+            "tickets_per_order": args.tickets,
+            "concurrency": args.concurrency,
+            "send_ms": args.send_ms,
+        },
+        "purchases_per_s": round(args.orders / purchase_s, 1),
+        "relay_s": round(relay_s, 3),
+        "tickets_sent": worker.mailer.count,
+        "tickets_expected": expected,
+        "emails_sent": worker.mailer.emails,
+        "drain_s": round(drain_s, 3),
+        "tickets_per_s": round(worker.mailer.count / drain_s, 1) if drain_s else None,
+        "paid_to_email_ms": {
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+        },
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+QR payload micro-benchmark
+
+Measures generate/verify throughput for the compact payload format and
+for legacy order:attendee:signature codes, and the QR version each
+format needs.
+
+Usage:
+    python benchmarks/qr_verify.py [--iterations N]
+"""
+import sys
+import os
+import argparse
+import hashlib
+import hmac
+import json
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import qrcode
+from app.config import settings
+from app.services.qrcode.generator import generate_qr_payload, verify_qr_payload
+
+def legacy_payload(order_id: int, attendee_id: int) -> str:
+    """Payload as produced before the compact format"""
+    data = f"{order_id}:{attendee_id}"
+    signature = hmac.new(settings.secret_key.encode(), data.encode(), hashlib.sha256).hexdigest()[:16]
+    return f"{data}:{signature}"
+
+def legacy_verify_uncached(payload: str) -> bool:
+    """Verification as done before keyed HMAC states were cached"""
+    order_id, attendee_id, signature = payload.split(":")
+    expected = hmac.new(
+        settings.secret_key.encode(), f"{order_id}:{attendee_id}".encode(), hashlib.sha256
+    ).hexdigest()[:16]
+    return hmac.compare_digest(signature, expected)
+
+def qr_version(payload: str) -> int:
+    qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_L)
+    qr.add_data(payload)
+    qr.make(fit=True)
+    return qr.version
+
+def rate(func, args_list, iterations: int) -> float:
+    """Calls per second of func over args_list, repeated iterations times"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for args in args_list:
+            func(*args)
+    elapsed = time.perf_counter() - start
+    return round(iterations * len(args_list) / elapsed)
+
+def main():
+    parser = argparse.ArgumentParser(description="QR payload generate/verify throughput")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    ids = [(10_000 + i, 250_000 + i) for i in range(100)]
+    compact = [(generate_qr_payload(o, a),) for o, a in ids]
+    legacy = [(legacy_payload(o, a),) for o, a in ids]
+    assert all(verify_qr_payload(p)["valid"] for (p,) in compact + legacy)
+
+    results = {
+        "compact": {
+            "generate_per_s": rate(generate_qr_payload, ids, args.iterations),
+            "verify_per_s": rate(verify_qr_payload, compact, args.iterations),
+            "length": len(compact[0][0]),
+            "qr_version": qr_version(compact[0][0]),
+        },
+        "legacy": {
+            "verify_per_s": rate(verify_qr_payload, legacy, args.iterations),
+            "verify_uncached_per_s": rate(legacy_verify_uncached, legacy, args.iterations),
+            "length": len(legacy[0][0]),
+            "qr_version": qr_version(legacy[0][0]),
+        },
+    }
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Payment reconciliation benchmark
+
+Inserts --orders pending orders (one ticket each) an hour old and runs one
+reconciliation pass over them. Mercado Pago is replaced by an in-memory
+provider that sleeps --latency-ms per search and reports --approved of the
+orders as approved, so the numbers reflect the rate limit, concurrency and
+bulk database writes plus a fixed, realistic API latency. Reports orders
+checked per minute as JSON.
+
+Point DATABASE_URL at a throwaway database.
+
+Usage:
+    python benchmarks/reconcile.py [--orders N] [--latency-ms MS]
+                                   [--concurrency N] [--rate-limit N]
+                                   [--batch-size N] [--approved FRACTION]
+                                   [--output FILE]
+"""
+import sys
+import os
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.database import SessionLocal, engine, Base
+from app.models import Event, TicketBatch, Order, Attendee
+from app.services.payments.reconcile import PaymentReconciler
+
+class SlowProvider:
+    """Stands in for Mercado Pago's payment search"""
+
+    def __init__(self, latency_ms: float, approved: float):
+        self.latency_s = latency_ms / 1000
+        self.approve_every = round(1 / approved) if approved else 0
+
+    def find_payments(self, external_reference: str):
+        time.sleep(self.latency_s)
+        order_id = int(external_reference)
+        if self.approve_every and order_id % self.approve_every == 0:
+            return [{
+                "payment_id": f"bench-{order_id}", "status": "approved",
+                "external_reference": external_reference, "amount": 10, "payment_method": "pix"
+            }]
+        return []
+
+def seed_orders(count: int) -> None:
+    db = SessionLocal()
+    try:
+        event = Event(
+            name="Reconciliation Benchmark",
+            start_date=datetime.utcnow() + timedelta(days=7),
+            end_date=datetime.utcnow() + timedelta(days=7, hours=8)
+        )
+        db.add(event)
+        db.flush()
+        batch = TicketBatch(
+            event_id=event.id, name="Batch", price=Decimal("10.00"), quantity=count,
+            sale_start=datetime.utcnow(), sale_end=datetime.utcnow() + timedelta(days=7)
+        )
+        db.add(batch)
+        db.flush()
+        created = datetime.utcnow() - timedelta(hours=1)
+        orders = [
+            Order(event_id=event.id, email=f"reconcile{i}@example.com", full_name="Benchmark",
+                  total_amount=Decimal("10.00"), status="pending", created_at=created)
+            for i in range(count)
+        ]
+        db.add_all(orders)
+        db.flush()
+        db.add_all(
+            Attendee(order_id=order.id, ticket_batch_id=batch.id, full_name="Benchmark", email=order.email)
+            for order in orders
+        )
+        db.commit()
+    finally:
+        db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Payment reconciliation throughput")
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--latency-ms", type=float, default=150, help="simulated search latency")
+    parser.add_argument("--concurrency", type=int, default=settings.reconcile_concurrency)
+    parser.add_argument("--rate-limit", type=float, default=settings.reconcile_rate_limit, help="provider calls/s")
+    parser.add_argument("--batch-size", type=int, default=settings.reconcile_batch_size)
+    parser.add_argument("--approved", type=float, default=0.1, help="fraction of orders found paid")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    seed_orders(args.orders)
+
+    reconciler = PaymentReconciler(
+        provider=SlowProvider(args.latency_ms, args.approved),
+        concurrency=args.concurrency,
+        rate_limit=args.rate_limit,
+        batch_size=args.batch_size
+    )
+    db = SessionLocal()
+    started = time.perf_counter()
+    try:
+        totals = reconciler.run_once(db)
+    finally:
+        db.close()
+    elapsed = time.perf_counter() - started
+
+    report = {
+        "timestamp": datetime.utcnow().isoformat(),
+        "config": {
+            "orders": args.orders,
+            "latency_ms": args.latency_ms,
+            "concurrency": args.concurrency,
+            "rate_limit": args.rate_limit,
+            "batch_size": args.batch_size,
+        },
+        "totals": totals,
+        "elapsed_s": round(elapsed, 2),
+        "orders_per_min": round(totals["checked"] / elapsed * 60) if elapsed else None,
+        "ceiling_per_min": round(min(args.rate_limit, args.concurrency / (args.latency_ms / 1000 or 1)) * 60),
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Ticket PDF rendering benchmark
+
+Renders --tickets synthetic tickets of one event through the PDF pipeline
+into a temporary directory and reports tickets/s, PDF size and the time
+10,000 tickets would take at that rate, as JSON. --artwork adds a
+generated banner so artwork decoding and cropping are part of the layout
+cost. No database is involved.
+
+Usage:
+    python benchmarks/ticket_pdfs.py [--tickets N] [--workers N]
+                                     [--chunk-size N] [--artwork]
+                                     [--output FILE]
+"""
+import sys
+import os
+import argparse
+import io
+import json
+import tempfile
+import time
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw
+from app.services.tickets.pipeline import TicketPDFPipeline, TICKETS_PER_TASK
+from app.services.tickets.sinks import LocalTicketSink
+
+class CountingSink(LocalTicketSink):
+    def __init__(self, directory: str):
+        super().__init__(directory)
+        self.count = 0
+        self.bytes = 0
+
+    def write(self, key: str, data: bytes) -> None:
+        super().write(key, data)
+        self.count += 1
+        self.bytes += len(data)
+
+def banner() -> bytes:
+    image = Image.new("RGB", (1600, 600))
+    draw = ImageDraw.Draw(image)
+    for x in range(0, 1600, 8):
+        draw.line((x, 0, x, 600), fill=(x % 256, (x // 3) % 256, 180))
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
+
+def main():
+    parser = argparse.ArgumentParser(description="Ticket PDF rendering throughput")
+    parser.add_argument("--tickets", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-size", type=int, default=TICKETS_PER_TASK)
+    parser.add_argument("--artwork", action="store_true", help="include a banner image")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    event = {
+        "id": 1,
+        "name": "Festival de Benchmark de Ingressos",
+        "start_date": datetime.utcnow() + timedelta(days=30),
+        "location": "Arena Central, São Paulo - SP",
+        "artwork": banner() if args.artwork else None,
+        "layout_key": f"bench:{time.time()}",
+    }
+    tickets = (
+        {
+            "attendee_id": n,
+            "order_id": n // 2 + 1,
+            "full_name": f"Participante Número {n}",
+            "qr_code": f"BENCHMARKPAYLOAD{n:08d}",
+            "batch_name": "Pista - Segundo Lote",
+        }
+        for n in range(1, args.tickets + 1)
+    )
+
+    sink = CountingSink(tempfile.mkdtemp())
+    pipeline = TicketPDFPipeline(sink, workers=args.workers, chunk_size=args.chunk_size)
+    started = time.perf_counter()
+    pipeline.render(event, tickets)
+    elapsed = time.perf_counter() - started
+
+    rate = sink.count / elapsed if elapsed else 0
+    report = {
+        "timestamp": datetime.utcnow().isoformat(),
+        "config": {
+            "tickets": args.tickets,
+            "workers": args.workers,
+            "chunk_size": args.chunk_size,
+            "artwork": args.artwork,
+        },
+        "rendered": sink.count,
+        "elapsed_s": round(elapsed, 2),
+        "tickets_per_s": round(rate, 1),
+        "avg_pdf_kb": round(sink.bytes / sink.count / 1024, 1) if sink.count else None,
+        "projected_10k_s": round(10000 / rate, 1) if rate else None,
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Backfill QR payloads for paid orders
+
+Orders paid before QR payloads were issued at payment time have attendees
+with a NULL qr_code. This walks those orders by id in chunks, assigns the
+missing payloads with one set-based UPDATE per chunk and commits after
+each chunk, so locks are short-lived and an interrupted run can simply be
+restarted.
+
+Usage:
+    python scripts/backfill_qr_codes.py [--chunk-size N] [--dry-run]
+"""
+import sys
+import os
+import argparse
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app.models import Order, Attendee
+from app.services.orders import assign_qr_codes
+
+def pending_order_ids(db, after_id: int, limit: int) -> list:
+    """Next paid order ids (keyset, ascending) with attendees lacking a QR payload"""
+    rows = db.query(Attendee.order_id).join(
+        Order, Order.id == Attendee.order_id
+    ).filter(
+        Order.status == "paid",
+        Attendee.qr_code.is_(None),
+        Attendee.order_id > after_id
+    ).distinct().order_by(Attendee.order_id).limit(limit).all()
+    return [order_id for order_id, in rows]
+
+def backfill(chunk_size: int, dry_run: bool = False) -> dict:
+    db = SessionLocal()
+    totals = {"orders": 0, "attendees": 0, "chunks": 0}
+    last_id = 0
+    try:
+        while True:
+            order_ids = pending_order_ids(db, last_id, chunk_size)
+            if not order_ids:
+                break
+            last_id = order_ids[-1]
+
+            if dry_run:
+                count = db.query(Attendee.id).filter(
+                    Attendee.order_id.in_(order_ids),
+                    Attendee.qr_code.is_(None)
+                ).count()
+            else:
+                count = assign_qr_codes(db, order_ids)
+                db.commit()
+
+            totals["orders"] += len(order_ids)
+            totals["attendees"] += count
+            totals["chunks"] += 1
+            print(f"  orders {order_ids[0]}..{last_id}: {count} tickets")
+        return totals
+    finally:
+        db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Assign QR payloads to tickets of paid orders")
+    parser.add_argument("--chunk-size", type=int, default=200, help="orders per transaction")
+    parser.add_argument("--dry-run", action="store_true", help="only count tickets missing a payload")
+    args = parser.parse_args()
+
+    print("🦆 DuckTickets - QR payload backfill")
+    print("=" * 40)
+
+    started = time.perf_counter()
+    totals = backfill(max(1, args.chunk_size), args.dry_run)
+    elapsed = time.perf_counter() - started
+
+    verb = "would be updated" if args.dry_run else "updated"
+    print(f"✅ {totals['attendees']} tickets in {totals['orders']} orders {verb} "
+          f"({totals['chunks']} chunks, {elapsed:.1f}s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Generate printable ticket PDFs for an event
+
+Renders one PDF per paid ticket of the event (event artwork and details,
+batch name, attendee name and QR code) on a process pool and writes them
+to tickets/<event_id>/<attendee_id>.pdf under --output-dir, or to the
+assets bucket with --s3. Safe to re-run; existing files are overwritten.
+
+Usage:
+    python scripts/generate_ticket_pdfs.py EVENT_ID [--output-dir DIR | --s3]
+                                                    [--workers N]
+"""
+import sys
+import os
+import argparse
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.database import SessionLocal
+from app.services.tickets.pipeline import TicketPDFPipeline
+from app.services.tickets.sinks import LocalTicketSink, S3TicketSink
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate ticket PDFs for an event")
+    parser.add_argument("event_id", type=int)
+    parser.add_argument("--output-dir", default=settings.ticket_pdf_dir)
+    parser.add_argument("--s3", action="store_true", default=settings.ticket_pdf_s3, help="upload to the assets bucket")
+    parser.add_argument("--workers", type=int, help="render processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    sink = S3TicketSink() if args.s3 else LocalTicketSink(args.output_dir)
+    pipeline = TicketPDFPipeline(sink, workers=args.workers)
+    db = SessionLocal()
+    started = time.perf_counter()
+    try:
+        rendered = pipeline.render_event(db, args.event_id)
+    finally:
+        db.close()
+        sink.close()
+    elapsed = time.perf_counter() - started
+
+    destination = f"s3://{settings.s3_bucket}" if args.s3 else args.output_dir
+    print(f"Rendered {rendered} ticket(s) to {destination} in {elapsed:.1f}s ({rendered / elapsed:.0f}/s)" if elapsed else "")
+    if isinstance(sink, S3TicketSink) and sink.failed:
+        print(f"{sink.failed} upload(s) failed")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
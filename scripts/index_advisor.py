@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Missing-index advisor
+
+Replays the app's read routes against a seeded database, captures every
+SQL statement they issue and runs EXPLAIN on each one. Statements whose
+plan contains a sequential scan on a filtered table are reported.
+
+Usage:
+    python scripts/index_advisor.py [--seed N]
+
+--seed N creates a throwaway event with N paid attendees first. On
+PostgreSQL sequential scans are disabled for the EXPLAIN session, so the
+planner only falls back to one when no index can serve the filter; that
+keeps the report meaningful on small datasets.
+"""
+import sys
+import os
+import argparse
+import json
+from datetime import datetime, timedelta
+from decimal import Decimal
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+from fastapi.testclient import TestClient
+from app.main import app
+from app.database import SessionLocal, engine, Base
+from app.models import Event, TicketBatch, Order, Attendee
+from app.query_stats import fingerprint
+
+def seed(attendee_count: int) -> dict:
+    """Create an event with paid orders and return route parameters"""
+    db = SessionLocal()
+    try:
+        event_row = Event(
+            name="Index Advisor Event",
+            start_date=datetime.utcnow() + timedelta(days=30),
+            end_date=datetime.utcnow() + timedelta(days=30, hours=8)
+        )
+        db.add(event_row)
+        db.flush()
+
+        batch = TicketBatch(
+            event_id=event_row.id,
+            name="Advisor Batch",
+            price=Decimal("10.00"),
+            quantity=attendee_count,
+            sale_start=datetime.utcnow(),
+            sale_end=datetime.utcnow() + timedelta(days=20)
+        )
+        db.add(batch)
+        db.flush()
+
+        per_order = 4
+        for start in range(0, attendee_count, per_order):
+            email = f"advisor{start}@example.com"
+            order = Order(
+                event_id=event_row.id,
+                email=email,
+                full_name="Index Advisor",
+                total_amount=Decimal("40.00"),
+                status="paid"
+            )
+            db.add(order)
+            db.flush()
+            for _ in range(min(per_order, attendee_count - start)):
+                db.add(Attendee(
+                    order_id=order.id,
+                    ticket_batch_id=batch.id,
+                    full_name="Index Advisor",
+                    email=email
+                ))
+        db.commit()
+        return {"event_id": event_row.id, "email": "advisor0@example.com"}
+    finally:
+        db.close()
+
+def existing_params() -> dict:
+    """Route parameters taken from data already in the database"""
+    db = SessionLocal()
+    try:
+        order = db.query(Order).order_by(Order.id.desc()).first()
+        if not order:
+            return {}
+        return {"event_id": order.event_id, "email": order.email}
+    finally:
+        db.close()
+
+def routes(params: dict) -> list:
+    """Read routes exercised by the advisor"""
+    event_id = params["event_id"]
+    email = params["email"]
+    return [
+        "/",
+        "/admin/status",
+        "/admin/events",
+        f"/admin/batches/{event_id}",
+        f"/admin/attendees?event_id={event_id}",
+        f"/admin/orders?event_id={event_id}",
+        "/admin/sync",
+        f"/checkout/?event_id={event_id}",
+        f"/user/orders?email={email}",
+        f"/api/user/tickets?email={email}",
+    ]
+
+def capture_statements(paths: list) -> dict:
+    """Run each route and collect its distinct statements with parameters"""
+    captured = {}
+    current = {"path": None}
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if executemany or not statement.lstrip().upper().startswith("SELECT"):
+            return
+        key = fingerprint(statement)
+        if key not in captured:
+            captured[key] = {"path": current["path"], "statement": statement, "parameters": parameters}
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        with TestClient(app) as client:
+            for path in paths:
+                current["path"] = path
+                response = client.get(path)
+                if response.status_code >= 400:
+                    print(f"⚠️  {path} returned {response.status_code}")
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+    return captured
+
+def sequential_scans(conn, statement: str, parameters) -> list:
+    """Tables read with a full/sequential scan in the statement's plan"""
+    dialect = conn.dialect.name
+
+    if dialect == "postgresql":
+        result = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+        plan = result if isinstance(result, list) else json.loads(result)
+        scans = []
+        stack = [plan[0]["Plan"]]
+        while stack:
+            node = stack.pop()
+            if node.get("Node Type") == "Seq Scan":
+                scans.append(node.get("Relation Name"))
+            stack.extend(node.get("Plans", []))
+        return scans
+
+    if dialect == "sqlite":
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+        scans = []
+        for row in rows:
+            detail = row[-1]
+            # "SCAN t" is a full scan; "SCAN t USING (COVERING) INDEX" is not
+            if detail.startswith("SCAN ") and " INDEX " not in detail + " ":
+                scans.append(detail.split()[1])
+        return scans
+
+    raise RuntimeError(f"EXPLAIN not supported for dialect {dialect}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Flag route queries that need an index")
+    parser.add_argument("--seed", type=int, default=0, help="seed an event with N attendees first")
+    args = parser.parse_args()
+
+    print("🦆 DuckTickets - Index Advisor")
+    print("=" * 40)
+
+    Base.metadata.create_all(bind=engine)
+    params = seed(args.seed) if args.seed else existing_params()
+    if not params:
+        print("❌ No orders found; run with --seed N")
+        sys.exit(1)
+
+    captured = capture_statements(routes(params))
+    print(f"Captured {len(captured)} distinct statements")
+
+    findings = []
+    with engine.connect() as conn:
+        if conn.dialect.name == "postgresql":
+            conn.exec_driver_sql("SET enable_seqscan = off")
+        for item in captured.values():
+            # Unfiltered listings scan by design
+            if " WHERE " not in item["statement"].upper() and " JOIN " not in item["statement"].upper():
+                continue
+            scans = sequential_scans(conn, item["statement"], item["parameters"])
+            if scans:
+                findings.append((item, scans))
+
+    if not findings:
+        print("✅ No sequential scans on filtered queries")
+        return
+
+    for item, scans in findings:
+        print(f"\n❌ {item['path']}: sequential scan on {', '.join(sorted(set(scans)))}")
+        print(f"   {' '.join(item['statement'].split())}")
+    sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+import base64
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+import pytest
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
+from conftest import TestingSessionLocal
+from app.main import app
+from app.config import settings
+from app.models import Attendee, Order, TicketBatch
+from app.security import require_admin
+from app.services import checkin
+from app.services.checkin import qr_hash, check_in_ticket, apply_offline_checkins
+from app.services.qrcode.generator import generate_qr_payload
+
+@pytest.fixture
+def admin(client):
+    app.dependency_overrides[require_admin] = lambda: {"id": "gate-admin"}
+    yield
+    app.dependency_overrides.pop(require_admin, None)
+
+@pytest.fixture
+def paid_tickets(client, sample_event):
+    """Three paid tickets with QR payloads; returns (event_id, [(attendee_id, qr)])"""
+    db = TestingSessionLocal()
+    batch = db.query(TicketBatch).filter(TicketBatch.event_id == sample_event).first()
+    order = Order(
+        event_id=sample_event,
+        email="gate@example.com",
+        full_name="Gate Tester",
+        total_amount=Decimal("299.70"),
+        status="paid"
+    )
+    db.add(order)
+    db.flush()
+    attendees = [
+        Attendee(order_id=order.id, ticket_batch_id=batch.id, full_name="Gate Tester", email="gate@example.com")
+        for _ in range(3)
+    ]
+    db.add_all(attendees)
+    db.flush()
+    for attendee in attendees:
+        attendee.qr_code = generate_qr_payload(order.id, attendee.id)
+    db.commit()
+    tickets = [(a.id, a.qr_code) for a in attendees]
+    db.close()
+    return sample_event, tickets
+
+def test_manifest_is_signed_and_sorted(client, admin, paid_tickets):
+    event_id, tickets = paid_tickets
+    manifest = client.get(f"/tickets/manifest/{event_id}").json()
+    key = client.get("/tickets/manifest/public-key").json()["public_key"]
+
+    signature = base64.b64decode(manifest.pop("signature"))
+    body = json.dumps(manifest, sort_keys=True, separators=(",", ":")).encode()
+    Ed25519PublicKey.from_public_bytes(base64.b64decode(key)).verify(signature, body)
+
+    hashes = [entry[0] for entry in manifest["tickets"]]
+    assert hashes == sorted(hashes)
+    assert set(hashes) == {qr_hash(qr) for _, qr in tickets}
+    assert manifest["checked_in"] == []
+
+def test_offline_upload_first_scan_wins(client, admin, paid_tickets):
+    event_id, tickets = paid_tickets
+    first, second, _ = [attendee_id for attendee_id, _ in tickets]
+    t0 = datetime(2030, 1, 1, 20, 0, 0)
+
+    response = client.post("/tickets/checkins/offline", json={
+        "event_id": event_id,
+        "device_id": "gate-1",
+        "scans": [
+            {"attendee_id": first, "scanned_at": (t0 + timedelta(seconds=5)).isoformat()},
+            {"attendee_id": first, "scanned_at": t0.isoformat()},
+            {"attendee_id": 999999, "scanned_at": t0.isoformat()},
+        ]
+    }).json()
+    assert [r["status"] for r in response["results"]] == ["duplicate", "checked_in", "invalid"]
+
+    # A later upload from another gate can't move the check-in forward,
+    # but an earlier scan replaces it
+    response = client.post("/tickets/checkins/offline", json={
+        "event_id": event_id,
+        "device_id": "gate-2",
+        "scans": [
+            {"attendee_id": first, "scanned_at": (t0 + timedelta(seconds=1)).isoformat()},
+            {"attendee_id": second, "scanned_at": t0.isoformat()},
+        ]
+    }).json()
+    assert [r["status"] for r in response["results"]] == ["duplicate", "checked_in"]
+
+    db = TestingSessionLocal()
+    checked_in_at = db.query(Attendee.checked_in_at).filter(Attendee.id == first).scalar()
+    db.close()
+    assert checked_in_at == t0
+
+    manifest = client.get(f"/tickets/manifest/{event_id}").json()
+    assert manifest["checked_in"] == sorted([first, second])
+
+def test_offline_scan_losing_the_race_is_a_duplicate(client, paid_tickets, monkeypatch):
+    event_id, tickets = paid_tickets
+    attendee_id = tickets[0][0]
+    t0 = datetime(2030, 1, 1, 20, 0, 0)
+    write_checkins = checkin._write_checkins
+
+    def other_gate_first(db, rows, device_id):
+        # Another gate checks the ticket in, earlier, after our read
+        other = TestingSessionLocal()
+        other.query(Attendee).filter(Attendee.id == attendee_id).update(
+            {Attendee.is_checked_in: True, Attendee.checked_in_at: t0 - timedelta(minutes=1)}
+        )
+        other.commit()
+        other.close()
+        return write_checkins(db, rows, device_id)
+
+    monkeypatch.setattr(checkin, "_write_checkins", other_gate_first)
+    scanned_at = t0.replace(tzinfo=timezone.utc)
+    scans = [{"attendee_id": attendee_id, "scanned_at": scanned_at}]
+    db = TestingSessionLocal()
+    try:
+        results = apply_offline_checkins(db, event_id, scans, "gate-1")
+    finally:
+        db.close()
+
+    assert results == [{"attendee_id": attendee_id, "status": "duplicate"}]
+    assert scans[0]["scanned_at"] is scanned_at
+
+def test_batch_validation_single_round_trip(client, admin, paid_tickets):
+    event_id, tickets = paid_tickets
+    (first, qr1), (second, qr2), _ = tickets
+    bad_signature = qr1[:-1] + ("0" if qr1[-1] != "0" else "1")
+
+    response = client.post("/tickets/validate/batch", json={
+        "codes": [qr1, "garbage", qr2, qr1, bad_signature]
+    })
+    results = response.json()["results"]
+
+    assert [r["valid"] for r in results] == [True, False, True, True, False]
+    assert results[0]["checked_in"] is True
+    assert results[0]["attendee"]["ticket_type"] == "Test Batch"
+    assert results[2]["checked_in"] is True
+    assert results[3]["already_checked_in"] is True
+    # SELECT + UPDATE ... RETURNING, independent of batch size
+    assert int(response.headers["X-DB-Query-Count"]) <= 3
+
+    again = client.post("/tickets/validate/batch", json={"codes": [qr2]}).json()["results"]
+    assert again[0]["already_checked_in"] is True
+
+def test_batch_reports_the_winning_gates_check_in_time(client, admin, paid_tickets, monkeypatch):
+    _, tickets = paid_tickets
+    attendee_id, qr = tickets[0]
+    won_at = datetime(2030, 1, 1, 19, 59, 0)
+    guarded_update = checkin.update
+
+    def other_gate_first(table):
+        # Another gate checks the ticket in after our SELECT
+        other = TestingSessionLocal()
+        other.query(Attendee).filter(Attendee.id == attendee_id).update(
+            {Attendee.is_checked_in: True, Attendee.checked_in_at: won_at}
+        )
+        other.commit()
+        other.close()
+        return guarded_update(table)
+
+    monkeypatch.setattr(checkin, "update", other_gate_first)
+    [result] = client.post("/tickets/validate/batch", json={"codes": [qr]}).json()["results"]
+
+    assert result["already_checked_in"] is True
+    assert result["attendee"]["checked_in_at"] == won_at.isoformat()
+
+def test_batch_validation_limit(client, admin):
+    response = client.post("/tickets/validate/batch", json={"codes": ["x"] * 51})
+    assert response.status_code == 400
+
+def test_offline_upload_limit(client, admin, monkeypatch):
+    monkeypatch.setattr(settings, "checkin_offline_max", 2)
+    scan = {"attendee_id": 1, "scanned_at": "2026-01-01T10:00:00"}
+    response = client.post("/tickets/checkins/offline", json={"event_id": 1, "scans": [scan] * 3})
+    assert response.status_code == 400
+
+def test_validate_records_device(client, admin, paid_tickets):
+    _, tickets = paid_tickets
+    attendee_id, qr = tickets[0]
+
+    response = client.get(f"/tickets/validate/{qr}", headers={"X-Device-ID": "gate-3"})
+    assert response.json()["checked_in"] is True
+
+    response = client.get(f"/tickets/validate/{qr}", headers={"X-Device-ID": "gate-4"})
+    assert response.json()["already_checked_in"] is True
+    assert response.json()["attendee"]["checked_in_by"] == "gate-3"
+
+    assert client.get("/tickets/validate/1:2:deadbeef").status_code == 400
+
+def test_concurrent_check_in_has_single_winner(client, paid_tickets):
+    _, tickets = paid_tickets
+    attendee_id, qr = tickets[0]
+    threads_count = 12
+    barrier = threading.Barrier(threads_count)
+    statuses = []
+    lock = threading.Lock()
+
+    def scan(gate):
+        db = TestingSessionLocal()
+        try:
+            barrier.wait()
+            result = check_in_ticket(db, attendee_id, qr, f"gate-{gate}")
+            with lock:
+                statuses.append(result["status"])
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=scan, args=(i,)) for i in range(threads_count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert statuses.count("checked_in") == 1
+    assert statuses.count("already_checked_in") == threads_count - 1
@@ -0,0 +1,78 @@
+import mailbox
+import smtplib
+import pytest
+from app.services.emails import smtp as smtp_module
+from app.services.emails.file_sink import MaildirTransport
+from app.services.emails.mailer import Mailer, build_confirmation_email
+from app.services.emails.smtp import SMTPTransport
+
+class FakeSMTP:
+    instances = []
+
+    def __init__(self, host, port, timeout=None):
+        self.sent = []
+        self.closed = False
+        self.drop_next = False
+        FakeSMTP.instances.append(self)
+
+    def ehlo(self):
+        return 250, b"ok"
+
+    def has_extn(self, name):
+        return False
+
+    def send_message(self, message):
+        if self.drop_next:
+            self.drop_next = False
+            raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+        self.sent.append(message["To"])
+
+    def noop(self):
+        return 250, b"ok"
+
+    def quit(self):
+        self.closed = True
+
+    def close(self):
+        self.closed = True
+
+@pytest.fixture
+def fake_smtp(monkeypatch):
+    FakeSMTP.instances = []
+    monkeypatch.setattr(smtp_module.smtplib, "SMTP", FakeSMTP)
+    return FakeSMTP
+
+def message(to_email="a@example.com"):
+    return build_confirmation_email(to_email, "A", "Show", [b"qr"], 1)
+
+def test_maildir_sink_stores_messages(tmp_path):
+    mailer = Mailer(MaildirTransport(str(tmp_path / "mail")))
+
+    result = mailer.send_confirmation_email("a@example.com", "A", "Show", [b"qr-1", b"qr-2"], 3)
+
+    stored = list(mailbox.Maildir(str(tmp_path / "mail")))
+    assert result["success"] is True
+    assert len(stored) == 1
+    assert stored[0]["Message-ID"] == result["message_id"]
+
+def test_smtp_reuses_connections(fake_smtp):
+    transport = SMTPTransport(host="relay", port=25, username="", pool_size=2, max_messages=3)
+
+    for i in range(7):
+        transport.send(message(f"user{i}@example.com"))
+
+    # Sequential sends share one connection, replaced every 3 messages
+    assert [len(c.sent) for c in fake_smtp.instances] == [3, 3, 1]
+    assert [c.closed for c in fake_smtp.instances] == [True, True, False]
+    transport.close()
+    assert fake_smtp.instances[-1].closed
+
+def test_smtp_resends_on_dropped_connection(fake_smtp):
+    transport = SMTPTransport(host="relay", port=25, username="", pool_size=1)
+    transport.send(message())
+    fake_smtp.instances[0].drop_next = True
+
+    transport.send(message("b@example.com"))
+
+    assert len(fake_smtp.instances) == 2
+    assert fake_smtp.instances[1].sent == ["b@example.com"]
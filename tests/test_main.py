@@ -1,61 +1,5 @@
-import pytest
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from app.main import app
-from app.database import get_db, Base
-from app.models import Event, TicketBatch
-from datetime import datetime, timedelta
-from decimal import Decimal
-
-# Test database
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-def override_get_db():
-    try:
-        db = TestingSessionLocal()
-        yield db
-    finally:
-        db.close()
-
-app.dependency_overrides[get_db] = override_get_db
-
-@pytest.fixture
-def client():
-    Base.metadata.create_all(bind=engine)
-    with TestClient(app) as c:
-        yield c
-    Base.metadata.drop_all(bind=engine)
-
-@pytest.fixture
-def sample_event(client):
-    db = TestingSessionLocal()
-    event = Event(
-        name="Test Event",
-        description="Test Description",
-        location="Test Location",
-        start_date=datetime.now() + timedelta(days=30),
-        end_date=datetime.now() + timedelta(days=30, hours=8)
-    )
-    db.add(event)
-    db.commit()
-    db.refresh(event)
-    
-    batch = TicketBatch(
-        event_id=event.id,
-        name="Test Batch",
-        price=Decimal("99.90"),
-        quantity=100,
-        sale_start=datetime.now(),
-        sale_end=datetime.now() + timedelta(days=25)
-    )
-    db.add(batch)
-    db.commit()
-    event_id = event.id
-    db.close()
-    return event_id
+from conftest import TestingSessionLocal
+from app.models import TicketBatch
 
 def test_health_check(client):
     response = client.get("/healthz")
@@ -0,0 +1,142 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import httpx
+import pytest
+import requests
+from app.services.payments.http_client import (
+    AsyncHttpClient, CircuitBreaker, CircuitOpenError, PooledHttpClient
+)
+from app.services.payments.mercado_pago import MercadoPagoProvider
+
+class FakeAPI(BaseHTTPRequestHandler):
+    """Answers with the next status in server.statuses (200 when empty)"""
+    protocol_version = "HTTP/1.1"
+
+    def _answer(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        self.server.requests.append((self.command, self.path, self.client_address[1]))
+        status = self.server.statuses.pop(0) if self.server.statuses else 200
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        body = json.dumps({"id": "123", "status": "approved"}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = _answer
+    do_POST = _answer
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def api():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeAPI)
+    server.requests, server.statuses, server.delay = [], [], 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def make_client(**kwargs):
+    options = {"retries": 2, "backoff": 0.001, "breaker": CircuitBreaker(3, 60)}
+    options.update(kwargs)
+    return PooledHttpClient(**options)
+
+def test_reuses_one_connection(api):
+    client = make_client()
+    for _ in range(5):
+        assert client.get(f"{api.url}/v1/payments/1", headers={})["status"] == 200
+    client.close()
+
+    assert len({port for _, _, port in api.requests}) == 1
+
+def test_retries_get_but_not_post_on_server_error(api):
+    client = make_client()
+    api.statuses = [503, 502]
+    assert client.get(f"{api.url}/v1/payments/1", headers={}) == {
+        "status": 200, "response": {"id": "123", "status": "approved"}
+    }
+    assert len(api.requests) == 3
+
+    api.statuses = [500]
+    assert client.post(f"{api.url}/checkout/preferences", headers={}, data="{}")["status"] == 500
+    assert len(api.requests) == 4
+
+    # 429 means the request was refused, so even a POST is resent
+    api.statuses = [429]
+    assert client.post(f"{api.url}/checkout/preferences", headers={}, data="{}")["status"] == 200
+    client.close()
+
+def test_read_timeout_is_bounded(api):
+    api.delay = 0.5
+    client = make_client(read_timeout=0.1, retries=0)
+    started = time.monotonic()
+    with pytest.raises(requests.ReadTimeout):
+        client.get(f"{api.url}/v1/payments/1", headers={})
+    assert time.monotonic() - started < 0.4
+    client.close()
+
+def test_breaker_fails_fast_then_recovers(api):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.2)
+    client = make_client(retries=0, breaker=breaker)
+    api.statuses = [500, 500]
+    client.get(f"{api.url}/v1/payments/1", headers={})
+    client.get(f"{api.url}/v1/payments/1", headers={})
+
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        client.get(f"{api.url}/v1/payments/1", headers={})
+    assert len(api.requests) == 2
+
+    time.sleep(0.25)
+    assert breaker.state == "half_open"
+    assert client.get(f"{api.url}/v1/payments/1", headers={})["status"] == 200
+    assert breaker.state == "closed"
+    client.close()
+
+def test_sdk_goes_through_pooled_client(monkeypatch):
+    client = make_client()
+    provider = MercadoPagoProvider(http_client=client)
+    calls = []
+    monkeypatch.setattr(client, "request", lambda method, url, **kwargs: calls.append((method, url, kwargs)) or {
+        "status": 200, "response": {"status": "approved"}
+    })
+
+    assert provider.get_payment_status("42") == {"status": "approved"}
+    method, url, kwargs = calls[0]
+    assert (method, url.rsplit("/", 3)[-3:]) == ("GET", ["v1", "payments", "42"])
+    assert kwargs["timeout"] == client.read_timeout
+    assert kwargs["maxretries"] == client.retries
+
+def test_async_client_retries_and_shares_breaker():
+    statuses = [503, 200]
+
+    def respond(request):
+        return httpx.Response(statuses.pop(0), json={"status": "approved"})
+
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+
+    async def run():
+        client = AsyncHttpClient(
+            base_url="https://api.test", retries=1, backoff=0.001, breaker=breaker,
+            transport=httpx.MockTransport(respond)
+        )
+        try:
+            assert await client.get("/v1/payments/1") == {"status": 200, "response": {"status": "approved"}}
+            breaker.record_failure()
+            with pytest.raises(CircuitOpenError):
+                await client.get("/v1/payments/1")
+        finally:
+            await client.aclose()
+
+    asyncio.run(run())
+    assert statuses == []
@@ -0,0 +1,57 @@
+from conftest import TestingSessionLocal
+from app.models import Attendee, Order, TicketBatch
+from app.services.orders import assign_qr_codes
+from app.services.qrcode.generator import verify_qr_payload
+
+def create_order(client, event_id, quantity):
+    db = TestingSessionLocal()
+    batch_id = db.query(TicketBatch.id).filter(TicketBatch.event_id == event_id).scalar()
+    db.close()
+    response = client.post("/checkout/order", json={
+        "event_id": event_id,
+        "email": "buyer@example.com",
+        "full_name": "Buyer",
+        "items": [{"ticket_batch_id": batch_id, "quantity": quantity}]
+    })
+    return response.json()["id"]
+
+def ticket_codes(order_id):
+    db = TestingSessionLocal()
+    rows = db.query(Attendee.id, Attendee.qr_code).filter(Attendee.order_id == order_id).all()
+    db.close()
+    return rows
+
+def test_payment_assigns_qr_codes(client, sample_event):
+    order_id = create_order(client, sample_event, 3)
+    assert all(qr is None for _, qr in ticket_codes(order_id))
+
+    client.get(f"/checkout/success?order_id={order_id}")
+
+    tickets = ticket_codes(order_id)
+    for attendee_id, qr in tickets:
+        parsed = verify_qr_payload(qr)
+        assert parsed["valid"] and parsed["order_id"] == order_id
+        assert parsed["attendee_id"] == attendee_id
+
+    # Retried callbacks keep the issued payloads
+    client.get(f"/checkout/success?order_id={order_id}")
+    assert ticket_codes(order_id) == tickets
+
+def test_assignment_cost_is_independent_of_ticket_count(client, sample_event):
+    small = create_order(client, sample_event, 1)
+    large = create_order(client, sample_event, 40)
+
+    small_count = client.get(f"/checkout/success?order_id={small}").headers["X-DB-Query-Count"]
+    large_count = client.get(f"/checkout/success?order_id={large}").headers["X-DB-Query-Count"]
+    assert small_count == large_count
+
+def test_assign_only_fills_missing_codes(client, sample_event):
+    order_id = create_order(client, sample_event, 2)
+    db = TestingSessionLocal()
+    db.query(Order).filter(Order.id == order_id).update({"status": "paid"})
+    db.commit()
+
+    assert assign_qr_codes(db, [order_id]) == 2
+    db.commit()
+    assert assign_qr_codes(db, [order_id]) == 0
+    db.close()
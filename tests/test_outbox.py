@@ -0,0 +1,86 @@
+import pytest
+from conftest import TestingSessionLocal
+from test_orders import create_order
+from app.models import OutboxMessage
+from app.services import outbox
+from app.services.queue.local import LocalQueue
+from app.tasks.sqs_worker import QueueWorker
+
+@pytest.fixture
+def queue(monkeypatch):
+    q = LocalQueue(":memory:", name="outbox-test")
+    monkeypatch.setattr(outbox, "enqueue", q.send_batch)
+    return q
+
+def relay():
+    db = TestingSessionLocal()
+    try:
+        return outbox.relay_batch(db)
+    finally:
+        db.close()
+
+def test_payment_writes_outbox_row_not_queue(client, sample_event, queue):
+    order_id = create_order(client, sample_event, 2)
+    client.get(f"/checkout/success?order_id={order_id}")
+    # A repeated callback must not stage a second message
+    client.get(f"/checkout/success?order_id={order_id}")
+
+    db = TestingSessionLocal()
+    rows = db.query(OutboxMessage).all()
+    db.close()
+    assert [(r.message_type, r.sent_at) for r in rows] == [("send_confirmation", None)]
+    assert queue.receive(max_messages=10, wait_seconds=0) == []
+
+def test_relay_sends_each_row_once(client, sample_event, queue):
+    for _ in range(3):
+        client.get(f"/checkout/success?order_id={create_order(client, sample_event, 1)}")
+
+    assert relay() == 3
+    assert relay() == 0
+
+    bodies = [m.json() for m in queue.receive(max_messages=10, wait_seconds=0)]
+    assert len(bodies) == 3
+    assert all(b["type"] == "send_confirmation" and b["outbox_id"] for b in bodies)
+
+def test_relay_keeps_rows_when_queue_fails(client, sample_event, monkeypatch):
+    def unavailable(bodies):
+        raise RuntimeError("queue down")
+
+    monkeypatch.setattr(outbox, "enqueue", unavailable)
+    client.get(f"/checkout/success?order_id={create_order(client, sample_event, 1)}")
+
+    with pytest.raises(RuntimeError):
+        relay()
+    db = TestingSessionLocal()
+    assert db.query(OutboxMessage).filter(OutboxMessage.sent_at.is_(None)).count() == 1
+    db.close()
+
+def test_duplicate_deliveries_run_handler_once(client, queue):
+    worker = QueueWorker(queue=queue, concurrency=2)
+    calls = []
+    attempts = iter([RuntimeError("boom"), None, None])
+
+    def handler(body, db):
+        error = next(attempts)
+        if error:
+            raise error
+        calls.append(body["n"])
+
+    worker.register("counted", handler)
+    db = TestingSessionLocal()
+    outbox.add_message(db, "counted", {"n": 1})
+    db.commit()
+    db.close()
+    relay()
+    message = queue.receive(max_messages=1, wait_seconds=0)[0]
+
+    try:
+        # A failure releases the claim, then only the first success counts
+        with pytest.raises(RuntimeError):
+            worker.process_single_message(message)
+        worker.process_single_message(message)
+        worker.process_single_message(message)
+    finally:
+        worker.close()
+
+    assert calls == [1]
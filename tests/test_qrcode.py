@@ -0,0 +1,104 @@
+import hashlib
+import os
+import time
+import hmac
+import pytest
+import qrcode
+from app.config import Settings, settings
+from app.services.qrcode import generator
+from app.services.qrcode.generator import generate_qr_payload, verify_qr_payload
+
+@pytest.fixture
+def rotated_keys(monkeypatch):
+    monkeypatch.setattr(settings, "qr_signing_keys", "3:new-secret")
+    generator._signing_keys.cache_clear()
+    generator._hmac_states.cache_clear()
+    yield
+    generator._signing_keys.cache_clear()
+    generator._hmac_states.cache_clear()
+
+def test_compact_payload_roundtrip_fits_qr_version_1():
+    payload = generate_qr_payload(48213, 912345)
+    assert verify_qr_payload(payload) == {
+        "valid": True, "order_id": 48213, "attendee_id": 912345, "key_id": 0
+    }
+    assert set(payload) <= set("ABCDEFGHIJKLMNOPQRSTUVWXYZ234567")
+
+    qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_L)
+    qr.add_data(payload)
+    qr.make(fit=True)
+    assert qr.version == 1
+
+def test_tampered_payload_is_rejected():
+    payload = generate_qr_payload(1, 2)
+    other = generate_qr_payload(1, 3)
+    assert not verify_qr_payload(payload[:-2] + other[-2:])["valid"]
+    assert not verify_qr_payload(payload[:4])["valid"]
+    assert not verify_qr_payload("not base32!")["valid"]
+
+def test_legacy_payloads_still_verify():
+    data = "12:34"
+    signature = hmac.new(settings.secret_key.encode(), data.encode(), hashlib.sha256).hexdigest()[:16]
+    assert verify_qr_payload(f"{data}:{signature}") == {"valid": True, "order_id": 12, "attendee_id": 34}
+    assert not verify_qr_payload(f"{data}:{'0' * 16}")["valid"]
+
+def test_key_rotation(rotated_keys, monkeypatch):
+    old = generate_qr_payload(5, 6)
+    monkeypatch.setattr(settings, "qr_active_key_id", 3)
+    new = generate_qr_payload(5, 6)
+
+    assert new != old
+    assert verify_qr_payload(new)["key_id"] == 3
+    assert verify_qr_payload(old)["key_id"] == 0
+
+def test_renderer_caches_by_content(tmp_path, monkeypatch):
+    from app.services.qrcode.renderer import QRRenderer
+    calls = []
+    monkeypatch.setattr(
+        "app.services.qrcode.renderer.render_qr_image",
+        lambda payload, fmt: calls.append(payload) or generator.render_qr_image(payload, fmt)
+    )
+    renderer = QRRenderer(cache_dir=str(tmp_path), storage=None, workers=1)
+    payloads = [generate_qr_payload(1, i) for i in range(3)]
+
+    first = renderer.render_many(payloads)
+    assert len(calls) == 3
+    assert all(data.startswith(b"\x89PNG") for data in first.values())
+
+    # A fresh renderer over the same directory reuses the stored bytes
+    again = QRRenderer(cache_dir=str(tmp_path), storage=None, workers=1).render_many(payloads + payloads[:1])
+    assert again == first
+    assert len(calls) == 3
+
+    svg = renderer.render(payloads[0], "svg")
+    assert svg.startswith(b"<svg")
+
+def test_active_key_id_is_validated_at_startup():
+    with pytest.raises(ValueError):
+        Settings(qr_active_key_id=16)
+    with pytest.raises(ValueError):
+        Settings(qr_active_key_id=4, qr_signing_keys="3:new-secret")
+    with pytest.raises(ValueError):
+        Settings(qr_signing_keys="3")
+    with pytest.raises(ValueError):
+        # Id 0 is secret_key; replacing it would invalidate issued tickets
+        Settings(qr_signing_keys="0:x")
+    assert Settings(qr_active_key_id=3, qr_signing_keys="3:new-secret").qr_active_key_id == 3
+
+def test_renderer_disk_cache_is_capped(tmp_path):
+    from app.services.qrcode.renderer import QRRenderer
+    payloads = [generate_qr_payload(2, i) for i in range(6)]
+    size = len(generator.render_qr_image(payloads[0], "png"))
+    renderer = QRRenderer(cache_dir=str(tmp_path), storage=None, workers=1, max_bytes=size * 4)
+
+    renderer.render_many(payloads[:3])
+    time.sleep(0.01)
+    # A hit makes payloads[0] the most recently used
+    renderer.render(payloads[0])
+    time.sleep(0.01)
+    renderer.render_many(payloads[3:])
+
+    files = [p for p in tmp_path.rglob("*.png")]
+    assert sum(p.stat().st_size for p in files) <= size * 4
+    assert os.path.exists(renderer._path(renderer.cache_key(payloads[0]), "png"))
+    assert not os.path.exists(renderer._path(renderer.cache_key(payloads[1]), "png"))
@@ -0,0 +1,27 @@
+from sqlalchemy import select
+from conftest import TestingSessionLocal
+from app.models import Event
+from app.query_stats import track_queries, fingerprint
+
+def test_fingerprint_collapses_parameters_and_in_lists():
+    a = fingerprint("SELECT * FROM events WHERE id IN (?, ?, ?) AND name = 'x'")
+    b = fingerprint("SELECT *  FROM events\nWHERE id IN (?, ?) AND name = 'y'")
+    assert a == b
+
+def test_track_queries_detects_repeated_statements(sample_event):
+    db = TestingSessionLocal()
+    with track_queries() as stats:
+        for _ in range(3):
+            db.execute(select(Event).where(Event.id == sample_event)).all()
+    db.close()
+
+    assert stats.count == 3
+    assert stats.total_time > 0
+    assert list(stats.repeated().values()) == [3]
+
+def test_request_query_count_headers(client, sample_event):
+    response = client.get("/admin/events")
+    assert response.status_code == 200
+    assert int(response.headers["X-DB-Query-Count"]) == 1
+    assert float(response.headers["X-DB-Time-Ms"]) >= 0
+    assert response.headers["X-DB-Repeated-Statements"] == "0"
@@ -0,0 +1,138 @@
+import threading
+import time
+from datetime import datetime, timedelta
+import pytest
+from conftest import TestingSessionLocal
+from test_orders import create_order, ticket_codes
+from app.models import Order, OutboxMessage, Payment
+from app.services.orders import mark_orders_paid
+from app.services.payments.http_client import CircuitOpenError
+from app.services.payments.reconcile import PaymentReconciler
+
+class FakeProvider:
+    """find_payments answers from .payments[order_id] (a list or an exception)"""
+
+    def __init__(self, delay=0):
+        self.payments = {}
+        self.calls = []
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def find_payments(self, external_reference):
+        with self._lock:
+            self.calls.append(int(external_reference))
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+            result = self.payments.get(int(external_reference), [])
+            if isinstance(result, Exception):
+                raise result
+            return result
+        finally:
+            with self._lock:
+                self.active -= 1
+
+def payment(order_id, status, payment_id=None):
+    return {
+        "payment_id": payment_id or f"mp-{order_id}", "status": status,
+        "external_reference": str(order_id), "amount": 100, "payment_method": "pix"
+    }
+
+def make_orders(client, event_id, count, age=timedelta(hours=1)):
+    ids = [create_order(client, event_id, 1) for _ in range(count)]
+    db = TestingSessionLocal()
+    db.query(Order).filter(Order.id.in_(ids)).update(
+        {Order.created_at: datetime.utcnow() - age}, synchronize_session=False
+    )
+    db.commit()
+    db.close()
+    return ids
+
+def reconcile(provider, **kwargs):
+    options = {"concurrency": 4, "rate_limit": 1000, "batch_size": 2, "lookback_hours": 48, "grace_minutes": 15}
+    options.update(kwargs)
+    db = TestingSessionLocal()
+    try:
+        return PaymentReconciler(provider=provider, **options).run_once(db)
+    finally:
+        db.close()
+
+def statuses(ids):
+    db = TestingSessionLocal()
+    rows = dict(db.query(Order.id, Order.status).filter(Order.id.in_(ids)).all())
+    db.close()
+    return [rows[i] for i in ids]
+
+def test_applies_lost_payments_in_bulk(client, sample_event):
+    approved, rejected, missing, failing = make_orders(client, sample_event, 4)
+    provider = FakeProvider()
+    provider.payments = {
+        approved: [payment(approved, "rejected", "mp-old"), payment(approved, "approved")],
+        rejected: [payment(rejected, "rejected")],
+        failing: RuntimeError("search failed"),
+    }
+
+    totals = reconcile(provider)
+
+    assert totals == {"checked": 4, "paid": 1, "unpaid": 1, "no_payment": 1, "error": 1}
+    assert statuses([approved, rejected, missing, failing]) == ["paid", "pending", "pending", "pending"]
+    assert all(code for _, code in ticket_codes(approved))
+    db = TestingSessionLocal()
+    assert sorted(p.external_id for p in db.query(Payment).all()) == sorted(["mp-old", f"mp-{approved}", f"mp-{rejected}"])
+    assert db.query(OutboxMessage).count() == 1
+    db.close()
+
+    # A second run only checks what is still pending, and records nothing twice
+    assert reconcile(provider)["checked"] == 3
+    db = TestingSessionLocal()
+    assert db.query(Payment).count() == 3
+    assert db.query(OutboxMessage).count() == 1
+    db.close()
+
+def test_only_orders_in_the_window_are_checked(client, sample_event):
+    recent = make_orders(client, sample_event, 5)
+    too_young = make_orders(client, sample_event, 1, age=timedelta(minutes=5))
+    too_old = make_orders(client, sample_event, 1, age=timedelta(days=3))
+    provider = FakeProvider()
+
+    assert reconcile(provider, batch_size=2)["checked"] == 5
+    assert sorted(provider.calls) == recent
+    assert not set(provider.calls) & set(too_young + too_old)
+
+def test_concurrency_and_rate_are_bounded(client, sample_event):
+    make_orders(client, sample_event, 12)
+    provider = FakeProvider(delay=0.02)
+
+    started = time.monotonic()
+    reconcile(provider, concurrency=3, rate_limit=40, batch_size=6)
+
+    assert len(provider.calls) == 12
+    assert provider.peak <= 3
+    # A burst of 3, then 40/s for the other 9
+    assert time.monotonic() - started >= 9 / 40
+
+def test_open_circuit_stops_the_run_after_applying_fetched(client, sample_event):
+    first, second, third = make_orders(client, sample_event, 3)
+    provider = FakeProvider()
+    provider.payments = {first: [payment(first, "approved")], second: CircuitOpenError("open")}
+
+    with pytest.raises(CircuitOpenError):
+        reconcile(provider, batch_size=2)
+
+    assert statuses([first, second, third]) == ["paid", "pending", "pending"]
+    assert third not in provider.calls
+
+def test_bulk_mark_paid_changes_each_order_once(client, sample_event):
+    ids = make_orders(client, sample_event, 2)
+    db = TestingSessionLocal()
+    try:
+        assert mark_orders_paid(db, ids[:1]) == ids[:1]
+        db.commit()
+        assert mark_orders_paid(db, ids) == ids[1:]
+        db.commit()
+        assert db.query(OutboxMessage).count() == 2
+    finally:
+        db.close()
@@ -0,0 +1,61 @@
+import email
+import time
+from botocore.exceptions import ClientError
+from app.services.emails import ses_mailer
+from app.services.emails.mailer import Mailer
+from app.services.emails.ses_mailer import SESTransport
+from app.services.throttle import TokenBucket
+
+class FakeSES:
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.sent = []
+
+    def send_raw_email(self, Source, Destinations, RawMessage):
+        if self.errors:
+            code, message = self.errors.pop(0)
+            raise ClientError({"Error": {"Code": code, "Message": message}}, "SendRawEmail")
+        self.sent.append(RawMessage["Data"])
+        return {"MessageId": f"m{len(self.sent)}"}
+
+def make_mailer(client):
+    return Mailer(SESTransport(bucket=TokenBucket(1000), client=client))
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=50, capacity=1)
+    started = time.monotonic()
+    for _ in range(6):
+        assert bucket.acquire()
+    # One token up front, then five at 50/s
+    assert time.monotonic() - started >= 0.09
+    assert bucket.try_acquire() is False
+    assert bucket.acquire(timeout=0) is False
+
+def test_one_email_carries_every_ticket():
+    client = FakeSES()
+    result = make_mailer(client).send_confirmation_email(
+        "buyer@example.com", "Buyer", "Show", [b"qr-1", b"qr-2"], 7
+    )
+
+    assert result == {"success": True, "message_id": "m1"}
+    message = email.message_from_string(client.sent[0])
+    filenames = [part.get_filename() for part in message.walk() if part.get_filename()]
+    assert filenames == ["ticket_7_1.png", "ticket_7_2.png"]
+
+def test_rate_throttling_is_retried(monkeypatch):
+    monkeypatch.setattr(ses_mailer.time, "sleep", lambda seconds: None)
+    client = FakeSES(errors=[("Throttling", "Maximum sending rate exceeded.")] * 2)
+
+    result = make_mailer(client).send_confirmation_email("a@example.com", "A", "Show", b"qr", 1)
+
+    assert result["success"] is True
+    assert len(client.sent) == 1
+
+def test_daily_quota_is_not_retried(monkeypatch):
+    monkeypatch.setattr(ses_mailer.time, "sleep", lambda seconds: None)
+    client = FakeSES(errors=[("Throttling", "Daily message quota exceeded.")])
+
+    result = make_mailer(client).send_confirmation_email("a@example.com", "A", "Show", b"qr", 1)
+
+    assert result["success"] is False
+    assert client.sent == []
@@ -0,0 +1,75 @@
+import signal
+import threading
+import time
+from app.services.queue.local import LocalQueue
+from app.tasks.sqs_worker import QueueWorker
+from app.tasks.supervisor import Supervisor
+
+def drain_on_sigterm(slot):
+    stopped = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopped.set())
+    stopped.wait(30)
+
+def ignore_sigterm(slot):
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    time.sleep(30)
+
+def test_desired_processes_follow_depth():
+    supervisor = Supervisor(min_processes=2, max_processes=6, backlog_per_process=100)
+
+    assert supervisor.desired_processes(0) == 2
+    assert supervisor.desired_processes(350) == 4
+    assert supervisor.desired_processes(10_000) == 6
+
+def test_scales_up_at_once_and_down_gradually(monkeypatch):
+    supervisor = Supervisor(min_processes=1, max_processes=4, backlog_per_process=10, scale_down_delay=0)
+    monkeypatch.setattr(supervisor, "spawn", lambda slot: supervisor.processes.__setitem__(slot, object()))
+    monkeypatch.setattr(supervisor, "retire", lambda slot: supervisor.processes.pop(slot))
+
+    supervisor.scale(35)
+    assert sorted(supervisor.processes) == [0, 1, 2, 3]
+
+    # The first low reading only starts the clock; then one worker per check
+    supervisor.scale(0)
+    assert len(supervisor.processes) == 4
+    supervisor.scale(0)
+    supervisor.scale(0)
+    assert sorted(supervisor.processes) == [0, 1]
+
+def test_shutdown_drains_then_kills_stragglers():
+    supervisor = Supervisor(min_processes=1, max_processes=2, shutdown_timeout=1, target=drain_on_sigterm)
+    supervisor.spawn(0)
+    supervisor.target = ignore_sigterm
+    supervisor.spawn(1)
+    time.sleep(0.5)
+    graceful, stuck = supervisor.processes[0], supervisor.processes[1]
+
+    supervisor.shutdown()
+
+    assert graceful.exitcode == 0
+    assert stuck.exitcode == -signal.SIGKILL
+
+def test_stopped_worker_finishes_in_flight_batch():
+    queue = LocalQueue(":memory:", name="drain")
+    worker = QueueWorker(queue=queue, concurrency=2)
+    started = threading.Event()
+    done = []
+
+    def slow(body, db):
+        started.set()
+        time.sleep(0.3)
+        done.append(body["n"])
+
+    worker.register("slow", slow)
+    queue.send_batch([{"type": "slow", "n": 1}, {"type": "slow", "n": 2}])
+    assert queue.depth() == 2
+
+    poller = threading.Thread(target=worker.process_messages)
+    poller.start()
+    started.wait(5)
+    worker.stop()
+    poller.join(10)
+
+    assert not poller.is_alive()
+    assert sorted(done) == [1, 2]
+    assert queue.depth() == 0
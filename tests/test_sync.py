@@ -0,0 +1,100 @@
+import base64
+from datetime import timedelta
+import pytest
+from conftest import TestingSessionLocal
+from app.config import settings
+from app.models import Event, TicketBatch, Tombstone
+
+@pytest.fixture(autouse=True)
+def no_overlap(monkeypatch):
+    """Exact deltas; test_late_commits_are_not_skipped covers the overlap"""
+    monkeypatch.setattr(settings, "sync_overlap_seconds", 0)
+
+def test_sync_returns_only_changes_since_cursor(client, sample_event):
+    response = client.get("/admin/sync")
+    assert response.status_code == 200
+    data = response.json()
+    assert [e["id"] for e in data["events"]] == [sample_event]
+    assert len(data["batches"]) == 1
+    assert data["has_more"] is False
+    cursor = data["cursor"]
+
+    # Nothing changed: empty delta
+    data = client.get("/admin/sync", params={"cursor": cursor}).json()
+    assert data["events"] == [] and data["batches"] == [] and data["deleted"] == []
+
+    db = TestingSessionLocal()
+    batch = db.query(TicketBatch).filter(TicketBatch.event_id == sample_event).first()
+    batch_id = batch.id
+    batch.name = "Renamed"
+    db.commit()
+    db.close()
+
+    data = client.get("/admin/sync", params={"cursor": cursor}).json()
+    assert data["events"] == []
+    assert [(b["id"], b["name"]) for b in data["batches"]] == [(batch_id, "Renamed")]
+    cursor = data["cursor"]
+
+    assert client.delete(f"/admin/batches/{batch_id}").status_code == 200
+    data = client.get("/admin/sync", params={"cursor": cursor}).json()
+    assert data["deleted"] == [{"entity": "batches", "id": batch_id}]
+
+def test_sync_pages_through_large_deltas(client, sample_event):
+    data = client.get("/admin/sync", params={"limit": 1}).json()
+    assert data["has_more"] is False
+
+    db = TestingSessionLocal()
+    event = db.query(Event).get(sample_event)
+    for i in range(3):
+        db.add(Event(name=f"Extra {i}", start_date=event.start_date, end_date=event.end_date))
+    db.commit()
+    db.close()
+
+    seen = []
+    cursor = data["cursor"]
+    while True:
+        data = client.get("/admin/sync", params={"cursor": cursor, "limit": 1}).json()
+        seen.extend(e["name"] for e in data["events"])
+        cursor = data["cursor"]
+        if not data["has_more"]:
+            break
+    assert seen == ["Extra 0", "Extra 1", "Extra 2"]
+
+def test_sync_rejects_invalid_cursor(client):
+    response = client.get("/admin/sync", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+    # Valid base64 and JSON, but not an object
+    cursor = base64.urlsafe_b64encode(b"[1]").decode()
+    assert client.get("/admin/sync", params={"cursor": cursor}).status_code == 400
+
+def test_late_commits_are_not_skipped(client, sample_event, monkeypatch):
+    monkeypatch.setattr(settings, "sync_overlap_seconds", 60)
+    db = TestingSessionLocal()
+    event = db.query(Event).get(sample_event)
+    # Stamped before the event that is about to be served, committed after
+    late = Event(name="Late", start_date=event.start_date, end_date=event.end_date,
+                 updated_at=event.updated_at - timedelta(seconds=1))
+    cursor = client.get("/admin/sync").json()["cursor"]
+    db.add(late)
+    db.commit()
+    db.close()
+
+    data = client.get("/admin/sync", params={"cursor": cursor}).json()
+    assert "Late" in [e["name"] for e in data["events"]]
+
+def test_bulk_deletes_leave_tombstones(client, sample_event):
+    db = TestingSessionLocal()
+    event = db.query(Event).get(sample_event)
+    extra = Event(name="Extra", start_date=event.start_date, end_date=event.end_date)
+    db.add(extra)
+    db.commit()
+    extra_id = extra.id
+    cursor = client.get("/admin/sync").json()["cursor"]
+
+    db.query(Event).filter(Event.name == "Extra").delete(synchronize_session=False)
+    db.commit()
+    assert db.query(Tombstone).filter(Tombstone.entity_id == extra_id).count() == 1
+    db.close()
+
+    data = client.get("/admin/sync", params={"cursor": cursor}).json()
+    assert data["deleted"] == [{"entity": "events", "id": extra_id}]
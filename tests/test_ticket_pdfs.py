@@ -0,0 +1,41 @@
+import os
+from conftest import TestingSessionLocal
+from test_orders import create_order
+from app.services.tickets import layout
+from app.services.tickets.pipeline import TicketPDFPipeline
+from app.services.tickets.sinks import LocalTicketSink
+
+def test_event_tickets_render_to_local_dir(client, sample_event, tmp_path, monkeypatch):
+    builds = []
+    build_layout = layout.build_layout
+    monkeypatch.setattr(layout, "build_layout", lambda event: builds.append(event["id"]) or build_layout(event))
+
+    paid = create_order(client, sample_event, 3)
+    client.get(f"/checkout/success?order_id={paid}")
+    create_order(client, sample_event, 1)  # unpaid, no ticket
+
+    db = TestingSessionLocal()
+    try:
+        rendered = TicketPDFPipeline(LocalTicketSink(str(tmp_path)), workers=1, chunk_size=2).render_event(db, sample_event)
+    finally:
+        db.close()
+
+    files = sorted(os.listdir(tmp_path / "tickets" / str(sample_event)))
+    assert rendered == 3
+    assert len(files) == 3
+    with open(tmp_path / "tickets" / str(sample_event) / files[0], "rb") as f:
+        assert f.read(5) == b"%PDF-"
+    # The event layout is built once and reused for every ticket
+    assert builds == [sample_event]
+
+def test_pool_renders_every_chunk(tmp_path):
+    event = {"id": 9, "name": "Pool", "start_date": None, "location": "", "artwork": None, "layout_key": "pool"}
+    tickets = [
+        {"attendee_id": n, "order_id": 1, "full_name": "A", "qr_code": f"CODE{n}", "batch_name": "Lote"}
+        for n in range(5)
+    ]
+
+    rendered = TicketPDFPipeline(LocalTicketSink(str(tmp_path)), workers=2, chunk_size=2).render(event, tickets)
+
+    assert rendered == 5
+    assert len(os.listdir(tmp_path / "tickets" / "9")) == 5
@@ -0,0 +1,50 @@
+from conftest import TestingSessionLocal
+from app.models import TicketBatch
+
+def _buy(client, event_id, email, quantity):
+    db = TestingSessionLocal()
+    batch = db.query(TicketBatch).filter(TicketBatch.event_id == event_id).first()
+    db.close()
+    response = client.post("/checkout/order", json={
+        "event_id": event_id,
+        "full_name": "Test User",
+        "email": email,
+        "items": [{"ticket_batch_id": batch.id, "quantity": quantity}]
+    })
+    return response.json()["id"]
+
+def test_user_tickets_fixed_query_count(client, sample_event):
+    _buy(client, sample_event, "many@example.com", 200)
+
+    response = client.get("/api/user/tickets", params={"email": "many@example.com"})
+    tickets = response.json()
+    assert len(tickets) == 200
+    assert tickets[0]["event_name"] == "Test Event"
+    assert tickets[0]["batch_name"] == "Test Batch"
+    assert tickets[0]["price"] == 99.9
+    assert tickets[0]["payment_status"] == "pending"
+    assert int(response.headers["X-DB-Query-Count"]) <= 3
+
+def test_user_orders_fixed_query_count(client, sample_event):
+    for _ in range(5):
+        _buy(client, sample_event, "orders@example.com", 3)
+
+    response = client.get("/user/orders", params={"email": "orders@example.com"})
+    orders = response.json()
+    assert [o["attendees_count"] for o in orders] == [3] * 5
+    assert orders[0]["event_name"] == "Test Event"
+    assert int(response.headers["X-DB-Query-Count"]) <= 3
+
+def test_user_cache_invalidated_on_status_change(client, sample_event):
+    order_id = _buy(client, sample_event, "cache@example.com", 1)
+
+    client.get("/api/user/tickets", params={"email": "cache@example.com"})
+    response = client.get("/api/user/tickets", params={"email": "cache@example.com"})
+    assert response.headers["X-DB-Query-Count"] == "0"
+
+    client.get("/checkout/success", params={"order_id": order_id})
+
+    tickets = client.get("/api/user/tickets", params={"email": "cache@example.com"}).json()
+    orders = client.get("/user/orders", params={"email": "cache@example.com"}).json()
+    assert tickets[0]["payment_status"] == "paid"
+    assert orders[0]["status"] == "paid"
@@ -0,0 +1,194 @@
+import hashlib
+import hmac
+import json
+import pytest
+from conftest import TestingSessionLocal
+from test_orders import create_order
+from app.config import settings
+from app.models import Order, Payment
+from app.routes import webhook
+from app.services.payments.dedup import recent_notifications, applied_notifications
+from app.services.payments.webhooks import get_payment_provider
+from app.services.queue.local import LocalQueue
+from app.tasks.sqs_worker import QueueWorker
+
+@pytest.fixture(autouse=True)
+def fresh_dedup():
+    recent_notifications.clear()
+    applied_notifications.clear()
+
+@pytest.fixture
+def queue(monkeypatch):
+    q = LocalQueue(":memory:", name="webhooks")
+    monkeypatch.setattr(webhook, "queue_enabled", lambda: True)
+    monkeypatch.setattr(webhook, "enqueue", q.send_batch)
+    return q
+
+@pytest.fixture
+def mercado_pago(monkeypatch):
+    """Stub the Mercado Pago payments API; set .payments[id] = response"""
+    provider = get_payment_provider()
+    provider.payments = {}
+    monkeypatch.setattr(provider, "get_payment_status", lambda payment_id: provider.payments.get(str(payment_id), {}))
+    return provider
+
+def notify(client, payment_id, secret="", notification_id=None):
+    event = {"type": "payment", "action": "payment.updated", "data": {"id": payment_id}}
+    if notification_id:
+        event["id"] = notification_id
+    body = json.dumps(event).encode()
+    signature = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest() if secret else ""
+    return client.post("/webhook/", content=body, headers={"x-signature": signature})
+
+def test_rejects_bad_signature(client, queue, monkeypatch):
+    monkeypatch.setattr(settings, "mercado_pago_webhook_secret", "s3cret")
+
+    assert notify(client, "1", secret="wrong").status_code == 401
+    assert notify(client, "1", secret="s3cret").status_code == 200
+    assert len(queue.receive(max_messages=10, wait_seconds=0)) == 1
+
+def test_acks_without_touching_provider_or_db(client, queue, mercado_pago, monkeypatch):
+    monkeypatch.setattr(mercado_pago, "get_payment_status", lambda payment_id: pytest.fail("called the API"))
+    monkeypatch.setattr(webhook, "SessionLocal", lambda: pytest.fail("opened a session"))
+
+    response = notify(client, "123")
+
+    assert response.status_code == 200
+    [message] = queue.receive(max_messages=10, wait_seconds=0)
+    assert message.json() == {
+        "type": "payment_webhook",
+        "data": {"type": "payment", "action": "payment.updated", "data": {"id": "123"}}
+    }
+
+def test_queue_outage_is_not_acknowledged(client, monkeypatch):
+    def unavailable(bodies):
+        raise RuntimeError("queue down")
+
+    monkeypatch.setattr(webhook, "queue_enabled", lambda: True)
+    monkeypatch.setattr(webhook, "enqueue", unavailable)
+
+    assert notify(client, "123").status_code == 503
+
+@pytest.mark.parametrize("status,order_status", [("approved", "paid"), ("pending", "pending")])
+def test_worker_applies_payment(client, sample_event, queue, mercado_pago, status, order_status):
+    order_id = create_order(client, sample_event, 2)
+    mercado_pago.payments["555"] = {
+        "status": status,
+        "external_reference": str(order_id),
+        "transaction_amount": 199.8,
+        "payment_method_id": "pix"
+    }
+    notify(client, "555")
+
+    worker = QueueWorker(queue=queue, concurrency=1)
+    try:
+        failed = worker.handle_batch(queue.receive(max_messages=10, wait_seconds=0))
+    finally:
+        worker.close()
+
+    db = TestingSessionLocal()
+    order = db.query(Order).filter(Order.id == order_id).first()
+    payment = db.query(Payment).filter(Payment.external_id == "555").first()
+    assert failed == []
+    assert order.status == order_status
+    assert (payment.status, payment.payment_method) == (status, "pix")
+    assert all(a.qr_code for a in order.attendees) == (status == "approved")
+    db.close()
+
+def approved(mercado_pago, order_id, payment_id="777"):
+    mercado_pago.payments[payment_id] = {
+        "status": "approved",
+        "external_reference": str(order_id),
+        "transaction_amount": 99.9,
+        "payment_method_id": "pix"
+    }
+
+def test_without_queue_notification_is_applied_after_the_response(client, sample_event, mercado_pago, monkeypatch):
+    monkeypatch.setattr(webhook, "queue_enabled", lambda: False)
+    order_id = create_order(client, sample_event, 1)
+    approved(mercado_pago, order_id)
+
+    # The ingest dedup must not make the inline run drop it as a resend
+    assert notify(client, "777", notification_id="n-5").status_code == 200
+    assert notify(client, "777", notification_id="n-5").status_code == 200
+
+    db = TestingSessionLocal()
+    assert db.query(Order).filter(Order.id == order_id).one().status == "paid"
+    assert db.query(Payment).filter(Payment.external_id == "777").count() == 1
+    db.close()
+
+def test_resends_are_dropped_at_ingest(client, queue):
+    for _ in range(5):
+        assert notify(client, "777", notification_id="n-1").status_code == 200
+
+    assert len(queue.receive(max_messages=10, wait_seconds=0)) == 1
+    assert recent_notifications.stats() == {"checked": 5, "duplicates": 4, "hit_rate": 0.8}
+    assert client.get("/healthz").json()["webhook_dedup"]["duplicates"] == 4
+
+def test_resends_across_processes_are_dropped_by_the_database(client, sample_event, queue, mercado_pago, monkeypatch):
+    approved(mercado_pago, create_order(client, sample_event, 1))
+    calls = []
+    get_status = mercado_pago.get_payment_status
+    monkeypatch.setattr(mercado_pago, "get_payment_status", lambda payment_id: calls.append(payment_id) or get_status(payment_id))
+
+    worker = QueueWorker(queue=queue, concurrency=1)
+    try:
+        for _ in range(2):
+            # As if each resend reached a different web and worker process
+            notify(client, "777", notification_id="n-2")
+            recent_notifications.clear()
+            applied_notifications.clear()
+            assert worker.handle_batch(queue.receive(max_messages=10, wait_seconds=0)) == []
+    finally:
+        worker.close()
+
+    assert calls == ["777"]
+    db = TestingSessionLocal()
+    assert db.query(Payment).filter(Payment.external_id == "777").one().webhook_processed == "n-2"
+    db.close()
+
+def test_failed_attempt_does_not_block_the_retry(client, sample_event, mercado_pago):
+    from app.services.payments.webhooks import process_payment_webhook
+
+    event = {"type": "payment", "id": "n-3", "data": {"id": "777"}}
+    db = TestingSessionLocal()
+    try:
+        # Payment not visible yet: the attempt fails and leaves no claim
+        with pytest.raises(RuntimeError):
+            process_payment_webhook(event, db)
+        db.rollback()
+        approved(mercado_pago, create_order(client, sample_event, 1))
+        process_payment_webhook(event, db)
+        assert db.query(Payment).filter(Payment.external_id == "777").count() == 1
+    finally:
+        db.close()
+
+def test_claim_is_taken_after_the_provider_call(client, sample_event, mercado_pago, monkeypatch):
+    from app.services.payments.webhooks import process_payment_webhook
+
+    approved(mercado_pago, create_order(client, sample_event, 1))
+    event = {"type": "payment", "id": "n-4", "data": {"id": "777"}}
+    get_status = mercado_pago.get_payment_status
+    fetches = []
+
+    def racing_fetch(payment_id):
+        fetches.append(payment_id)
+        if len(fetches) == 1:
+            # A duplicate in another process applies it while this one waits
+            # on the API; it must not block on a claim held across the call
+            other = TestingSessionLocal()
+            try:
+                process_payment_webhook(event, other)
+            finally:
+                other.close()
+            applied_notifications.clear()
+        return get_status(payment_id)
+
+    monkeypatch.setattr(mercado_pago, "get_payment_status", racing_fetch)
+    db = TestingSessionLocal()
+    try:
+        process_payment_webhook(event, db)
+        assert len(fetches) == 2
+        assert db.query(Payment).filter(Payment.external_id == "777").one().webhook_processed == "n-4"
+    finally:
+        db.close()
@@ -0,0 +1,250 @@
+import json
+import threading
+import time
+import pytest
+from test_orders import create_order
+from conftest import TestingSessionLocal
+from app.services import outbox
+from app.services.queue.base import QueueMessage
+from app.services.queue.local import LocalQueue
+from app.services.queue.sqs import SQSQueue
+from app.models import Attendee
+from app.tasks.sqs_worker import QueueWorker, VisibilityHeartbeat, AdaptivePoller, Lane, EmailSendError
+
+@pytest.fixture
+def queue():
+    return LocalQueue(":memory:", name="test")
+
+@pytest.fixture
+def worker(queue):
+    w = QueueWorker(queue=queue, concurrency=10)
+    yield w
+    w.close()
+
+def receive_all(queue, wait=0):
+    return queue.receive(max_messages=10, wait_seconds=wait, visibility_timeout=30)
+
+def test_batch_runs_in_parallel_and_acks(worker, queue):
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def slow(body, db):
+        with lock:
+            active.append(1)
+            peak.append(len(active))
+        time.sleep(0.1)
+        with lock:
+            active.pop()
+
+    worker.register("slow", slow)
+    queue.send_batch([{"type": "slow", "i": i} for i in range(10)])
+    started = time.perf_counter()
+    failed = worker.handle_batch(receive_all(queue))
+
+    assert failed == []
+    assert time.perf_counter() - started < 0.5
+    assert max(peak) > 1
+    assert receive_all(queue) == []
+
+def test_failed_messages_back_off_per_type(worker, queue):
+    def flaky(body, db):
+        if body["i"] % 2:
+            raise RuntimeError("boom")
+
+    worker.register("flaky", flaky)
+    queue.send_batch([{"type": "flaky", "i": i} for i in range(4)])
+    failed = worker.handle_batch(receive_all(queue))
+
+    assert [m.json()["i"] for m in failed] == [1, 3]
+    # Not visible again until the first backoff step has passed
+    assert receive_all(queue) == []
+    queue.retry([(m, 0) for m in failed])
+    assert [m.attempts for m in receive_all(queue)] == [2, 2]
+
+def test_backoff_is_exponential_and_capped(worker):
+    _, policy = worker.handlers["payment_webhook"]
+    assert [policy.delay(n) for n in (1, 2, 3)] == [5, 10, 20]
+    assert policy.delay(50) == policy.max_delay
+
+def test_exhausted_and_unknown_messages_go_to_dlq(worker, queue):
+    def fail(body, db):
+        raise RuntimeError("still broken")
+
+    worker.register("broken", fail)
+    queue.send_batch([{"type": "broken"}, {"type": "mystery"}])
+    _, policy = worker.handlers["broken"]
+    for _ in range(policy.max_attempts):
+        messages = receive_all(queue)
+        worker.handle_batch(messages)
+        queue.retry([(m, 0) for m in messages])
+
+    dead = {json.loads(d["body"])["type"]: d for d in queue.dead_letters()}
+    assert dead["mystery"]["attempts"] == 1
+    assert dead["mystery"]["error"] == "Unknown message type: mystery"
+    assert dead["broken"]["attempts"] == policy.max_attempts
+    assert receive_all(queue) == []
+
+def test_adaptive_poller_follows_depth():
+    poller = AdaptivePoller(max_batch=10, max_wait=20)
+    poller.observe(10)
+    assert (poller.batch_size, poller.wait_seconds) == (10, 0)
+    poller.observe(3)
+    assert (poller.batch_size, poller.wait_seconds) == (3, 20)
+    poller.observe(3)
+    assert (poller.batch_size, poller.wait_seconds) == (6, 0)
+    # Idle: long-poll for a full batch, so the next burst isn't ramped up from 1
+    poller.observe(0)
+    assert (poller.batch_size, poller.wait_seconds) == (10, 20)
+    poller.observe(10)
+    assert (poller.batch_size, poller.wait_seconds) == (10, 0)
+
+def test_priority_lane_is_not_blocked_by_backlog(worker):
+    priority, bulk = LocalQueue(":memory:", name="priority"), LocalQueue(":memory:", name="bulk")
+    worker.lanes = [Lane("priority", priority, 1), Lane("default", bulk, 2)]
+    for lane in worker.lanes:
+        lane.poller = AdaptivePoller(max_batch=lane.concurrency, max_wait=0.05)
+    handled = {}
+    worker.register("email", lambda body, db: time.sleep(0.1))
+    worker.register("payment", lambda body, db: handled.setdefault("payment", time.perf_counter()))
+
+    bulk.send_batch([{"type": "email"} for _ in range(40)])
+    threading.Thread(target=worker.process_messages, daemon=True).start()
+    time.sleep(0.1)
+    sent = time.perf_counter()
+    priority.send({"type": "payment"})
+    time.sleep(0.3)
+    worker.running = False
+
+    # The email backlog needs ~2s on two threads; the payment doesn't wait for it
+    assert handled["payment"] - sent < 0.2
+    assert len(bulk.receive(max_messages=50, wait_seconds=0)) > 20
+    # Let the pollers notice running=False before the fixture stops the lanes
+    time.sleep(0.2)
+
+def test_local_queue_redelivers_after_visibility_timeout(queue):
+    queue.send({"type": "x"})
+    first, = queue.receive(wait_seconds=0, visibility_timeout=0)
+    second, = queue.receive(wait_seconds=0, visibility_timeout=30)
+    assert second.attempts == 2
+    # The stale receipt no longer acks the message
+    queue.ack([first])
+    assert receive_all(queue) == []
+    queue.extend([second], 0)
+    assert len(receive_all(queue)) == 1
+
+def test_heartbeat_extends_in_flight_messages(queue):
+    queue.send({"type": "x"})
+    message, = queue.receive(wait_seconds=0, visibility_timeout=0)
+    heartbeat = VisibilityHeartbeat(queue, timeout=30, interval=0.02)
+    heartbeat.start()
+    heartbeat.track([message])
+    time.sleep(0.1)
+    heartbeat.release([message])
+    heartbeat.stop()
+
+    # Extended while tracked, so not redelivered
+    assert receive_all(queue) == []
+
+def test_sqs_retries_transient_delete_failures():
+    class FakeSQS:
+        def __init__(self):
+            self.calls = []
+
+        def delete_message_batch(self, QueueUrl, Entries):
+            self.calls.append([e["ReceiptHandle"] for e in Entries])
+            first_call = len(self.calls) == 1
+            return {"Failed": [
+                {"Id": e["Id"], "SenderFault": False}
+                for e in Entries if first_call and e["ReceiptHandle"] == "r1"
+            ]}
+
+    client = FakeSQS()
+    sqs = SQSQueue(queue_url="queue", dlq_url="", client=client)
+    messages = [QueueMessage(id=f"m{i}", body="{}", receipt=f"r{i}") for i in range(2)]
+
+    assert sqs.ack(messages) == []
+    assert client.calls == [["r0", "r1"], ["r1"]]
+    assert sqs.supports_dead_letter is False
+
+def test_paid_order_flows_to_confirmation_email(client, sample_event, queue, worker, monkeypatch):
+    monkeypatch.setattr(outbox, "enqueue", queue.send_batch)
+    sent = []
+    monkeypatch.setattr(worker.mailer, "send_confirmation_email", lambda *args: sent.append(args) or {"success": True})
+
+    order_id = create_order(client, sample_event, 2)
+    client.get(f"/checkout/success?order_id={order_id}")
+    db = TestingSessionLocal()
+    outbox.relay_batch(db)
+    db.close()
+    worker.handle_batch(receive_all(queue))
+
+    # Both tickets go to the buyer's address, so they share one email
+    assert len(sent) == 1
+    to_email, _, _, qr_codes, sent_order_id = sent[0]
+    assert sent_order_id == order_id
+    assert len(qr_codes) == 2
+    assert all(qr.startswith(b"\x89PNG") for qr in qr_codes)
+
+def test_worker_records_metrics(worker, queue, tmp_path):
+    from prometheus_client import REGISTRY, write_to_textfile
+
+    def sample(name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    def maybe_fail(body, db):
+        if body.get("fail"):
+            raise RuntimeError("boom")
+
+    worker.register("metered", maybe_fail)
+    before = {
+        "ok": sample("ducktickets_worker_messages_total", type="metered", outcome="success"),
+        "failed": sample("ducktickets_worker_messages_total", type="metered", outcome="failure"),
+        "retried": sample("ducktickets_worker_retries_total", type="metered"),
+        "timed": sample("ducktickets_worker_processing_seconds_count", type="metered"),
+        "lag": sample("ducktickets_worker_queue_lag_seconds_count", type="metered"),
+        "acked": sample("ducktickets_worker_receive_to_ack_seconds_count", lane="default"),
+    }
+
+    queue.send_batch([{"type": "metered"}, {"type": "metered"}, {"type": "metered", "fail": True}])
+    worker.handle_batch(receive_all(queue))
+
+    assert sample("ducktickets_worker_messages_total", type="metered", outcome="success") - before["ok"] == 2
+    assert sample("ducktickets_worker_messages_total", type="metered", outcome="failure") - before["failed"] == 1
+    assert sample("ducktickets_worker_retries_total", type="metered") - before["retried"] == 1
+    assert sample("ducktickets_worker_processing_seconds_count", type="metered") - before["timed"] == 3
+    assert sample("ducktickets_worker_queue_lag_seconds_count", type="metered") - before["lag"] == 3
+    assert sample("ducktickets_worker_receive_to_ack_seconds_count", lane="default") - before["acked"] == 3
+    assert sample("ducktickets_worker_in_flight_messages", lane="default") == 0
+
+    path = tmp_path / "worker.prom"
+    write_to_textfile(str(path), REGISTRY)
+    assert 'ducktickets_worker_messages_total{outcome="success",type="metered"}' in path.read_text()
+
+def test_failed_confirmation_email_is_retried_for_that_address_only(client, sample_event, worker, monkeypatch):
+    order_id = create_order(client, sample_event, 2)
+    client.get(f"/checkout/success?order_id={order_id}")
+    db = TestingSessionLocal()
+    second = db.query(Attendee).filter(Attendee.order_id == order_id).order_by(Attendee.id.desc()).first()
+    second.email = "friend@example.com"
+    db.commit()
+
+    sent = []
+    def send(to_email, *args):
+        sent.append(to_email)
+        if to_email == "friend@example.com" and sent.count(to_email) == 1:
+            return {"success": False, "error": "Daily message quota exceeded"}
+        return {"success": True, "message_id": "m"}
+    monkeypatch.setattr(worker.mailer, "send_confirmation_email", send)
+
+    # The failure reaches the queue, so the message is retried
+    with pytest.raises(EmailSendError):
+        worker.send_confirmation_emails(order_id, db)
+    assert sorted(sent) == ["buyer@example.com", "friend@example.com"]
+
+    # The retry only resends what failed; after that there is nothing left
+    worker.send_confirmation_emails(order_id, db)
+    worker.send_confirmation_emails(order_id, db)
+    assert sent[2:] == ["friend@example.com"]
+    assert all(a.confirmation_sent_at for a in db.query(Attendee).filter(Attendee.order_id == order_id))
+    db.close()